@@ -8,10 +8,17 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Run against in-memory Firestore/S3/OpenAI/Graph API stand-ins (ContentApp/fakes)
+# instead of the real services, e.g. for tests and offline load testing
+FAKE_BACKENDS = os.getenv('MEDIAMINT_FAKE_BACKENDS', 'false').lower() == 'true'
+FAKE_BACKEND_LATENCY_MS = float(os.getenv('FAKE_BACKEND_LATENCY_MS', '0'))
+
 # Helper function to get required env vars
 def get_required_env(key: str) -> str:
     value = os.getenv(key)
     if not value:
+        if FAKE_BACKENDS:
+            return f'fake-{key.lower()}'
         raise ValueError(f"Required environment variable '{key}' is not set")
     return value
 
@@ -23,6 +30,10 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '30')
 # Firebase Configuration
 FIREBASE_CREDENTIALS_PATH = os.getenv('FIREBASE_CREDENTIALS_PATH', 'firebase-service-account.json')
 
+# Fall back to the pre-hash token query (and re-key the document) when a token
+# isn't found by its hashed ID. Can be disabled once old tokens have expired.
+LEGACY_TOKEN_LOOKUP = os.getenv('LEGACY_TOKEN_LOOKUP', 'True').lower() == 'true'
+
 # AWS Configuration (S3 for storage)
 AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
 AWS_ACCESS_KEY_ID = get_required_env('AWS_ACCESS_KEY_ID')
@@ -47,6 +58,94 @@ SMTP_USER = os.getenv('SMTP_USER')
 SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
 FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@mediamint.com')
 
+# Write-behind buffer for activity/notification inserts
+WRITE_BUFFER_MAX_SIZE = int(os.getenv('WRITE_BUFFER_MAX_SIZE', '100'))
+WRITE_BUFFER_FLUSH_INTERVAL = float(os.getenv('WRITE_BUFFER_FLUSH_INTERVAL', '1.0'))
+# Queued writes held at most, counting ones requeued after a failed commit. A full buffer
+# refuses new writes (callers write them directly) and drops requeued ones past the cap
+WRITE_BUFFER_MAX_PENDING = int(os.getenv('WRITE_BUFFER_MAX_PENDING', '10000'))
+
+# Read-through cache for hot lookups (TTLs in seconds)
+CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', '1000'))
+USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', '60'))
+SOCIAL_ACCOUNT_CACHE_TTL = float(os.getenv('SOCIAL_ACCOUNT_CACHE_TTL', '60'))
+AUTORESPONDER_CACHE_TTL = float(os.getenv('AUTORESPONDER_CACHE_TTL', '30'))
+POST_STATS_CACHE_TTL = float(os.getenv('POST_STATS_CACHE_TTL', '15'))
+
+# How often the user_stats counters are rebuilt from the posts collection (seconds)
+STATS_RECONCILE_INTERVAL = float(os.getenv('STATS_RECONCILE_INTERVAL', '3600'))
+
+# Probe every index in firestore.indexes.json at startup and log missing ones
+VERIFY_INDEXES_ON_STARTUP = os.getenv('VERIFY_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+
+# Background deletion of expired oauth_states, password_reset_tokens and refresh_tokens
+TTL_SWEEP_INTERVAL = float(os.getenv('TTL_SWEEP_INTERVAL', '900'))  # seconds between sweeps
+TTL_SWEEP_BATCH_SIZE = min(int(os.getenv('TTL_SWEEP_BATCH_SIZE', '200')), 500)  # Firestore batch limit
+TTL_SWEEP_MAX_DELETES_PER_SECOND = float(os.getenv('TTL_SWEEP_MAX_DELETES_PER_SECOND', '100'))
+EXPIRED_TOKEN_RETENTION_HOURS = float(os.getenv('EXPIRED_TOKEN_RETENTION_HOURS', '24'))  # kept this long past expires_at
+# Autoresponder comment reservations older than this are released so the comment is retried
+COMMENT_RESERVATION_TIMEOUT = float(os.getenv('COMMENT_RESERVATION_TIMEOUT', '900'))
+
+# Autoresponder comment polling: comments per Graph page and the most pages read per post and tick
+# (the per-post cursor carries on from there next tick)
+COMMENT_POLL_PAGE_SIZE = int(os.getenv('COMMENT_POLL_PAGE_SIZE', '100'))
+COMMENT_POLL_MAX_PAGES = int(os.getenv('COMMENT_POLL_MAX_PAGES', '10'))
+
+# The autoresponder works through up to AUTORESPONDER_CONCURRENCY posts and AUTORESPONDER_REPLY_CONCURRENCY
+# replies (LLM call plus Graph reply) at once, and each Meta account gets AUTORESPONDER_ACCOUNT_CALLS_PER_MINUTE
+# Graph calls; comments left over when an account's budget runs out are picked up on a later tick
+AUTORESPONDER_CONCURRENCY = int(os.getenv('AUTORESPONDER_CONCURRENCY', '10'))
+AUTORESPONDER_REPLY_CONCURRENCY = int(os.getenv('AUTORESPONDER_REPLY_CONCURRENCY', '5'))
+AUTORESPONDER_ACCOUNT_CALLS_PER_MINUTE = float(os.getenv('AUTORESPONDER_ACCOUNT_CALLS_PER_MINUTE', '30'))
+
+# Due-post query used by the scheduler: documents per page and the most posts picked up per tick
+DUE_POSTS_PAGE_SIZE = int(os.getenv('DUE_POSTS_PAGE_SIZE', '100'))
+DUE_POSTS_MAX_PER_TICK = int(os.getenv('DUE_POSTS_MAX_PER_TICK', '500'))
+# Due posts are published concurrently: at most PUBLISH_CONCURRENCY at once, PUBLISH_PER_USER_LIMIT
+# per user and PUBLISH_PER_ACCOUNT_LIMIT uploads per connected account. The caps hold per worker: when
+# sharded, each worker applies them to the jobs of its own shards
+PUBLISH_CONCURRENCY = int(os.getenv('PUBLISH_CONCURRENCY', '10'))
+PUBLISH_PER_USER_LIMIT = int(os.getenv('PUBLISH_PER_USER_LIMIT', '2'))
+PUBLISH_PER_ACCOUNT_LIMIT = int(os.getenv('PUBLISH_PER_ACCOUNT_LIMIT', '1'))
+# The scheduler keeps an in-memory timer per post due within SCHEDULER_LOOKAHEAD seconds and
+# reloads them from Firestore every SCHEDULER_POLL_INTERVAL seconds as a safety net
+SCHEDULER_POLL_INTERVAL = float(os.getenv('SCHEDULER_POLL_INTERVAL', '300'))
+SCHEDULER_LOOKAHEAD = float(os.getenv('SCHEDULER_LOOKAHEAD', '900'))
+# Follow scheduled posts through a Firestore snapshot listener (timers for every scheduled post, updated
+# as they change); its health is checked every SCHEDULER_LISTENER_CHECK_INTERVAL seconds and it reconnects
+SCHEDULER_SNAPSHOT_LISTENER = os.getenv('SCHEDULER_SNAPSHOT_LISTENER', 'true').lower() == 'true'
+SCHEDULER_LISTENER_CHECK_INTERVAL = float(os.getenv('SCHEDULER_LISTENER_CHECK_INTERVAL', '10'))
+# Only the instance holding the scheduler lease runs the scheduler. The holder renews every
+# LEADER_LEASE_RENEW_INTERVAL seconds; others take over once LEADER_LEASE_TTL passes without a renewal
+SCHEDULER_LEADER_ELECTION = os.getenv('SCHEDULER_LEADER_ELECTION', 'true').lower() == 'true'
+LEADER_LEASE_TTL = float(os.getenv('LEADER_LEASE_TTL', '15'))
+LEADER_LEASE_RENEW_INTERVAL = float(os.getenv('LEADER_LEASE_RENEW_INTERVAL', '5'))
+# Spread the scheduler over several workers: posts and autoresponder settings carry a shard
+# (hash of the post ID) and each worker leases a fair share of the shards. 1 disables sharding.
+# Firestore 'in' filters take at most 30 values. Rerun migrations.backfill_shards after changing it.
+SCHEDULER_SHARDS = min(max(int(os.getenv('SCHEDULER_SHARDS', '1')), 1), 30)
+# Due posts go through a durable job queue ('firestore', or 'sqlite' at PUBLISH_QUEUE_SQLITE_PATH for
+# local runs). A leased job reappears after PUBLISH_VISIBILITY_TIMEOUT seconds unless its consumer extends
+# it; failures retry after PUBLISH_RETRY_BASE_DELAY seconds, doubling up to PUBLISH_RETRY_MAX_DELAY, and
+# after PUBLISH_MAX_ATTEMPTS the job is dead-lettered. Idle consumers check every PUBLISH_QUEUE_POLL_INTERVAL.
+PUBLISH_QUEUE_BACKEND = os.getenv('PUBLISH_QUEUE_BACKEND', 'firestore')
+PUBLISH_QUEUE_SQLITE_PATH = os.getenv('PUBLISH_QUEUE_SQLITE_PATH', 'publish_jobs.sqlite3')
+PUBLISH_VISIBILITY_TIMEOUT = float(os.getenv('PUBLISH_VISIBILITY_TIMEOUT', '300'))
+PUBLISH_MAX_ATTEMPTS = int(os.getenv('PUBLISH_MAX_ATTEMPTS', '5'))
+PUBLISH_RETRY_BASE_DELAY = float(os.getenv('PUBLISH_RETRY_BASE_DELAY', '30'))
+PUBLISH_RETRY_MAX_DELAY = float(os.getenv('PUBLISH_RETRY_MAX_DELAY', '1800'))
+PUBLISH_QUEUE_POLL_INTERVAL = float(os.getenv('PUBLISH_QUEUE_POLL_INTERVAL', '5'))
+# Publishing posts heartbeat publishing_heartbeat_at every PUBLISHING_HEARTBEAT_INTERVAL seconds. Every
+# PUBLISH_RECOVERY_INTERVAL seconds, up to PUBLISH_RECOVERY_BATCH_SIZE posts whose heartbeat is older than
+# PUBLISHING_STALE_AFTER and that have no queued job are re-queued; after PUBLISH_MAX_RECOVERIES they fail
+PUBLISHING_HEARTBEAT_INTERVAL = float(os.getenv('PUBLISHING_HEARTBEAT_INTERVAL', '60'))
+PUBLISHING_STALE_AFTER = float(os.getenv('PUBLISHING_STALE_AFTER', '600'))
+PUBLISH_RECOVERY_INTERVAL = float(os.getenv('PUBLISH_RECOVERY_INTERVAL', '120'))
+PUBLISH_RECOVERY_BATCH_SIZE = int(os.getenv('PUBLISH_RECOVERY_BATCH_SIZE', '100'))
+PUBLISH_MAX_RECOVERIES = int(os.getenv('PUBLISH_MAX_RECOVERIES', '3'))
+# On shutdown, in-flight publishes get this long to finish before they are cancelled (seconds)
+PUBLISH_SHUTDOWN_GRACE = float(os.getenv('PUBLISH_SHUTDOWN_GRACE', '30'))
+
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 
@@ -0,0 +1,57 @@
+"""
+In-memory backends for running the app, tests and load tests offline
+
+Enabled with MEDIAMINT_FAKE_BACKENDS=true: firebase_config, aws_clients,
+openai_client and meta_service then hand out these instances instead of real
+clients. FAKE_BACKEND_LATENCY_MS adds a simulated round-trip to every call.
+"""
+from typing import Optional
+
+from ..config import FAKE_BACKEND_LATENCY_MS, AWS_REGION
+from .firestore import FakeAsyncClient
+from .s3 import FakeS3Client
+from .openai_api import FakeOpenAI
+from .graph_api import FakeGraphAPI
+
+_latency = FAKE_BACKEND_LATENCY_MS / 1000
+
+_firestore: Optional[FakeAsyncClient] = None
+_s3: Optional[FakeS3Client] = None
+_openai: Optional[FakeOpenAI] = None
+_graph_api: Optional[FakeGraphAPI] = None
+
+
+def get_fake_firestore() -> FakeAsyncClient:
+    global _firestore
+    if _firestore is None:
+        _firestore = FakeAsyncClient(latency=_latency)
+    return _firestore
+
+
+def get_fake_s3() -> FakeS3Client:
+    global _s3
+    if _s3 is None:
+        _s3 = FakeS3Client(latency=_latency, region=AWS_REGION)
+    return _s3
+
+
+def get_fake_openai() -> FakeOpenAI:
+    global _openai
+    if _openai is None:
+        _openai = FakeOpenAI(latency=_latency)
+    return _openai
+
+
+def get_fake_graph_api() -> FakeGraphAPI:
+    global _graph_api
+    if _graph_api is None:
+        _graph_api = FakeGraphAPI(latency=_latency)
+    return _graph_api
+
+
+def reset_fakes():
+    """Clear all in-memory state, e.g. between tests"""
+    get_fake_firestore().reset()
+    get_fake_s3().reset()
+    get_fake_openai().reset()
+    get_fake_graph_api().reset()
@@ -0,0 +1,644 @@
+"""
+In-memory stand-in for the Firestore AsyncClient
+
+Covers the part of the API the data layer uses: document get/set/update/delete,
+where/order_by/start_after/limit/select queries, count() aggregations, write
+batches and transactions (usable with firestore.async_transactional, including
+Aborted retries when a document read in the transaction changed before commit),
+and on_snapshot listeners, which are called synchronously after each write.
+"""
+import asyncio
+import copy
+import threading
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from functools import cmp_to_key
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from google.api_core.exceptions import Aborted, NotFound
+from google.cloud.firestore_v1 import transforms
+
+_MISSING = object()
+
+
+# ---------------------------------------------------------------------------
+# Value helpers
+# ---------------------------------------------------------------------------
+
+def _get_path(data: dict, field_path: str) -> Any:
+    value = data
+    for part in field_path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_path(data: dict, field_path: str, value: Any):
+    *parents, leaf = field_path.split('.')
+    for part in parents:
+        if not isinstance(data.get(part), dict):
+            data[part] = {}
+        data = data[part]
+    data[leaf] = value
+
+
+def _delete_path(data: dict, field_path: str):
+    *parents, leaf = field_path.split('.')
+    for part in parents:
+        data = data.get(part)
+        if not isinstance(data, dict):
+            return
+    data.pop(leaf, None)
+
+
+def _type_rank(value: Any) -> int:
+    """Firestore's cross-type ordering"""
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, list):
+        return 8
+    return 9
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _compare(a: Any, b: Any) -> int:
+    rank_a, rank_b = _type_rank(a), _type_rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    a, b = _normalize(a), _normalize(b)
+    try:
+        return (a > b) - (a < b)
+    except TypeError:
+        return (repr(a) > repr(b)) - (repr(a) < repr(b))
+
+
+def _matches(value: Any, op: str, expected: Any) -> bool:
+    if value is _MISSING:
+        return False
+    if op == '==':
+        return _type_rank(value) == _type_rank(expected) and _compare(value, expected) == 0
+    if op == '!=':
+        return not (_type_rank(value) == _type_rank(expected) and _compare(value, expected) == 0)
+    if op in ('<', '<=', '>', '>='):
+        if _type_rank(value) != _type_rank(expected):
+            return False
+        result = _compare(value, expected)
+        return {'<': result < 0, '<=': result <= 0, '>': result > 0, '>=': result >= 0}[op]
+    if op == 'in':
+        return any(_matches(value, '==', item) for item in expected)
+    if op == 'not-in':
+        return not any(_matches(value, '==', item) for item in expected)
+    if op == 'array_contains':
+        return isinstance(value, list) and any(_matches(item, '==', expected) for item in value)
+    if op == 'array_contains_any':
+        return isinstance(value, list) and any(_matches(item, '==', e) for item in value for e in expected)
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _resolve(value: Any, existing: Any = _MISSING) -> Any:
+    """Apply a transform or sentinel against the current value of a field"""
+    if value is transforms.SERVER_TIMESTAMP:
+        return datetime.now(timezone.utc)
+    if isinstance(value, transforms.Increment):
+        base = existing if isinstance(existing, (int, float)) and not isinstance(existing, bool) else 0
+        return base + value.value
+    if isinstance(value, transforms.Maximum):
+        return value.value if not isinstance(existing, (int, float)) else max(existing, value.value)
+    if isinstance(value, transforms.Minimum):
+        return value.value if not isinstance(existing, (int, float)) else min(existing, value.value)
+    if isinstance(value, transforms.ArrayUnion):
+        current = list(existing) if isinstance(existing, list) else []
+        return current + [item for item in value.values if item not in current]
+    if isinstance(value, transforms.ArrayRemove):
+        current = list(existing) if isinstance(existing, list) else []
+        return [item for item in current if item not in value.values]
+    if isinstance(value, dict):
+        base = existing if isinstance(existing, dict) else {}
+        return {k: _resolve(v, base.get(k, _MISSING)) for k, v in value.items() if v is not transforms.DELETE_FIELD}
+    return copy.deepcopy(value)
+
+
+def _copy_write(value: Any) -> Any:
+    """Copy write data, keeping transforms and sentinels as the same objects"""
+    if isinstance(value, dict):
+        return {k: _copy_write(v) for k, v in value.items()}
+    if isinstance(value, (transforms.Sentinel, transforms._ValueList, transforms._NumericValue)):
+        return value
+    return copy.deepcopy(value)
+
+
+def _merge(target: dict, data: dict):
+    for key, value in data.items():
+        if value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict):
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            _merge(target[key], value)
+        else:
+            target[key] = _resolve(value, target.get(key, _MISSING))
+
+
+def _project(data: dict, field_paths: Optional[List[str]]) -> dict:
+    if field_paths is None:
+        return data
+    projected = {}
+    for field_path in field_paths:
+        value = _get_path(data, field_path)
+        if value is not _MISSING:
+            _set_path(projected, field_path, value)
+    return projected
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+class _Store:
+    """Documents keyed by collection, with a version per document for transactions"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.collections: Dict[str, Dict[str, dict]] = {}
+        self.versions: Dict[Tuple[str, str], int] = {}
+        self.watches: List['FakeWatch'] = []
+        self._clock = 0
+
+    def read(self, collection: str, doc_id: str) -> Tuple[Optional[dict], int]:
+        with self.lock:
+            data = self.collections.get(collection, {}).get(doc_id)
+            return copy.deepcopy(data), self.versions.get((collection, doc_id), 0)
+
+    def apply(self, writes: List[Tuple[str, str, str, Any, bool]]):
+        """Apply (op, collection, doc_id, data, merge) writes atomically: all or none"""
+        with self.lock:
+            staged: Dict[Tuple[str, str], Optional[dict]] = {}
+            for op, collection, doc_id, data, merge in writes:
+                key = (collection, doc_id)
+                current = staged[key] if key in staged else self.collections.get(collection, {}).get(doc_id)
+
+                if op == 'create' and current is not None:
+                    raise ValueError(f"Document already exists: {collection}/{doc_id}")
+                if op == 'update' and current is None:
+                    raise NotFound(f"No document to update: {collection}/{doc_id}")
+
+                if op == 'delete':
+                    staged[key] = None
+                elif op == 'update':
+                    updated = copy.deepcopy(current)
+                    for field_path, value in data.items():
+                        if value is transforms.DELETE_FIELD:
+                            _delete_path(updated, field_path)
+                        else:
+                            _set_path(updated, field_path, _resolve(value, _get_path(updated, field_path)))
+                    staged[key] = updated
+                elif merge and current is not None:
+                    merged = copy.deepcopy(current)
+                    _merge(merged, data)
+                    staged[key] = merged
+                else:
+                    staged[key] = _resolve(data)
+
+            for (collection, doc_id), data in staged.items():
+                docs = self.collections.setdefault(collection, {})
+                if data is None:
+                    docs.pop(doc_id, None)
+                else:
+                    docs[doc_id] = data
+                self._clock += 1
+                self.versions[(collection, doc_id)] = self._clock
+
+        touched = {collection for _, collection, _, _, _ in writes}
+        for watch in list(self.watches):
+            if watch.collection in touched:
+                watch.refresh()
+
+    def scan(self, collection: str) -> List[Tuple[str, dict]]:
+        with self.lock:
+            return [(doc_id, copy.deepcopy(data)) for doc_id, data in self.collections.get(collection, {}).items()]
+
+    def clear(self):
+        with self.lock:
+            self.collections.clear()
+            self.versions.clear()
+            for watch in list(self.watches):
+                watch.unsubscribe()
+
+
+# ---------------------------------------------------------------------------
+# Client API
+# ---------------------------------------------------------------------------
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: 'FakeDocumentReference', data: Optional[dict]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self) -> Optional[dict]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str) -> Any:
+        if self._data is None:
+            return None
+        value = _get_path(self._data, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: 'FakeAsyncClient', collection: str, doc_id: str):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+        self.path = f"{collection}/{doc_id}"
+
+    def __eq__(self, other):
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    async def get(self, field_paths: Optional[List[str]] = None, transaction: 'FakeTransaction' = None) -> FakeDocumentSnapshot:
+        await self._client._round_trip()
+        data, version = self._client._store.read(self._collection, self.id)
+        if transaction is not None:
+            transaction._record_read(self, version)
+        if data is not None:
+            data = _project(data, field_paths)
+        return FakeDocumentSnapshot(self, data)
+
+    async def set(self, document_data: dict, merge: bool = False):
+        await self._client._round_trip()
+        self._client._store.apply([('set', self._collection, self.id, document_data, merge)])
+
+    async def create(self, document_data: dict):
+        await self._client._round_trip()
+        self._client._store.apply([('create', self._collection, self.id, document_data, False)])
+
+    async def update(self, field_updates: dict):
+        await self._client._round_trip()
+        self._client._store.apply([('update', self._collection, self.id, field_updates, False)])
+
+    async def delete(self):
+        await self._client._round_trip()
+        self._client._store.apply([('delete', self._collection, self.id, None, False)])
+
+
+class ChangeType(Enum):
+    ADDED = 1
+    REMOVED = 2
+    MODIFIED = 3
+
+
+class FakeDocumentChange:
+    def __init__(self, type: ChangeType, document: FakeDocumentSnapshot, old_index: int, new_index: int):
+        self.type = type
+        self.document = document
+        self.old_index = old_index
+        self.new_index = new_index
+
+
+class FakeWatch:
+    """
+    A query listener: the callback gets (docs, changes, read_time) once with the
+    full result set, then after every write that changes the results. close()
+    simulates the stream failing; like the real Watch it goes inactive silently.
+    """
+
+    def __init__(self, query: 'FakeQuery', callback):
+        self._query = query
+        self._callback = callback
+        self._docs: Dict[str, dict] = {}
+        self.collection = query._collection
+        self.is_active = True
+        query._client._store.watches.append(self)
+        self.refresh(initial=True)
+
+    def _snapshot(self, doc_id: str, data: dict) -> FakeDocumentSnapshot:
+        return FakeDocumentSnapshot(FakeDocumentReference(self._query._client, self.collection, doc_id), data)
+
+    def refresh(self, initial: bool = False):
+        if not self.is_active:
+            return
+        previous_ids = list(self._docs)
+        current = dict(self._query._run())
+        current_ids = list(current)
+
+        changes = []
+        for doc_id in previous_ids:
+            if doc_id not in current:
+                changes.append(FakeDocumentChange(
+                    ChangeType.REMOVED, self._snapshot(doc_id, self._docs[doc_id]), previous_ids.index(doc_id), -1
+                ))
+        for doc_id, data in current.items():
+            if doc_id not in self._docs:
+                change_type, old_index = ChangeType.ADDED, -1
+            elif self._docs[doc_id] != data:
+                change_type, old_index = ChangeType.MODIFIED, previous_ids.index(doc_id)
+            else:
+                continue
+            changes.append(FakeDocumentChange(change_type, self._snapshot(doc_id, data), old_index, current_ids.index(doc_id)))
+
+        self._docs = current
+        if changes or initial:
+            docs = [self._snapshot(doc_id, data) for doc_id, data in current.items()]
+            self._callback(docs, changes, datetime.now(timezone.utc))
+
+    def close(self, reason: Any = None):
+        self.is_active = False
+
+    def unsubscribe(self):
+        self.is_active = False
+        if self in self._query._client._store.watches:
+            self._query._client._store.watches.remove(self)
+
+
+class FakeAggregationResult:
+    def __init__(self, alias: str, value: Any):
+        self.alias = alias
+        self.value = value
+
+
+class FakeAggregationQuery:
+    def __init__(self, query: 'FakeQuery', alias: Optional[str]):
+        self._query = query
+        self._alias = alias or 'field_1'
+
+    async def get(self, transaction: 'FakeTransaction' = None, **kwargs) -> List[List[FakeAggregationResult]]:
+        await self._query._client._round_trip()
+        return [[FakeAggregationResult(self._alias, len(self._query._run()))]]
+
+
+class FakeQuery:
+    def __init__(self, client: 'FakeAsyncClient', collection: str):
+        self._client = client
+        self._collection = collection
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._orders: List[Tuple[str, str]] = []
+        self._limit: Optional[int] = None
+        self._start_after: Optional[dict] = None
+        self._projection: Optional[List[str]] = None
+
+    def _copy(self) -> 'FakeQuery':
+        query = FakeQuery(self._client, self._collection)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._limit = self._limit
+        query._start_after = self._start_after
+        query._projection = self._projection
+        return query
+
+    def where(self, field_path: str = None, op_string: str = None, value: Any = None, *, filter=None) -> 'FakeQuery':
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        query = self._copy()
+        query._filters.append((field_path, op_string, value))
+        return query
+
+    def order_by(self, field_path: str, direction: str = 'ASCENDING') -> 'FakeQuery':
+        query = self._copy()
+        query._orders.append((field_path, direction))
+        return query
+
+    def limit(self, count: int) -> 'FakeQuery':
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def start_after(self, document_fields_or_snapshot) -> 'FakeQuery':
+        query = self._copy()
+        if isinstance(document_fields_or_snapshot, FakeDocumentSnapshot):
+            cursor = document_fields_or_snapshot.to_dict() or {}
+            cursor['__name__'] = document_fields_or_snapshot.id
+        else:
+            cursor = dict(document_fields_or_snapshot)
+        query._start_after = cursor
+        return query
+
+    def select(self, field_paths: Iterable[str]) -> 'FakeQuery':
+        query = self._copy()
+        query._projection = list(field_paths)
+        return query
+
+    def count(self, alias: Optional[str] = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self, alias)
+
+    def on_snapshot(self, callback) -> FakeWatch:
+        return FakeWatch(self, callback)
+
+    def _effective_orders(self) -> List[Tuple[str, str]]:
+        orders = list(self._orders)
+        if not any(field == '__name__' for field, _ in orders):
+            orders.append(('__name__', orders[-1][1] if orders else 'ASCENDING'))
+        return orders
+
+    @staticmethod
+    def _value(doc_id: str, data: dict, field_path: str) -> Any:
+        return doc_id if field_path == '__name__' else _get_path(data, field_path)
+
+    def _run(self) -> List[Tuple[str, dict]]:
+        docs = [
+            (doc_id, data) for doc_id, data in self._client._store.scan(self._collection)
+            if all(_matches(_get_path(data, f), op, v) for f, op, v in self._filters)
+        ]
+        # Documents without an ordered field are excluded, as in Firestore
+        docs = [
+            (doc_id, data) for doc_id, data in docs
+            if all(_get_path(data, f) is not _MISSING for f, _ in self._orders if f != '__name__')
+        ]
+
+        orders = self._effective_orders()
+
+        def compare(a, b):
+            for field_path, direction in orders:
+                result = _compare(self._value(a[0], a[1], field_path), self._value(b[0], b[1], field_path))
+                if result:
+                    return -result if direction == 'DESCENDING' else result
+            return 0
+
+        docs.sort(key=cmp_to_key(compare))
+
+        if self._start_after is not None:
+            cursor = dict(self._start_after)
+            if isinstance(cursor.get('__name__'), str):
+                cursor['__name__'] = cursor['__name__'].rsplit('/', 1)[-1]
+
+            def after_cursor(doc) -> bool:
+                for field_path, direction in orders:
+                    if field_path not in cursor:
+                        continue
+                    result = _compare(self._value(doc[0], doc[1], field_path), cursor[field_path])
+                    if direction == 'DESCENDING':
+                        result = -result
+                    if result:
+                        return result > 0
+                return False
+
+            docs = [doc for doc in docs if after_cursor(doc)]
+
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        return docs
+
+    def _snapshots(self, transaction: 'FakeTransaction' = None) -> List[FakeDocumentSnapshot]:
+        snapshots = []
+        for doc_id, data in self._run():
+            reference = FakeDocumentReference(self._client, self._collection, doc_id)
+            if transaction is not None:
+                transaction._record_read(reference, self._client._store.versions.get((self._collection, doc_id), 0))
+            snapshots.append(FakeDocumentSnapshot(reference, _project(data, self._projection)))
+        return snapshots
+
+    async def get(self, transaction: 'FakeTransaction' = None, **kwargs) -> List[FakeDocumentSnapshot]:
+        await self._client._round_trip()
+        return self._snapshots(transaction)
+
+    async def stream(self, transaction: 'FakeTransaction' = None, **kwargs):
+        await self._client._round_trip()
+        for snapshot in self._snapshots(transaction):
+            yield snapshot
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: 'FakeAsyncClient', collection: str):
+        super().__init__(client, collection)
+        self.id = collection
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self._collection, document_id or uuid.uuid4().hex[:20])
+
+    async def add(self, document_data: dict, document_id: Optional[str] = None):
+        reference = self.document(document_id)
+        await reference.set(document_data)
+        return datetime.now(timezone.utc), reference
+
+
+class FakeWriteBatch:
+    def __init__(self, client: 'FakeAsyncClient'):
+        self._client = client
+        self._writes: List[Tuple[str, str, str, Any, bool]] = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def set(self, reference: FakeDocumentReference, document_data: dict, merge: bool = False):
+        self._writes.append(('set', reference._collection, reference.id, _copy_write(document_data), merge))
+
+    def create(self, reference: FakeDocumentReference, document_data: dict):
+        self._writes.append(('create', reference._collection, reference.id, _copy_write(document_data), False))
+
+    def update(self, reference: FakeDocumentReference, field_updates: dict):
+        self._writes.append(('update', reference._collection, reference.id, _copy_write(field_updates), False))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._writes.append(('delete', reference._collection, reference.id, None, False))
+
+    async def commit(self):
+        if len(self._writes) > 500:
+            raise ValueError("A write batch can contain at most 500 writes")
+        await self._client._round_trip()
+        self._client._store.apply(self._writes)
+        written = len(self._writes)
+        self._writes = []
+        return [None] * written
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Optimistic transaction: commit raises Aborted if anything it read has changed"""
+
+    def __init__(self, client: 'FakeAsyncClient', max_attempts: int = 5, read_only: bool = False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id = None
+        self._reads: Dict[Tuple[str, str], int] = {}
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def _record_read(self, reference: FakeDocumentReference, version: int):
+        self._reads.setdefault((reference._collection, reference.id), version)
+
+    def _clean_up(self):
+        self._writes = []
+        self._reads = {}
+        self._id = None
+
+    async def _begin(self, retry_id=None):
+        self._id = uuid.uuid4().bytes
+
+    async def _rollback(self):
+        self._clean_up()
+
+    async def _commit(self):
+        await self._client._round_trip()
+        store = self._client._store
+        with store.lock:
+            for key, version in self._reads.items():
+                if store.versions.get(key, 0) != version:
+                    self._clean_up()
+                    raise Aborted("Transaction contention: a document read in this transaction changed")
+            store.apply(self._writes)
+        written = len(self._writes)
+        self._clean_up()
+        return [None] * written
+
+
+class FakeAsyncClient:
+    """Drop-in for firestore_async.client() backed by process memory"""
+
+    def __init__(self, latency: float = 0.0):
+        self._store = _Store()
+        self._latency = latency
+        self.project = 'fake-project'
+
+    async def _round_trip(self):
+        # Simulated network latency; sleep(0) still yields like a real RPC would
+        await asyncio.sleep(self._latency)
+
+    def collection(self, collection_id: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, collection_id)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> FakeTransaction:
+        return FakeTransaction(self, max_attempts=max_attempts, read_only=read_only)
+
+    async def get_all(self, references: Iterable[FakeDocumentReference], field_paths: Optional[List[str]] = None,
+                      transaction: FakeTransaction = None):
+        """One round-trip for many documents; like the real client, missing ones yield exists=False"""
+        references = list(references)
+        await self._round_trip()
+        for reference in references:
+            data, version = self._store.read(reference._collection, reference.id)
+            if transaction is not None:
+                transaction._record_read(reference, version)
+            if data is not None:
+                data = _project(data, field_paths)
+            yield FakeDocumentSnapshot(reference, data)
+
+    def reset(self):
+        """Drop every document"""
+        self._store.clear()
@@ -0,0 +1,152 @@
+"""
+In-memory stand-in for the Meta Graph API
+
+Served through an httpx MockTransport, so MetaService runs unchanged. Pages,
+publishing, comments and replies are kept in memory; tests can seed comments
+with add_comment() and inspect what was published or replied.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+
+class FakeGraphAPI:
+    def __init__(self, latency: float = 0.0):
+        self._latency = latency
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.pages: List[dict] = []
+        self.comments: Dict[str, List[dict]] = {}
+        self.published: List[dict] = []
+        self.replies: List[dict] = []
+        self.calls: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._ids = itertools.count(1)
+            self.pages = [{
+                'id': 'fake_page_1',
+                'name': 'Fake Page',
+                'access_token': 'fake-page-token',
+                'instagram_business_account': {'id': 'fake_ig_1', 'username': 'fake_ig'}
+            }]
+            self.comments = {}
+            self.published = []
+            self.replies = []
+            self.calls = {}
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids)}"
+
+    def add_comment(
+        self,
+        object_id: str,
+        message: str,
+        author: str = 'Fake Commenter',
+        created_time: Optional[datetime] = None
+    ) -> dict:
+        """Seed a comment on a post or media object"""
+        created = (created_time or datetime.now(timezone.utc)).strftime('%Y-%m-%dT%H:%M:%S+0000')
+        with self._lock:
+            comment = {
+                'id': self._next_id('comment'),
+                'message': message,
+                'text': message,
+                'from': {'id': f"user_{author}", 'name': author},
+                'username': author,
+                'created_time': created,
+                'timestamp': created
+            }
+            comments = self.comments.setdefault(object_id, [])
+            comments.append(comment)
+            comments.sort(key=lambda c: c['created_time'])
+            return comment
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+        # Drop the version prefix: /v18.0/{node}/{edge}
+        segments = [s for s in request.url.path.split('/') if s]
+        if segments and segments[0].startswith('v') and segments[0][1:2].isdigit():
+            segments = segments[1:]
+        params = dict(request.url.params)
+        if request.content and request.headers.get('content-type', '').startswith('application/json'):
+            params.update(json.loads(request.content))
+
+        edge = segments[-1] if len(segments) > 1 else ''
+        with self._lock:
+            key = f"{request.method} {edge or 'node'}"
+            self.calls[key] = self.calls.get(key, 0) + 1
+            body = self._route(request.method, segments, edge, params)
+        return httpx.Response(200, json=body)
+
+    def _route(self, method: str, segments: List[str], edge: str, params: dict):
+        node = segments[0] if segments else ''
+
+        if segments[:2] == ['oauth', 'access_token']:
+            return {'access_token': 'fake-user-token', 'token_type': 'bearer', 'expires_in': 5184000}
+
+        if method == 'DELETE':
+            return True
+
+        if method == 'GET':
+            if node == 'me' and not edge:
+                return {'id': 'fake_user', 'name': 'Fake User', 'email': 'fake@example.com'}
+            if node == 'me' and edge == 'accounts':
+                return {'data': self.pages}
+            if edge == 'comments':
+                return self._comments_page(node, params)
+            if not edge:
+                page = next((p for p in self.pages if p['id'] == node), None)
+                if page and 'instagram_business_account' in params.get('fields', ''):
+                    return {'id': node, 'instagram_business_account': page.get('instagram_business_account')}
+                # Media containers are ready immediately
+                return {'id': node, 'status_code': 'FINISHED'}
+            return {'data': []}
+
+        # POST
+        if edge in ('comments', 'replies'):
+            reply = {'id': self._next_id('reply'), 'parent_id': node, 'message': params.get('message')}
+            self.replies.append(reply)
+            return {'id': reply['id']}
+        if edge == 'video_reels' and params.get('upload_phase') == 'start':
+            return {'video_id': self._next_id('video')}
+        if edge in ('photos', 'feed', 'videos', 'video_reels', 'photo_stories', 'video_stories', 'media_publish'):
+            post_id = self._next_id('post')
+            self.published.append({'id': post_id, 'node': node, 'edge': edge, 'params': params})
+            return {'id': post_id, 'post_id': f"{node}_{post_id}", 'success': True}
+        if edge == 'media':
+            return {'id': self._next_id('container')}
+        return {'id': self._next_id('object'), 'success': True}
+
+    def _comments_page(self, node: str, params: dict) -> dict:
+        """Comments oldest first, filtered by a unix `since` and paged by an offset `after` cursor"""
+        comments = list(self.comments.get(node, []))
+        if params.get('since'):
+            since = datetime.fromtimestamp(int(params['since']), timezone.utc)
+            comments = [
+                c for c in comments
+                if datetime.strptime(c['created_time'], '%Y-%m-%dT%H:%M:%S%z') >= since
+            ]
+        if params.get('order') == 'reverse_chronological':
+            comments.reverse()
+
+        limit = int(params.get('limit', 25))
+        offset = int(params.get('after', 0))
+        body = {'data': comments[offset:offset + limit]}
+        if offset + limit < len(comments):
+            body['paging'] = {
+                'cursors': {'after': str(offset + limit)},
+                'next': f"https://graph.facebook.com/{node}/comments?after={offset + limit}"
+            }
+        return body
@@ -0,0 +1,93 @@
+"""
+In-memory stand-in for the OpenAI client
+
+Returns canned, deterministic responses shaped like the SDK objects the
+services read: chat completions, image generation (b64_json) and Sora video jobs.
+"""
+import base64
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import List
+
+# 1x1 transparent PNG
+_PNG_BYTES = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+)
+
+
+class _Completions:
+    def __init__(self, client: 'FakeOpenAI'):
+        self._client = client
+
+    def create(self, model: str, messages: List[dict], **kwargs):
+        self._client._round_trip('chat.completions')
+        prompt = messages[-1].get('content', '') if messages else ''
+        content = f"Generated reply to: {prompt[:200]}"
+        return SimpleNamespace(
+            id=f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason='stop', message=SimpleNamespace(role='assistant', content=content))],
+            usage=SimpleNamespace(prompt_tokens=len(prompt.split()), completion_tokens=len(content.split()))
+        )
+
+
+class _Images:
+    def __init__(self, client: 'FakeOpenAI'):
+        self._client = client
+
+    def generate(self, prompt: str, n: int = 1, response_format: str = 'url', **kwargs):
+        self._client._round_trip('images')
+        encoded = base64.b64encode(_PNG_BYTES).decode()
+        return SimpleNamespace(data=[
+            SimpleNamespace(b64_json=encoded, url='https://fake-openai.local/image.png', revised_prompt=prompt)
+            for _ in range(n)
+        ])
+
+
+class _VideoContent:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def write_to_file(self, path: str):
+        with open(path, 'wb') as f:
+            f.write(self._data)
+
+
+class _Videos:
+    def __init__(self, client: 'FakeOpenAI'):
+        self._client = client
+
+    def create(self, prompt: str, **kwargs):
+        self._client._round_trip('videos')
+        return SimpleNamespace(id=f"video_{uuid.uuid4().hex[:12]}", status='queued', prompt=prompt)
+
+    def retrieve(self, job_id: str):
+        self._client._round_trip('videos')
+        return SimpleNamespace(id=job_id, status='completed')
+
+    def download_content(self, job_id: str, variant: str = 'video'):
+        self._client._round_trip('videos')
+        return _VideoContent(b'\x00\x00\x00\x18ftypmp42fake-video')
+
+
+class FakeOpenAI:
+    def __init__(self, latency: float = 0.0):
+        self._latency = latency
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.images = _Images(self)
+        self.videos = _Videos(self)
+
+    def _round_trip(self, endpoint: str):
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        # The SDK is blocking, so the fake blocks too
+        if self._latency:
+            time.sleep(self._latency)
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
@@ -0,0 +1,91 @@
+"""
+In-memory stand-in for the boto3 S3 client
+
+Implements the calls the services make: put/get/head/delete/copy object,
+upload_file/download_file and generate_presigned_url.
+"""
+import io
+import threading
+import time
+from typing import Dict, Tuple
+
+from botocore.exceptions import ClientError
+
+
+class FakeS3Client:
+    def __init__(self, latency: float = 0.0, region: str = 'us-east-1'):
+        self._objects: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+        self._latency = latency
+        self._region = region
+
+    def _round_trip(self):
+        # boto3 is blocking, so the fake blocks too
+        if self._latency:
+            time.sleep(self._latency)
+
+    def _not_found(self, operation: str, key: str):
+        return ClientError({'Error': {'Code': 'NoSuchKey', 'Message': f"Not found: {key}"}}, operation)
+
+    def put_object(self, Bucket: str, Key: str, Body=b'', ContentType: str = 'binary/octet-stream', **kwargs):
+        self._round_trip()
+        if hasattr(Body, 'read'):
+            Body = Body.read()
+        if isinstance(Body, str):
+            Body = Body.encode()
+        with self._lock:
+            self._objects[(Bucket, Key)] = (bytes(Body), ContentType)
+        return {'ETag': f'"{hash((Bucket, Key)) & 0xffffffff:08x}"'}
+
+    def get_object(self, Bucket: str, Key: str, **kwargs):
+        self._round_trip()
+        with self._lock:
+            if (Bucket, Key) not in self._objects:
+                raise self._not_found('GetObject', Key)
+            body, content_type = self._objects[(Bucket, Key)]
+        return {'Body': io.BytesIO(body), 'ContentType': content_type, 'ContentLength': len(body)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs):
+        self._round_trip()
+        with self._lock:
+            if (Bucket, Key) not in self._objects:
+                raise self._not_found('HeadObject', Key)
+            body, content_type = self._objects[(Bucket, Key)]
+        return {'ContentType': content_type, 'ContentLength': len(body)}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs):
+        self._round_trip()
+        with self._lock:
+            self._objects.pop((Bucket, Key), None)
+        return {}
+
+    def copy_object(self, Bucket: str, CopySource: dict, Key: str, **kwargs):
+        self._round_trip()
+        with self._lock:
+            source = (CopySource['Bucket'], CopySource['Key'])
+            if source not in self._objects:
+                raise self._not_found('CopyObject', CopySource['Key'])
+            self._objects[(Bucket, Key)] = self._objects[source]
+        return {}
+
+    def upload_file(self, Filename: str, Bucket: str, Key: str, ExtraArgs: dict = None, **kwargs):
+        with open(Filename, 'rb') as f:
+            self.put_object(Bucket=Bucket, Key=Key, Body=f.read(), **(ExtraArgs or {}))
+
+    def download_file(self, Bucket: str, Key: str, Filename: str, **kwargs):
+        body = self.get_object(Bucket=Bucket, Key=Key)['Body'].read()
+        with open(Filename, 'wb') as f:
+            f.write(body)
+
+    def generate_presigned_url(self, ClientMethod: str, Params: dict = None, ExpiresIn: int = 3600, **kwargs):
+        params = Params or {}
+        return (f"https://{params.get('Bucket')}.s3.{self._region}.amazonaws.com/{params.get('Key')}"
+                f"?X-Amz-Expires={ExpiresIn}&X-Amz-Signature=fake")
+
+    def object_count(self) -> int:
+        with self._lock:
+            return len(self._objects)
+
+    def reset(self):
+        with self._lock:
+            self._objects.clear()
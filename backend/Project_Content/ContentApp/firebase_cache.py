@@ -0,0 +1,90 @@
+"""
+Process-local read-through cache for hot Firestore lookups
+
+Each cache is bounded (LRU eviction) and entries expire after a per-entity TTL.
+The DB classes invalidate entries from their write methods; the TTL bounds how
+stale a value can get when another process writes the same document.
+"""
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .config import CACHE_MAX_SIZE, USER_CACHE_TTL, SOCIAL_ACCOUNT_CACHE_TTL, AUTORESPONDER_CACHE_TTL, POST_STATS_CACHE_TTL
+
+
+class TTLCache:
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value). Values are copied so callers can mutate them freely."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self._ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]):
+        """Drop every entry for which predicate(key, value) is true"""
+        for key in [k for k, (_, v) in self._entries.items() if predicate(k, v)]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self._max_size,
+            'ttl_seconds': self._ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Cache instances, keyed as documented next to each
+user_cache = TTLCache('users', CACHE_MAX_SIZE, USER_CACHE_TTL)  # user_id
+social_account_cache = TTLCache('social_accounts', CACHE_MAX_SIZE, SOCIAL_ACCOUNT_CACHE_TTL)  # (user_id, platform)
+autoresponder_cache = TTLCache('autoresponder_settings', CACHE_MAX_SIZE, AUTORESPONDER_CACHE_TTL)  # post_id
+post_stats_cache = TTLCache('post_stats', CACHE_MAX_SIZE, POST_STATS_CACHE_TTL)  # user_id
+
+_caches = [user_cache, social_account_cache, autoresponder_cache, post_stats_cache]
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters for every cache"""
+    return {cache.name: cache.stats() for cache in _caches}
+
+
+def clear_caches():
+    for cache in _caches:
+        cache.clear()
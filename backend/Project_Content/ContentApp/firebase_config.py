@@ -1,24 +1,32 @@
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
 import os
-from .config import FIREBASE_CREDENTIALS_PATH
+from .config import FIREBASE_CREDENTIALS_PATH, FAKE_BACKENDS
 
 # Initialize Firebase Admin SDK
 # The service account JSON file should be placed in the Project_Content directory
 CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), '..', FIREBASE_CREDENTIALS_PATH)
 
-# Check if Firebase is already initialized
-if not firebase_admin._apps:
-    try:
-        cred = credentials.Certificate(CREDENTIALS_PATH)
-        firebase_admin.initialize_app(cred)
-    except FileNotFoundError:
-        raise
-    except Exception as e:
-        raise
-
-# Get Firestore client
-db = firestore.client()
+if FAKE_BACKENDS:
+    # In-memory Firestore; it also hands out document IDs, so it serves as both clients
+    from .fakes import get_fake_firestore
+    db = async_db = get_fake_firestore()
+else:
+    # Check if Firebase is already initialized
+    if not firebase_admin._apps:
+        try:
+            cred = credentials.Certificate(CREDENTIALS_PATH)
+            firebase_admin.initialize_app(cred)
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise
+
+    # Get Firestore clients
+    # The async client is used from request handlers and the scheduler so Firestore
+    # round-trips don't block the event loop; the sync client is kept for ID generation
+    db = firestore.client()
+    async_db = firestore_async.client()
 
 # Collection names
 COLLECTIONS = {
@@ -37,6 +45,10 @@ COLLECTIONS = {
     'insight_reports': 'insight_reports',
     'activities': 'activities',
     'posts': 'posts',
+    'user_stats': 'user_stats',
+    'leases': 'leases',
+    'publish_jobs': 'publish_jobs',
+    'publish_jobs_dead': 'publish_jobs_dead',
 }
 
 
@@ -1,14 +1,372 @@
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import zlib
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
+from google.cloud import firestore
 from google.cloud.firestore_v1 import FieldFilter
-from .firebase_config import db, COLLECTIONS, generate_id
+from .firebase_config import async_db, COLLECTIONS, generate_id
+from .config import LEGACY_TOKEN_LOOKUP, SCHEDULER_SHARDS
+from .firebase_write_buffer import get_write_buffer
+from .firebase_cache import user_cache, social_account_cache, autoresponder_cache
+
+
+# Pagination defaults for list queries
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+# Documents per query when streaming every match of a filter
+STREAM_PAGE_SIZE = 500
+
+# Documents per get_all RPC and values per 'in' filter (Firestore allows 30 disjunctions)
+GET_ALL_CHUNK_SIZE = 100
+IN_FILTER_LIMIT = 30
+
+# user_stats transactions in flight at once during a full rebuild
+REBUILD_CONCURRENCY = 50
+
+
+# Compact projections for list screens; full documents are still available by ID
+ACTIVITY_SUMMARY_FIELDS = [
+    'id', 'type', 'action', 'description', 'platform', 'content_type', 'content_id', 'created_at'
+]
+GENERATED_CONTENT_SUMMARY_FIELDS = [
+    'id', 'type', 'prompt', 'file_url', 'caption', 'status', 'created_at'
+]
+
+_FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded"""
+    pass
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a field projection contains an invalid field name"""
+    pass
+
+
+def parse_fields(fields: Optional[str], summary_fields: List[str]) -> Optional[List[str]]:
+    """
+    Parse a `fields` query parameter: None for full documents, 'summary' for the
+    entity's summary projection, or a comma-separated list of field names.
+    """
+    if not fields:
+        return None
+    if fields == 'summary':
+        return summary_fields
+    
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    invalid = [name for name in names if not _FIELD_NAME.match(name)]
+    if invalid or not names:
+        raise InvalidFieldsError(f"Invalid fields: {', '.join(invalid) or fields}")
+    return names
+
+
+def to_utc_datetime(value: Any) -> Optional[datetime]:
+    """
+    Coerce an ISO string, datetime or Firestore timestamp to an aware UTC datetime.
+    Raises ValueError for anything else.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    elif not isinstance(value, datetime) and hasattr(value, 'timestamp'):
+        value = datetime.fromtimestamp(value.timestamp(), tz=timezone.utc)
+    if not isinstance(value, datetime):
+        raise ValueError(f"Not a timestamp: {value!r}")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def shard_for(post_id: str, shards: int = SCHEDULER_SHARDS) -> int:
+    """The scheduler shard a post and its autoresponder settings belong to"""
+    return zlib.crc32(post_id.encode()) % shards
+
+
+def encode_cursor(value: Any, doc_id: str) -> str:
+    """Encode the ordering value and document ID of the last item into an opaque cursor"""
+    if isinstance(value, datetime):
+        payload = {'t': 'dt', 'v': value.isoformat(), 'id': doc_id}
+    else:
+        payload = {'t': 'raw', 'v': value, 'id': doc_id}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    """Decode a cursor produced by encode_cursor into (ordering value, document ID)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload['v']
+        if payload.get('t') == 'dt':
+            value = datetime.fromisoformat(value)
+        return value, payload['id']
+    except Exception:
+        raise InvalidCursorError('Invalid pagination cursor')
+
+
+async def fetch_page(
+    query,
+    order_field: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    direction: str = 'DESCENDING',
+    fields: Optional[List[str]] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Run `query` ordered by `order_field` (ties broken by document ID) and return
+    one page of results plus the cursor for the next page, or None on the last page.
+    `fields` limits the returned fields; the ordering field is always included.
+    """
+    if fields:
+        query = query.select(list(dict.fromkeys([*fields, order_field])))
+    query = query.order_by(order_field, direction=direction).order_by('__name__', direction=direction)
+    if cursor:
+        value, doc_id = decode_cursor(cursor)
+        query = query.start_after({order_field: value, '__name__': doc_id})
+
+    # Fetch one extra document to know whether another page exists
+    docs = await query.limit(page_size + 1).get()
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+
+    next_cursor = None
+    if has_more and docs:
+        last = docs[-1]
+        next_cursor = encode_cursor(last.get(order_field), last.id)
+
+    return [doc.to_dict() for doc in docs], next_cursor
+
+
+async def count_query(query) -> int:
+    """Count the documents matching `query` with a server-side aggregation"""
+    results = await query.count(alias='count').get()
+    return int(results[0][0].value) if results and results[0] else 0
+
+
+async def get_many(collection: str, ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, dict]:
+    """
+    Fetch documents by ID with batched get_all calls, returns {id: data} for
+    the ones that exist. Chunks are fetched concurrently.
+    """
+    unique_ids = list(dict.fromkeys(i for i in ids if i))
+    if not unique_ids:
+        return {}
+    
+    collection_ref = async_db.collection(collection)
+    
+    async def fetch_chunk(chunk: List[str]) -> List[Any]:
+        refs = [collection_ref.document(doc_id) for doc_id in chunk]
+        return [snapshot async for snapshot in async_db.get_all(refs, field_paths=fields)]
+    
+    chunks = await asyncio.gather(*(
+        fetch_chunk(unique_ids[start:start + GET_ALL_CHUNK_SIZE])
+        for start in range(0, len(unique_ids), GET_ALL_CHUNK_SIZE)
+    ))
+    # get_all doesn't preserve order, so key the results by ID
+    return {snapshot.id: snapshot.to_dict() for chunk in chunks for snapshot in chunk if snapshot.exists}
+
+
+async def stream_where(collection: str, field: str, value: Any, page_size: int = STREAM_PAGE_SIZE) -> AsyncIterator[dict]:
+    """
+    Yield every document where `field == value`, streamed one page at a time
+    in document ID order so memory and RPC length stay bounded however many
+    documents match.
+    """
+    query = async_db.collection(collection).where(
+        filter=FieldFilter(field, '==', value)
+    ).order_by('__name__').limit(page_size)
+    
+    last = None
+    while True:
+        page = query.start_after(last) if last is not None else query
+        count = 0
+        async for doc in page.stream():
+            count += 1
+            last = doc
+            yield doc.to_dict()
+        if count < page_size:
+            return
+
+
+async def delete_older_than(collection: str, field: str, cutoff: datetime, limit: int) -> int:
+    """
+    Delete up to `limit` documents whose `field` is before `cutoff` in one
+    batch, returns how many were deleted. Single-field range, so no composite
+    index is needed.
+    """
+    docs = await async_db.collection(collection).where(
+        filter=FieldFilter(field, '<', cutoff)
+    ).select([field]).limit(min(limit, 500)).get()
+    if not docs:
+        return 0
+    
+    batch = async_db.batch()
+    for doc in docs:
+        batch.delete(doc.reference)
+    await batch.commit()
+    return len(docs)
+
+
+class UserStatsDB:
+    """
+    Per-user post counters in user_stats/{user_id}: total, by_status,
+    by_platform and by_media_type. Writers apply the delta between a post's
+    old and new state in the same batch or transaction as the post write.
+    A delta on a user whose counters were never recounted creates a document
+    holding only that delta; rebuilt_at marks documents that are complete.
+    """
+    collection = COLLECTIONS['user_stats']
+    
+    # Post fields the counters depend on
+    counted_fields = {'user_id', 'status', 'platforms', 'media_type'}
+    
+    @staticmethod
+    def _contribution(post: Optional[dict]) -> Counter:
+        """The counter increments a single post accounts for"""
+        counts = Counter()
+        if not post:
+            return counts
+        counts[('total', None)] += 1
+        counts[('by_status', post.get('status') or 'unknown')] += 1
+        counts[('by_media_type', post.get('media_type') or 'unknown')] += 1
+        for platform in set(post.get('platforms') or []):
+            counts[('by_platform', platform)] += 1
+        return counts
+    
+    @staticmethod
+    def delta(before: Optional[dict], after: Optional[dict]) -> Dict[Tuple[str, Optional[str]], int]:
+        """Counter changes for a post going from `before` to `after` (None = absent)"""
+        counts = UserStatsDB._contribution(after)
+        counts.subtract(UserStatsDB._contribution(before))
+        return {key: amount for key, amount in counts.items() if amount}
+    
+    @staticmethod
+    def apply(writer, user_id: Optional[str], delta: Dict[Tuple[str, Optional[str]], int]):
+        """Add increments for `delta` to a WriteBatch or Transaction"""
+        if not user_id or not delta:
+            return
+        
+        data = {'updated_at': datetime.now(timezone.utc)}
+        for (group, key), amount in delta.items():
+            if key is None:
+                data[group] = firestore.Increment(amount)
+            else:
+                data.setdefault(group, {})[key] = firestore.Increment(amount)
+        writer.set(async_db.collection(UserStatsDB.collection).document(user_id), data, merge=True)
+    
+    @staticmethod
+    def _to_document(counts: Counter) -> dict:
+        stats = {'total': 0, 'by_status': {}, 'by_platform': {}, 'by_media_type': {}}
+        for (group, key), amount in counts.items():
+            if key is None:
+                stats[group] = amount
+            elif amount:
+                stats[group][key] = amount
+        stats['updated_at'] = stats['rebuilt_at'] = datetime.now(timezone.utc)
+        return stats
+    
+    @staticmethod
+    async def get(user_id: str) -> Optional[dict]:
+        doc = await async_db.collection(UserStatsDB.collection).document(user_id).get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
+    
+    @staticmethod
+    async def get_complete(user_id: str) -> dict:
+        """A user's counters, recounting them first if they have never been rebuilt"""
+        stats = await UserStatsDB.get(user_id)
+        if stats is None or 'rebuilt_at' not in stats:
+            stats = await UserStatsDB.rebuild(user_id)
+        return stats
+    
+    @staticmethod
+    async def rebuild(user_id: str, attempts: int = 3) -> dict:
+        """
+        Recount a user's posts from scratch and overwrite their counters. A
+        recount that a delta overtakes is started again, up to `attempts`
+        times; after that the counters are left as they are and returned.
+        """
+        query = async_db.collection(COLLECTIONS['posts']).where(
+            filter=FieldFilter('user_id', '==', user_id)
+        ).select(['status', 'platforms', 'media_type'])
+        
+        for _ in range(attempts):
+            started = datetime.now(timezone.utc)
+            counts = Counter()
+            async for doc in query.stream():
+                counts.update(UserStatsDB._contribution(doc.to_dict()))
+            
+            stats = await UserStatsDB._overwrite_unless_changed(user_id, counts, started)
+            if stats is not None:
+                return stats
+        return await UserStatsDB.get(user_id) or UserStatsDB._to_document(Counter())
+    
+    @staticmethod
+    async def _overwrite_unless_changed(user_id: str, counts: Counter, since: datetime) -> Optional[dict]:
+        """Replace a user's counters with `counts` unless a delta has landed since `since`, returns what was written"""
+        stats_ref = async_db.collection(UserStatsDB.collection).document(user_id)
+        
+        @firestore.async_transactional
+        async def overwrite_in_transaction(transaction):
+            snapshot = await stats_ref.get(transaction=transaction)
+            if snapshot.exists:
+                updated_at = to_utc_datetime(snapshot.to_dict().get('updated_at'))
+                if updated_at and updated_at >= since:
+                    return None
+            stats = UserStatsDB._to_document(counts)
+            transaction.set(stats_ref, stats)
+            return stats
+        
+        return await overwrite_in_transaction(async_db.transaction())
+    
+    @staticmethod
+    async def rebuild_all() -> int:
+        """
+        Recount every user's counters in one pass over the posts collection.
+        The scan isn't a snapshot, so a user whose counters took a delta after it
+        began may have been counted half before and half after that write; they
+        are left alone until the next pass. Returns the number of user_stats
+        documents written.
+        """
+        started = datetime.now(timezone.utc)
+        per_user: Dict[str, Counter] = {}
+        query = async_db.collection(COLLECTIONS['posts']).select(['user_id', 'status', 'platforms', 'media_type'])
+        async for doc in query.stream():
+            post = doc.to_dict()
+            if post.get('user_id'):
+                per_user.setdefault(post['user_id'], Counter()).update(UserStatsDB._contribution(post))
+        
+        # Users whose posts were all deleted still need their counters zeroed
+        async for doc in async_db.collection(UserStatsDB.collection).select([]).stream():
+            per_user.setdefault(doc.id, Counter())
+        
+        user_ids = list(per_user)
+        written = 0
+        for i in range(0, len(user_ids), REBUILD_CONCURRENCY):
+            results = await asyncio.gather(*(
+                UserStatsDB._overwrite_unless_changed(user_id, per_user[user_id], started)
+                for user_id in user_ids[i:i + REBUILD_CONCURRENCY]
+            ))
+            written += sum(1 for stats in results if stats is not None)
+        return written
 
 
 class UserDB:
     collection = COLLECTIONS['users']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         user_id = generate_id()
         user_data = {
             'id': user_id,
@@ -22,19 +380,41 @@ class UserDB:
             'phone_number': data.get('phone_number', ''),
             'created_at': datetime.now(timezone.utc)
         }
-        db.collection(COLLECTIONS['users']).document(user_id).set(user_data)
+        await async_db.collection(COLLECTIONS['users']).document(user_id).set(user_data)
+        user_cache.invalidate(user_id)
         return user_data
     
     @staticmethod
-    def get_by_id(user_id: str) -> Optional[dict]:
-        doc = db.collection(COLLECTIONS['users']).document(user_id).get()
-        if doc.exists:
-            return doc.to_dict()
-        return None
+    async def get_by_id(user_id: str) -> Optional[dict]:
+        found, cached = user_cache.get(user_id)
+        if found:
+            return cached
+        
+        doc = await async_db.collection(COLLECTIONS['users']).document(user_id).get()
+        user = doc.to_dict() if doc.exists else None
+        user_cache.set(user_id, user)
+        return user
     
     @staticmethod
-    def get_by_username(username: str) -> Optional[dict]:
-        docs = db.collection(COLLECTIONS['users']).where(
+    async def get_many(user_ids: List[str]) -> Dict[str, dict]:
+        users = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            found, cached = user_cache.get(user_id)
+            if not found:
+                missing.append(user_id)
+            elif cached is not None:
+                users[user_id] = cached
+        
+        fetched = await get_many(COLLECTIONS['users'], missing)
+        for user_id in missing:
+            user_cache.set(user_id, fetched.get(user_id))
+        users.update(fetched)
+        return users
+    
+    @staticmethod
+    async def get_by_username(username: str) -> Optional[dict]:
+        docs = await async_db.collection(COLLECTIONS['users']).where(
             filter=FieldFilter('username', '==', username)
         ).limit(1).get()
         for doc in docs:
@@ -42,8 +422,8 @@ class UserDB:
         return None
     
     @staticmethod
-    def get_by_email(email: str) -> Optional[dict]:
-        docs = db.collection(COLLECTIONS['users']).where(
+    async def get_by_email(email: str) -> Optional[dict]:
+        docs = await async_db.collection(COLLECTIONS['users']).where(
             filter=FieldFilter('email', '==', email)
         ).limit(1).get()
         for doc in docs:
@@ -51,54 +431,87 @@ class UserDB:
         return None
     
     @staticmethod
-    def update(user_id: str, data: dict) -> bool:
+    async def update(user_id: str, data: dict) -> bool:
         try:
-            db.collection(COLLECTIONS['users']).document(user_id).update(data)
+            await async_db.collection(COLLECTIONS['users']).document(user_id).update(data)
             return True
         except Exception:
             return False
+        finally:
+            user_cache.invalidate(user_id)
     
     @staticmethod
-    def delete(user_id: str) -> bool:
+    async def delete(user_id: str) -> bool:
         try:
-            db.collection(COLLECTIONS['users']).document(user_id).delete()
+            await async_db.collection(COLLECTIONS['users']).document(user_id).delete()
             return True
         except Exception:
             return False
+        finally:
+            user_cache.invalidate(user_id)
+
+
+def hash_token(token: str) -> str:
+    """SHA-256 of a secret token, used as its document ID so lookups are a single get"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def _get_legacy_token(collection: str, token: str, flag_field: str) -> Optional[dict]:
+    """
+    Find a token stored before tokens were keyed by hash (random document ID
+    plus a raw 'token' field) and move it under its hashed ID.
+    """
+    if not LEGACY_TOKEN_LOOKUP:
+        return None
+    
+    docs = await async_db.collection(collection).where(
+        filter=FieldFilter('token', '==', token)
+    ).where(
+        filter=FieldFilter(flag_field, '==', False)
+    ).limit(1).get()
+    for doc in docs:
+        token_id = hash_token(token)
+        data = doc.to_dict()
+        data.pop('token', None)
+        data['id'] = token_id
+        
+        batch = async_db.batch()
+        batch.set(async_db.collection(collection).document(token_id), data)
+        batch.delete(doc.reference)
+        await batch.commit()
+        return data
+    return None
 
 
 class RefreshTokenDB:
     collection = COLLECTIONS['refresh_tokens']
     
     @staticmethod
-    def create(user_id: str, token: str, expires_at: datetime) -> dict:
-        token_id = generate_id()
+    async def create(user_id: str, token: str, expires_at: datetime) -> dict:
+        # The raw token is never stored, only its hash as the document ID
+        token_id = hash_token(token)
         token_data = {
             'id': token_id,
             'user_id': user_id,
-            'token': token,
             'created_at': datetime.now(timezone.utc),
             'expires_at': expires_at,
             'revoked': False
         }
-        db.collection(COLLECTIONS['refresh_tokens']).document(token_id).set(token_data)
+        await async_db.collection(COLLECTIONS['refresh_tokens']).document(token_id).set(token_data)
         return token_data
     
     @staticmethod
-    def get_by_token(token: str) -> Optional[dict]:
-        docs = db.collection(COLLECTIONS['refresh_tokens']).where(
-            filter=FieldFilter('token', '==', token)
-        ).where(
-            filter=FieldFilter('revoked', '==', False)
-        ).limit(1).get()
-        for doc in docs:
-            return doc.to_dict()
-        return None
+    async def get_by_token(token: str) -> Optional[dict]:
+        doc = await async_db.collection(COLLECTIONS['refresh_tokens']).document(hash_token(token)).get()
+        if doc.exists:
+            data = doc.to_dict()
+            return None if data.get('revoked') else data
+        return await _get_legacy_token(COLLECTIONS['refresh_tokens'], token, 'revoked')
     
     @staticmethod
-    def revoke(token_id: str) -> bool:
+    async def revoke(token_id: str) -> bool:
         try:
-            db.collection(COLLECTIONS['refresh_tokens']).document(token_id).update({
+            await async_db.collection(COLLECTIONS['refresh_tokens']).document(token_id).update({
                 'revoked': True
             })
             return True
@@ -106,60 +519,74 @@ class RefreshTokenDB:
             return False
     
     @staticmethod
-    def revoke_all_for_user(user_id: str) -> bool:
+    async def revoke_all_for_user(user_id: str) -> bool:
         try:
-            docs = db.collection(COLLECTIONS['refresh_tokens']).where(
+            docs = await async_db.collection(COLLECTIONS['refresh_tokens']).where(
                 filter=FieldFilter('user_id', '==', user_id)
+            ).where(
+                filter=FieldFilter('revoked', '==', False)
             ).get()
-            for doc in docs:
-                doc.reference.update({'revoked': True})
+            
+            # One batched write per 500 tokens (Firestore's batch limit)
+            for start in range(0, len(docs), 500):
+                batch = async_db.batch()
+                for doc in docs[start:start + 500]:
+                    batch.update(doc.reference, {'revoked': True})
+                await batch.commit()
             return True
         except Exception:
             return False
+    
+    @staticmethod
+    async def purge_expired(cutoff: datetime, limit: int) -> int:
+        """Delete tokens that expired before `cutoff`, revoked or not"""
+        return await delete_older_than(COLLECTIONS['refresh_tokens'], 'expires_at', cutoff, limit)
 
 class PasswordResetTokenDB:
     collection = COLLECTIONS['password_reset_tokens']
     
     @staticmethod
-    def create(email: str, token: str, expires_at: datetime) -> dict:
-        token_id = generate_id()
+    async def create(email: str, token: str, expires_at: datetime) -> dict:
+        # The raw token is never stored, only its hash as the document ID
+        token_id = hash_token(token)
         token_data = {
             'id': token_id,
             'email': email,
-            'token': token,
             'created_at': datetime.now(timezone.utc),
             'expires_at': expires_at,
             'used': False
         }
-        db.collection(COLLECTIONS['password_reset_tokens']).document(token_id).set(token_data)
+        await async_db.collection(COLLECTIONS['password_reset_tokens']).document(token_id).set(token_data)
         return token_data
     
     @staticmethod
-    def get_by_token(token: str) -> Optional[dict]:
-        docs = db.collection(COLLECTIONS['password_reset_tokens']).where(
-            filter=FieldFilter('token', '==', token)
-        ).where(
-            filter=FieldFilter('used', '==', False)
-        ).limit(1).get()
-        for doc in docs:
-            return doc.to_dict()
-        return None
+    async def get_by_token(token: str) -> Optional[dict]:
+        doc = await async_db.collection(COLLECTIONS['password_reset_tokens']).document(hash_token(token)).get()
+        if doc.exists:
+            data = doc.to_dict()
+            return None if data.get('used') else data
+        return await _get_legacy_token(COLLECTIONS['password_reset_tokens'], token, 'used')
     
     @staticmethod
-    def mark_as_used(token_id: str) -> bool:
+    async def mark_as_used(token_id: str) -> bool:
         try:
-            db.collection(COLLECTIONS['password_reset_tokens']).document(token_id).update({
+            await async_db.collection(COLLECTIONS['password_reset_tokens']).document(token_id).update({
                 'used': True
             })
             return True
         except Exception:
             return False
+    
+    @staticmethod
+    async def purge_expired(cutoff: datetime, limit: int) -> int:
+        """Delete tokens that expired before `cutoff`, used or not"""
+        return await delete_older_than(COLLECTIONS['password_reset_tokens'], 'expires_at', cutoff, limit)
 
 class GeneratedContentDB:
     collection = COLLECTIONS['generated_content']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         content_id = generate_id()
         content_data = {
             'id': content_id,
@@ -170,41 +597,48 @@ class GeneratedContentDB:
             'owner_id': data.get('owner_id'),
             'created_at': datetime.now(timezone.utc)
         }
-        db.collection(COLLECTIONS['generated_content']).document(content_id).set(content_data)
+        await async_db.collection(COLLECTIONS['generated_content']).document(content_id).set(content_data)
         return content_data
     
     @staticmethod
-    def get_by_id(content_id: str) -> Optional[dict]:
-        doc = db.collection(COLLECTIONS['generated_content']).document(content_id).get()
+    async def get_by_id(content_id: str) -> Optional[dict]:
+        doc = await async_db.collection(COLLECTIONS['generated_content']).document(content_id).get()
         if doc.exists:
             return doc.to_dict()
         return None
     
     @staticmethod
-    def get_by_owner(owner_id: str, content_type: Optional[str] = None) -> List[dict]:
-        query = db.collection(COLLECTIONS['generated_content']).where(
+    async def get_many(content_ids: List[str]) -> Dict[str, dict]:
+        return await get_many(COLLECTIONS['generated_content'], content_ids)
+    
+    @staticmethod
+    async def get_by_owner(
+        owner_id: str,
+        content_type: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        query = async_db.collection(COLLECTIONS['generated_content']).where(
             filter=FieldFilter('owner_id', '==', owner_id)
         )
         if content_type:
             query = query.where(filter=FieldFilter('type', '==', content_type))
         
-        query = query.order_by('created_at', direction='DESCENDING')
-        
-        docs = query.get()
-        return [doc.to_dict() for doc in docs]
+        return await fetch_page(query, 'created_at', page_size, cursor, fields=fields)
     
     @staticmethod
-    def update(content_id: str, data: dict) -> bool:
+    async def update(content_id: str, data: dict) -> bool:
         try:
-            db.collection(COLLECTIONS['generated_content']).document(content_id).update(data)
+            await async_db.collection(COLLECTIONS['generated_content']).document(content_id).update(data)
             return True
         except Exception:
             return False
     
     @staticmethod
-    def delete(content_id: str) -> bool:
+    async def delete(content_id: str) -> bool:
         try:
-            db.collection(COLLECTIONS['generated_content']).document(content_id).delete()
+            await async_db.collection(COLLECTIONS['generated_content']).document(content_id).delete()
             return True
         except Exception:
             return False
@@ -214,7 +648,7 @@ class ContentDB:
     collection = COLLECTIONS['content']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Create new content"""
         content_id = data.get('contentID') or generate_id()
         content_data = {
@@ -231,50 +665,69 @@ class ContentDB:
             'userID': data.get('userID'),
             'schedulerID': data.get('schedulerID')
         }
-        db.collection(COLLECTIONS['content']).document(content_id).set(content_data)
+        await async_db.collection(COLLECTIONS['content']).document(content_id).set(content_data)
         return content_data
     
     @staticmethod
-    def get_by_id(content_id: str) -> Optional[dict]:
+    async def get_by_id(content_id: str) -> Optional[dict]:
         """Get content by ID"""
-        doc = db.collection(COLLECTIONS['content']).document(content_id).get()
+        doc = await async_db.collection(COLLECTIONS['content']).document(content_id).get()
         if doc.exists:
             return doc.to_dict()
         return None
     
     @staticmethod
-    def get_by_user(user_id: str) -> List[dict]:
-        """Get all content for a user"""
-        docs = db.collection(COLLECTIONS['content']).where(
+    async def get_many(content_ids: List[str]) -> Dict[str, dict]:
+        """Get several content items by ID in batched reads"""
+        return await get_many(COLLECTIONS['content'], content_ids)
+    
+    @staticmethod
+    async def get_by_user(
+        user_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of content for a user"""
+        query = async_db.collection(COLLECTIONS['content']).where(
             filter=FieldFilter('userID', '==', user_id)
-        ).order_by('createdAt', direction='DESCENDING').get()
-        return [doc.to_dict() for doc in docs]
+        )
+        return await fetch_page(query, 'createdAt', page_size, cursor, fields=fields)
     
     @staticmethod
-    def update(content_id: str, data: dict) -> bool:
+    async def update(content_id: str, data: dict) -> bool:
         """Update content"""
         try:
-            db.collection(COLLECTIONS['content']).document(content_id).update(data)
+            await async_db.collection(COLLECTIONS['content']).document(content_id).update(data)
             return True
         except Exception:
             return False
     
     @staticmethod
-    def delete(content_id: str) -> bool:
+    async def delete(content_id: str) -> bool:
         """Delete content"""
         try:
-            db.collection(COLLECTIONS['content']).document(content_id).delete()
+            await async_db.collection(COLLECTIONS['content']).document(content_id).delete()
             return True
         except Exception:
             return False
 
 
 
+def _invalidate_social_accounts(user_id: Optional[str] = None, account_id: Optional[str] = None):
+    """Drop cached account lists for a user, or every cached list containing account_id"""
+    social_account_cache.invalidate_where(
+        lambda key, accounts: key[0] == user_id or any(
+            a.get('accountID') == account_id for a in accounts or []
+        )
+    )
+
+
 class LinkedAccountDB:
     collection = COLLECTIONS['linked_accounts']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Create a new linked account"""
         account_id = data.get('accountID') or generate_id()
         account_data = {
@@ -286,32 +739,40 @@ class LinkedAccountDB:
             'userID': data.get('userID'),
             'created_at': datetime.now(timezone.utc)
         }
-        db.collection(COLLECTIONS['linked_accounts']).document(account_id).set(account_data)
+        await async_db.collection(COLLECTIONS['linked_accounts']).document(account_id).set(account_data)
+        _invalidate_social_accounts(user_id=account_data.get('userID'))
         return account_data
     
     @staticmethod
-    def get_by_user(user_id: str) -> List[dict]:
-        """Get all linked accounts for a user"""
-        docs = db.collection(COLLECTIONS['linked_accounts']).where(
+    async def get_by_user(
+        user_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of linked accounts for a user"""
+        query = async_db.collection(COLLECTIONS['linked_accounts']).where(
             filter=FieldFilter('userID', '==', user_id)
-        ).get()
-        return [doc.to_dict() for doc in docs]
+        )
+        return await fetch_page(query, 'created_at', page_size, cursor, fields=fields)
     
     @staticmethod
-    def delete(account_id: str) -> bool:
+    async def delete(account_id: str) -> bool:
         """Delete a linked account"""
         try:
-            db.collection(COLLECTIONS['linked_accounts']).document(account_id).delete()
+            await async_db.collection(COLLECTIONS['linked_accounts']).document(account_id).delete()
             return True
         except Exception:
             return False
+        finally:
+            _invalidate_social_accounts(account_id=account_id)
 
 
 class NotificationDB:
     collection = COLLECTIONS['notifications']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Create a new notification"""
         notification_id = generate_id()
         notification_data = {
@@ -322,26 +783,33 @@ class NotificationDB:
             'isRead': False,
             'userID': data.get('userID')
         }
-        db.collection(COLLECTIONS['notifications']).document(notification_id).set(notification_data)
+        # Buffered write-behind; falls back to a direct write when the buffer isn't running
+        if not get_write_buffer().add(COLLECTIONS['notifications'], notification_id, notification_data):
+            await async_db.collection(COLLECTIONS['notifications']).document(notification_id).set(notification_data)
         return notification_data
     
     @staticmethod
-    def get_by_user(user_id: str, unread_only: bool = False) -> List[dict]:
-        """Get notifications for a user"""
-        query = db.collection(COLLECTIONS['notifications']).where(
+    async def get_by_user(
+        user_id: str,
+        unread_only: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of notifications for a user"""
+        query = async_db.collection(COLLECTIONS['notifications']).where(
             filter=FieldFilter('userID', '==', user_id)
         )
         if unread_only:
             query = query.where(filter=FieldFilter('isRead', '==', False))
         
-        docs = query.order_by('sentAt', direction='DESCENDING').get()
-        return [doc.to_dict() for doc in docs]
+        return await fetch_page(query, 'sentAt', page_size, cursor, fields=fields)
     
     @staticmethod
-    def mark_as_read(notification_id: str) -> bool:
+    async def mark_as_read(notification_id: str) -> bool:
         """Mark a notification as read"""
         try:
-            db.collection(COLLECTIONS['notifications']).document(notification_id).update({
+            await async_db.collection(COLLECTIONS['notifications']).document(notification_id).update({
                 'isRead': True
             })
             return True
@@ -354,7 +822,7 @@ class SubscriptionDB:
     collection = COLLECTIONS['subscriptions']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Create a new subscription"""
         subscription_id = generate_id()
         subscription_data = {
@@ -366,13 +834,13 @@ class SubscriptionDB:
             'transactionID': data.get('transactionID'),
             'userID': data.get('userID')
         }
-        db.collection(COLLECTIONS['subscriptions']).document(subscription_id).set(subscription_data)
+        await async_db.collection(COLLECTIONS['subscriptions']).document(subscription_id).set(subscription_data)
         return subscription_data
     
     @staticmethod
-    def get_by_user(user_id: str) -> Optional[dict]:
+    async def get_by_user(user_id: str) -> Optional[dict]:
         """Get active subscription for a user"""
-        docs = db.collection(COLLECTIONS['subscriptions']).where(
+        docs = await async_db.collection(COLLECTIONS['subscriptions']).where(
             filter=FieldFilter('userID', '==', user_id)
         ).where(
             filter=FieldFilter('status', '==', 'active')
@@ -382,10 +850,10 @@ class SubscriptionDB:
         return None
     
     @staticmethod
-    def update(subscription_id: str, data: dict) -> bool:
+    async def update(subscription_id: str, data: dict) -> bool:
         """Update subscription"""
         try:
-            db.collection(COLLECTIONS['subscriptions']).document(subscription_id).update(data)
+            await async_db.collection(COLLECTIONS['subscriptions']).document(subscription_id).update(data)
             return True
         except Exception:
             return False
@@ -396,7 +864,7 @@ class ActivityDB:
     collection = COLLECTIONS.get('activities', 'activities')
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Create a new activity record"""
         activity_id = generate_id()
         activity_data = {
@@ -411,88 +879,92 @@ class ActivityDB:
             'metadata': data.get('metadata', {}),  # Additional data (caption, scheduled_time, etc.)
             'created_at': datetime.now(timezone.utc)
         }
-        db.collection(ActivityDB.collection).document(activity_id).set(activity_data)
+        # Buffered write-behind; falls back to a direct write when the buffer isn't running
+        if not get_write_buffer().add(ActivityDB.collection, activity_id, activity_data):
+            await async_db.collection(ActivityDB.collection).document(activity_id).set(activity_data)
         return activity_data
     
     @staticmethod
-    def get_by_user(user_id: str, limit: int = 50) -> List[dict]:
-        """Get recent activities for a user"""
-        try:
-            # Try with ordering first (requires composite index)
-            docs = db.collection(ActivityDB.collection).where(
-                filter=FieldFilter('user_id', '==', user_id)
-            ).order_by('created_at', direction='DESCENDING').limit(limit).get()
-            return [doc.to_dict() for doc in docs]
-        except Exception as e:
-            # Fallback if composite index doesn't exist - fetch without ordering
-            try:
-                docs = db.collection(ActivityDB.collection).where(
-                    filter=FieldFilter('user_id', '==', user_id)
-                ).limit(limit).get()
-                # Sort in Python as fallback
-                activities = [doc.to_dict() for doc in docs]
-                # Safe sort that handles missing or None created_at
-                def get_sort_key(x):
-                    created = x.get('created_at')
-                    if created is None:
-                        return datetime(1970, 1, 1, tzinfo=timezone.utc)
-                    if hasattr(created, 'timestamp'):
-                        return created
-                    return datetime(1970, 1, 1, tzinfo=timezone.utc)
-                activities.sort(key=get_sort_key, reverse=True)
-                return activities
-            except Exception as e2:
-                return []
-    
-    @staticmethod
-    def get_by_id(activity_id: str) -> Optional[dict]:
+    async def get_by_user(
+        user_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of recent activities for a user"""
+        query = async_db.collection(ActivityDB.collection).where(
+            filter=FieldFilter('user_id', '==', user_id)
+        )
+        return await fetch_page(query, 'created_at', page_size, cursor, fields=fields)
+    
+    @staticmethod
+    async def get_by_id(activity_id: str) -> Optional[dict]:
         """Get activity by ID"""
-        doc = db.collection(ActivityDB.collection).document(activity_id).get()
+        doc = await async_db.collection(ActivityDB.collection).document(activity_id).get()
         if doc.exists:
             return doc.to_dict()
         return None
     
     @staticmethod
-    def delete(activity_id: str) -> bool:
+    async def get_many(activity_ids: List[str]) -> Dict[str, dict]:
+        """Get several activities by ID in batched reads"""
+        return await get_many(ActivityDB.collection, activity_ids)
+    
+    @staticmethod
+    async def delete(activity_id: str) -> bool:
         """Delete an activity"""
         try:
-            db.collection(ActivityDB.collection).document(activity_id).delete()
+            await async_db.collection(ActivityDB.collection).document(activity_id).delete()
             return True
         except Exception:
             return False
     
     @staticmethod
-    def get_recent(user_id: str, days: int = 7) -> List[dict]:
-        """Get activities from the last N days"""
+    async def get_recent(
+        user_id: str,
+        days: int = 7,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of activities from the last N days"""
         from datetime import timedelta
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
-        docs = db.collection(ActivityDB.collection).where(
+        query = async_db.collection(ActivityDB.collection).where(
             filter=FieldFilter('user_id', '==', user_id)
         ).where(
             filter=FieldFilter('created_at', '>=', cutoff_date)
-        ).order_by('created_at', direction='DESCENDING').get()
-        return [doc.to_dict() for doc in docs]
+        )
+        return await fetch_page(query, 'created_at', page_size, cursor, fields=fields)
 
 
 class AutoresponderSettingsDB:
     collection = 'autoresponder_settings'
     
     @staticmethod
-    def get_by_post(post_id: str) -> Optional[dict]:
+    async def get_by_post(post_id: str) -> Optional[dict]:
+        found, cached = autoresponder_cache.get(post_id)
+        if found:
+            return cached
+        
         try:
-            doc = db.collection(AutoresponderSettingsDB.collection).document(post_id).get()
-            if doc.exists:
-                return doc.to_dict()
-            return None
+            doc = await async_db.collection(AutoresponderSettingsDB.collection).document(post_id).get()
+            settings = doc.to_dict() if doc.exists else None
+            autoresponder_cache.set(post_id, settings)
+            return settings
         except Exception:
             return None
     
     @staticmethod
-    def get_by_social_post_id(social_post_id: str) -> Optional[dict]:
+    async def get_many(post_ids: List[str]) -> Dict[str, dict]:
+        return await get_many(AutoresponderSettingsDB.collection, post_ids)
+    
+    @staticmethod
+    async def get_by_social_post_id(social_post_id: str) -> Optional[dict]:
         try:
             # Check facebook post ID
-            docs = db.collection(AutoresponderSettingsDB.collection).where(
+            docs = await async_db.collection(AutoresponderSettingsDB.collection).where(
                 filter=FieldFilter('social_post_ids.facebook', '==', social_post_id)
             ).limit(1).get()
             
@@ -500,7 +972,7 @@ class AutoresponderSettingsDB:
                 return doc.to_dict()
             
             # Check instagram post ID
-            docs = db.collection(AutoresponderSettingsDB.collection).where(
+            docs = await async_db.collection(AutoresponderSettingsDB.collection).where(
                 filter=FieldFilter('social_post_ids.instagram', '==', social_post_id)
             ).limit(1).get()
             
@@ -512,7 +984,7 @@ class AutoresponderSettingsDB:
             return None
     
     @staticmethod
-    def save(post_id: str, user_id: str, settings: dict) -> dict:
+    async def save(post_id: str, user_id: str, settings: dict) -> dict:
         try:
             data = {
                 'post_id': post_id,
@@ -523,31 +995,47 @@ class AutoresponderSettingsDB:
                 'response_delay_seconds': settings.get('response_delay_seconds', 30),
                 'social_post_ids': settings.get('social_post_ids', {}),
                 'post_caption': settings.get('post_caption', ''),
+                'shard': shard_for(post_id),
                 'updated_at': datetime.now(timezone.utc)
             }
             
             # Check if exists
-            existing = AutoresponderSettingsDB.get_by_post(post_id)
+            existing = await AutoresponderSettingsDB.get_by_post(post_id)
             if not existing:
                 data['created_at'] = datetime.now(timezone.utc)
             
-            db.collection(AutoresponderSettingsDB.collection).document(post_id).set(data, merge=True)
+            await async_db.collection(AutoresponderSettingsDB.collection).document(post_id).set(data, merge=True)
+            autoresponder_cache.invalidate(post_id)
             return data
         except Exception as e:
             raise e
     
     @staticmethod
-    def delete(post_id: str) -> bool:
+    async def set_comment_cursor(post_id: str, platform: str, cursor: dict):
+        """
+        Store how far the autoresponder has read a platform's comments:
+        social_post_id, since (newest comment time handled) and seen_ids (the
+        comments handled at exactly that time)
+        """
+        await async_db.collection(AutoresponderSettingsDB.collection).document(post_id).update({
+            f'comment_cursors.{platform}': cursor
+        })
+        autoresponder_cache.invalidate(post_id)
+    
+    @staticmethod
+    async def delete(post_id: str) -> bool:
         try:
-            db.collection(AutoresponderSettingsDB.collection).document(post_id).delete()
+            await async_db.collection(AutoresponderSettingsDB.collection).document(post_id).delete()
             return True
         except Exception:
             return False
+        finally:
+            autoresponder_cache.invalidate(post_id)
     
     @staticmethod
-    def get_enabled_for_user(user_id: str) -> List[dict]:
+    async def get_enabled_for_user(user_id: str) -> List[dict]:
         try:
-            docs = db.collection(AutoresponderSettingsDB.collection).where(
+            docs = await async_db.collection(AutoresponderSettingsDB.collection).where(
                 filter=FieldFilter('user_id', '==', user_id)
             ).where(
                 filter=FieldFilter('enabled', '==', True)
@@ -558,11 +1046,15 @@ class AutoresponderSettingsDB:
             return []
 
     @staticmethod
-    def get_all_active() -> List[dict]:
+    async def get_all_active(shards: Optional[List[int]] = None) -> List[dict]:
+        """Enabled settings, only those in `shards` when given"""
         try:
-            docs = db.collection(AutoresponderSettingsDB.collection).where(
+            query = async_db.collection(AutoresponderSettingsDB.collection).where(
                 filter=FieldFilter('enabled', '==', True)
-            ).get()
+            )
+            if shards is not None:
+                query = query.where(filter=FieldFilter('shard', 'in', shards))
+            docs = await query.get()
             return [doc.to_dict() for doc in docs]
         except Exception:
             return []
@@ -572,7 +1064,7 @@ class CommentThreadDB:
     collection = 'comment_threads'
     
     @staticmethod
-    def record_response(data: dict) -> str:
+    async def record_response(data: dict) -> str:
         try:
             comment_id = data.get('comment_id')
             
@@ -592,15 +1084,15 @@ class CommentThreadDB:
                 'replied': True,
                 'created_at': datetime.now(timezone.utc)
             }
-            db.collection(CommentThreadDB.collection).document(comment_id).set(thread_data)
+            await async_db.collection(CommentThreadDB.collection).document(comment_id).set(thread_data)
             return comment_id
         except Exception as e:
             raise e
     
     @staticmethod
-    def get_by_post(post_id: str, limit: int = 50) -> List[dict]:
+    async def get_by_post(post_id: str, limit: int = 50) -> List[dict]:
         try:
-            docs = db.collection(CommentThreadDB.collection).where(
+            docs = await async_db.collection(CommentThreadDB.collection).where(
                 filter=FieldFilter('post_id', '==', post_id)
             ).order_by('created_at', direction='DESCENDING').limit(limit).get()
             
@@ -609,9 +1101,9 @@ class CommentThreadDB:
             return []
     
     @staticmethod
-    def has_responded_to_comment(comment_id: str) -> bool:
+    async def has_responded_to_comment(comment_id: str) -> bool:
         try:
-            doc = db.collection(CommentThreadDB.collection).document(comment_id).get()
+            doc = await async_db.collection(CommentThreadDB.collection).document(comment_id).get()
             if doc.exists:
                 data = doc.to_dict()
                 return data.get('replied', False) == True
@@ -620,15 +1112,15 @@ class CommentThreadDB:
             return False
     
     @staticmethod
-    def mark_as_replied(comment_id: str) -> bool:
+    async def get_many(comment_ids: List[str]) -> Dict[str, dict]:
+        """Threads for the given comments, including unanswered reservations"""
+        return await get_many(CommentThreadDB.collection, comment_ids, fields=['replied', 'reserved_at'])
+    
+    @staticmethod
+    async def mark_as_replied(comment_id: str) -> bool:
         try:
-            doc_ref = db.collection(CommentThreadDB.collection).document(comment_id)
-            doc = doc_ref.get()
-            
-            if doc.exists:
-                return False
-            
-            doc_ref.set({
+            # create() fails if the thread exists, so the check and the write are one call
+            await async_db.collection(CommentThreadDB.collection).document(comment_id).create({
                 'id': comment_id,
                 'comment_id': comment_id,
                 'replied': False,
@@ -637,13 +1129,35 @@ class CommentThreadDB:
             return True
         except Exception:
             return False
+    
+    @staticmethod
+    async def release_stale_reservations(cutoff: datetime, limit: int) -> int:
+        """
+        Delete reservations made before `cutoff` that never became a reply, e.g.
+        from a crashed autoresponder run, so the comment is picked up again.
+        record_response overwrites the reservation without reserved_at, so
+        replied threads never match.
+        """
+        docs = await async_db.collection(CommentThreadDB.collection).where(
+            filter=FieldFilter('reserved_at', '<', cutoff)
+        ).select(['replied']).limit(min(limit, 500)).get()
+        
+        stale = [doc for doc in docs if not doc.get('replied')]
+        if not stale:
+            return 0
+        
+        batch = async_db.batch()
+        for doc in stale:
+            batch.delete(doc.reference)
+        await batch.commit()
+        return len(stale)
 
 
 class SocialAccountDB:
     collection = COLLECTIONS['linked_accounts']
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         account_id = generate_id()
         account_data = {
             'accountID': account_id,
@@ -664,31 +1178,42 @@ class SocialAccountDB:
             'created_at': datetime.now(timezone.utc),
             'updated_at': datetime.now(timezone.utc)
         }
-        db.collection(SocialAccountDB.collection).document(account_id).set(account_data)
+        await async_db.collection(SocialAccountDB.collection).document(account_id).set(account_data)
+        _invalidate_social_accounts(user_id=account_data.get('userID'))
         return account_data
     
     @staticmethod
-    def get_by_id(account_id: str) -> Optional[dict]:
-        doc = db.collection(SocialAccountDB.collection).document(account_id).get()
+    async def get_by_id(account_id: str) -> Optional[dict]:
+        doc = await async_db.collection(SocialAccountDB.collection).document(account_id).get()
         if doc.exists:
             return doc.to_dict()
         return None
     
     @staticmethod
-    def get_by_user(user_id: str, platform: Optional[str] = None) -> List[dict]:
-        query = db.collection(SocialAccountDB.collection).where(
+    async def get_many(account_ids: List[str]) -> Dict[str, dict]:
+        return await get_many(SocialAccountDB.collection, account_ids)
+    
+    @staticmethod
+    async def get_by_user(user_id: str, platform: Optional[str] = None) -> List[dict]:
+        found, cached = social_account_cache.get((user_id, platform))
+        if found:
+            return cached
+        
+        query = async_db.collection(SocialAccountDB.collection).where(
             filter=FieldFilter('userID', '==', user_id)
         )
         
         if platform:
             query = query.where(filter=FieldFilter('platform', '==', platform))
         
-        docs = query.get()
-        return [doc.to_dict() for doc in docs]
+        docs = await query.get()
+        accounts = [doc.to_dict() for doc in docs]
+        social_account_cache.set((user_id, platform), accounts)
+        return accounts
     
     @staticmethod
-    def get_by_page_id(page_id: str) -> Optional[dict]:
-        docs = db.collection(SocialAccountDB.collection).where(
+    async def get_by_page_id(page_id: str) -> Optional[dict]:
+        docs = await async_db.collection(SocialAccountDB.collection).where(
             filter=FieldFilter('pageID', '==', page_id)
         ).limit(1).get()
         
@@ -697,33 +1222,55 @@ class SocialAccountDB:
         return None
     
     @staticmethod
-    def update(account_id: str, data: dict) -> bool:
+    async def get_by_page_ids(page_ids: List[str]) -> Dict[str, dict]:
+        """Accounts connected to any of the given pages, keyed by page ID"""
+        unique_ids = list(dict.fromkeys(i for i in page_ids if i))
+        queries = [
+            async_db.collection(SocialAccountDB.collection).where(
+                filter=FieldFilter('pageID', 'in', unique_ids[start:start + IN_FILTER_LIMIT])
+            ).get()
+            for start in range(0, len(unique_ids), IN_FILTER_LIMIT)
+        ]
+        accounts = {}
+        for docs in await asyncio.gather(*queries):
+            for doc in docs:
+                account = doc.to_dict()
+                accounts.setdefault(account.get('pageID'), account)
+        return accounts
+    
+    @staticmethod
+    async def update(account_id: str, data: dict) -> bool:
         try:
             data['updated_at'] = datetime.now(timezone.utc)
-            db.collection(SocialAccountDB.collection).document(account_id).update(data)
+            await async_db.collection(SocialAccountDB.collection).document(account_id).update(data)
             return True
         except Exception:
             return False
+        finally:
+            _invalidate_social_accounts(account_id=account_id)
     
     @staticmethod
-    def delete(account_id: str) -> bool:
+    async def delete(account_id: str) -> bool:
         try:
-            db.collection(SocialAccountDB.collection).document(account_id).delete()
+            await async_db.collection(SocialAccountDB.collection).document(account_id).delete()
             return True
         except Exception:
             return False
+        finally:
+            _invalidate_social_accounts(account_id=account_id)
 
 
 class OAuthStateDB:
     collection = 'oauth_states'
     
     @staticmethod
-    def create(user_id: str, platform: str, redirect_url: Optional[str] = None) -> str:
+    async def create(user_id: str, platform: str, redirect_url: Optional[str] = None) -> str:
         import secrets
         from datetime import timedelta
         state = secrets.token_urlsafe(32)
+        state_id = hash_token(state)
         state_data = {
-            'state': state,
+            'id': state_id,
             'user_id': user_id,
             'platform': platform,
             'redirect_url': redirect_url,
@@ -731,12 +1278,13 @@ class OAuthStateDB:
             'expires_at': datetime.now(timezone.utc) + timedelta(minutes=10),
             'used': False
         }
-        db.collection(OAuthStateDB.collection).document(state).set(state_data)
+        await async_db.collection(OAuthStateDB.collection).document(state_id).set(state_data)
         return state
     
     @staticmethod
-    def get_and_validate(state: str) -> Optional[dict]:
-        doc = db.collection(OAuthStateDB.collection).document(state).get()
+    async def get_and_validate(state: str) -> Optional[dict]:
+        state_ref = async_db.collection(OAuthStateDB.collection).document(hash_token(state))
+        doc = await state_ref.get()
         if not doc.exists:
             return None
         
@@ -747,13 +1295,18 @@ class OAuthStateDB:
         if data.get('expires_at') and data['expires_at'].replace(tzinfo=timezone.utc) < datetime.now(timezone.utc):
             return None
         
-        db.collection(OAuthStateDB.collection).document(state).update({'used': True})
+        await state_ref.update({'used': True})
         
         return data
     
     @staticmethod
-    def delete(state: str):
-        db.collection(OAuthStateDB.collection).document(state).delete()
+    async def delete(state: str):
+        await async_db.collection(OAuthStateDB.collection).document(hash_token(state)).delete()
+    
+    @staticmethod
+    async def purge_expired(cutoff: datetime, limit: int) -> int:
+        """Delete states that expired before `cutoff`, used or not"""
+        return await delete_older_than(OAuthStateDB.collection, 'expires_at', cutoff, limit)
 
 
 class PublishedPostDB:
@@ -761,7 +1314,7 @@ class PublishedPostDB:
     collection = 'published_posts'
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Record a published post"""
         record_id = generate_id()
         record_data = {
@@ -776,13 +1329,83 @@ class PublishedPostDB:
             'error_message': data.get('error_message'),
             'published_at': datetime.now(timezone.utc)
         }
-        db.collection(PublishedPostDB.collection).document(record_id).set(record_data)
+        await async_db.collection(PublishedPostDB.collection).document(record_id).set(record_data)
         return record_data
     
     @staticmethod
-    def get_by_internal_post(internal_post_id: str) -> List[dict]:
+    async def get_by_internal_post(internal_post_id: str) -> List[dict]:
         """Get all published records for an internal post"""
-        docs = db.collection(PublishedPostDB.collection).where(
+        docs = await async_db.collection(PublishedPostDB.collection).where(
             filter=FieldFilter('internal_post_id', '==', internal_post_id)
         ).get()
         return [doc.to_dict() for doc in docs]
+
+
+class LeaseDB:
+    """
+    Time-limited ownership records in leases/{name}: owner, expires_at and
+    heartbeat_at. An owner keeps a lease by renewing it before it expires;
+    anyone can take it over once it has expired.
+    """
+    collection = COLLECTIONS['leases']
+    
+    @staticmethod
+    async def acquire(name: str, owner: str, ttl: float) -> bool:
+        """Take or renew the lease for `ttl` seconds, returns False if someone else holds it"""
+        from datetime import timedelta
+        lease_ref = async_db.collection(LeaseDB.collection).document(name)
+        
+        @firestore.async_transactional
+        async def acquire_in_transaction(transaction):
+            now = datetime.now(timezone.utc)
+            snapshot = await lease_ref.get(transaction=transaction)
+            current = snapshot.to_dict() if snapshot.exists else None
+            
+            if current and current.get('owner') != owner and to_utc_datetime(current.get('expires_at')) > now:
+                return False
+            
+            renewing = bool(current) and current.get('owner') == owner
+            transaction.set(lease_ref, {
+                'name': name,
+                'owner': owner,
+                'acquired_at': current.get('acquired_at') if renewing else now,
+                'heartbeat_at': now,
+                'expires_at': now + timedelta(seconds=ttl)
+            })
+            return True
+        
+        return await acquire_in_transaction(async_db.transaction())
+    
+    @staticmethod
+    async def release(name: str, owner: str) -> bool:
+        """Give up the lease if `owner` still holds it, so another instance can take over at once"""
+        lease_ref = async_db.collection(LeaseDB.collection).document(name)
+        
+        @firestore.async_transactional
+        async def release_in_transaction(transaction):
+            snapshot = await lease_ref.get(transaction=transaction)
+            if not snapshot.exists or snapshot.get('owner') != owner:
+                return False
+            transaction.delete(lease_ref)
+            return True
+        
+        return await release_in_transaction(async_db.transaction())
+    
+    @staticmethod
+    async def get(name: str) -> Optional[dict]:
+        doc = await async_db.collection(LeaseDB.collection).document(name).get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
+    
+    @staticmethod
+    async def list_active(prefix: str) -> List[dict]:
+        """Unexpired leases whose name starts with `prefix`"""
+        docs = await async_db.collection(LeaseDB.collection).where(
+            filter=FieldFilter('name', '>=', prefix)
+        ).where(
+            filter=FieldFilter('name', '<', prefix + '\uf8ff')
+        ).get()
+        now = datetime.now(timezone.utc)
+        leases = [doc.to_dict() for doc in docs]
+        return [lease for lease in leases if to_utc_datetime(lease.get('expires_at')) > now]
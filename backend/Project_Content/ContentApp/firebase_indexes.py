@@ -0,0 +1,91 @@
+"""
+Startup check that the composite indexes in firestore.indexes.json exist
+
+Each manifest entry describes one query shape: every field but the last is an
+equality filter and the last one is the ordering (or range) field. The probe
+runs that shape once with limit(1); Firestore rejects it with
+FailedPrecondition when the index is missing or still building.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List
+
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud.firestore_v1 import FieldFilter
+
+from .firebase_config import async_db
+
+logger = logging.getLogger(__name__)
+
+INDEXES_PATH = os.path.join(os.path.dirname(__file__), '..', 'firestore.indexes.json')
+
+# Any value works: the index requirement depends on the query shape, not the values
+_PROBE_VALUE = '__index_probe__'
+
+# Results of the last verify_indexes() run, keyed by index description
+index_status: Dict[str, str] = {}
+
+
+def load_indexes(path: str = INDEXES_PATH) -> List[dict]:
+    with open(path) as f:
+        return json.load(f).get('indexes', [])
+
+
+def describe_index(index: dict) -> str:
+    fields = ', '.join(
+        f"{field['fieldPath']} {'DESC' if field.get('order') == 'DESCENDING' else 'ASC'}"
+        for field in index['fields']
+    )
+    return f"{index['collectionGroup']}({fields})"
+
+
+def build_probe(index: dict):
+    """The query shape an index entry serves"""
+    *equality_fields, order_field = index['fields']
+    query = async_db.collection(index['collectionGroup'])
+    for field in equality_fields:
+        query = query.where(filter=FieldFilter(field['fieldPath'], '==', _PROBE_VALUE))
+    return query.order_by(order_field['fieldPath'], direction=order_field.get('order', 'ASCENDING')).limit(1)
+
+
+async def _probe(index: dict) -> str:
+    name = describe_index(index)
+    try:
+        await build_probe(index).get()
+        return 'ok'
+    except FailedPrecondition as e:
+        # The error message carries the console link that creates the index
+        logger.critical(
+            "\n" + "!" * 80 +
+            f"\nMISSING FIRESTORE INDEX: {name}\n"
+            "Queries using it will fail until it is created. Deploy firestore.indexes.json with\n"
+            "    firebase deploy --only firestore:indexes\n"
+            f"{e.message}\n" +
+            "!" * 80
+        )
+        return 'missing'
+    except Exception as e:
+        logger.error(f"Index probe for {name} failed: {e}")
+        return 'error'
+
+
+async def verify_indexes() -> Dict[str, str]:
+    """Probe every index in the manifest, returns {index: 'ok' | 'missing' | 'error'}"""
+    try:
+        indexes = load_indexes()
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read index manifest {INDEXES_PATH}: {e}")
+        return {}
+
+    results = await asyncio.gather(*(_probe(index) for index in indexes))
+    index_status.clear()
+    index_status.update({describe_index(index): result for index, result in zip(indexes, results)})
+
+    missing = [name for name, result in index_status.items() if result != 'ok']
+    if missing:
+        logger.critical(f"{len(missing)} of {len(indexes)} Firestore indexes are not usable: {', '.join(missing)}")
+    else:
+        logger.info(f"All {len(indexes)} Firestore indexes verified")
+    return dict(index_status)
@@ -0,0 +1,163 @@
+"""
+Write-behind buffer for fire-and-forget Firestore inserts
+
+Audit-style records (activities, notifications) are queued in memory and
+committed in WriteBatch chunks when the buffer fills up or the flush timer
+fires, so request handlers don't wait on a round-trip per record.
+"""
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from .firebase_config import async_db
+from .config import WRITE_BUFFER_MAX_SIZE, WRITE_BUFFER_FLUSH_INTERVAL, WRITE_BUFFER_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        max_size: int = WRITE_BUFFER_MAX_SIZE,
+        flush_interval: float = WRITE_BUFFER_FLUSH_INTERVAL,
+        max_pending: int = WRITE_BUFFER_MAX_PENDING
+    ):
+        self._max_size = max_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._pending: List[Tuple[str, str, dict]] = []
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'commits': 0,
+            'failed_commits': 0,
+            'overflowed': 0,
+            'dropped': 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def add(self, collection: str, doc_id: str, data: dict) -> bool:
+        """
+        Queue a document write. Returns False when the buffer isn't running or
+        is full, in which case the caller should write the document itself.
+        """
+        if not self._running:
+            return False
+        if len(self._pending) >= self._max_pending:
+            # Commits are failing or falling behind; don't grow without bound
+            self.stats['overflowed'] += 1
+            return False
+
+        self._pending.append((collection, doc_id, data))
+        self.stats['enqueued'] += 1
+
+        if len(self._pending) >= self._max_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        if self._running:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Write buffer started (max_size={self._max_size}, flush_interval={self._flush_interval}s)")
+
+    async def stop(self):
+        """Stop the flush loop and drain everything still queued"""
+        if not self._running:
+            return
+
+        self._running = False
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+        await self.flush()
+        if self.stats['dropped']:
+            logger.error(f"Write buffer stopped - {self.stats['dropped']} writes were lost - {self.stats}")
+        else:
+            logger.info(f"Write buffer stopped - {self.stats}")
+
+    async def _run(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write buffer flush error: {e}")
+
+    async def flush(self):
+        """Commit all queued writes in batches of at most MAX_BATCH_WRITES"""
+        if not self._pending:
+            return
+
+        async with self._flush_lock:
+            while self._pending:
+                chunk = self._pending[:MAX_BATCH_WRITES]
+                del self._pending[:MAX_BATCH_WRITES]
+
+                batch = async_db.batch()
+                for collection, doc_id, data in chunk:
+                    batch.set(async_db.collection(collection).document(doc_id), data)
+
+                try:
+                    await batch.commit()
+                    self.stats['commits'] += 1
+                    self.stats['written'] += len(chunk)
+                except Exception as e:
+                    self.stats['failed_commits'] += 1
+                    if self._running:
+                        # Put the chunk back and retry on the next tick, dropping the oldest
+                        # writes past the cap
+                        overflow = max(len(self._pending) + len(chunk) - self._max_pending, 0)
+                        self._pending[:0] = chunk[overflow:]
+                        self.stats['dropped'] += overflow
+                        dropped = f" and dropped {overflow}" if overflow else ""
+                        logger.error(f"Write buffer commit failed, will retry {len(chunk) - overflow} writes{dropped}: {e}")
+                    else:
+                        lost = len(chunk) + len(self._pending)
+                        self._pending.clear()
+                        self.stats['dropped'] += lost
+                        logger.error(f"Write buffer commit failed during shutdown, dropped {lost} writes: {e}")
+                    return
+
+
+# Global buffer instance
+_write_buffer: Optional[WriteBehindBuffer] = None
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    """Get the global write buffer instance"""
+    global _write_buffer
+    if _write_buffer is None:
+        _write_buffer = WriteBehindBuffer()
+    return _write_buffer
+
+
+async def start_write_buffer():
+    """Start the global write buffer"""
+    await get_write_buffer().start()
+
+
+async def stop_write_buffer():
+    """Stop the global write buffer and flush pending writes"""
+    await get_write_buffer().stop()
@@ -0,0 +1,434 @@
+"""
+Durable job queue for scheduled-post publishing
+
+A job is leased for a visibility timeout: if the consumer neither completes
+nor extends it in time (e.g. the process died), it becomes visible again and
+another consumer picks it up. Failed jobs are retried with exponential backoff
+and jitter until max_attempts, then moved to a dead-letter store.
+
+Two backends share the interface: Firestore (publish_jobs and
+publish_jobs_dead collections) for deployments, and SQLite for local runs
+and tests.
+"""
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import random
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence
+
+from google.cloud import firestore
+from google.cloud.firestore_v1 import FieldFilter
+
+from .config import (
+    PUBLISH_QUEUE_BACKEND,
+    PUBLISH_QUEUE_SQLITE_PATH,
+    PUBLISH_MAX_ATTEMPTS,
+    PUBLISH_RETRY_BASE_DELAY,
+    PUBLISH_RETRY_MAX_DELAY
+)
+from .firebase_config import async_db, COLLECTIONS
+from .firebase_db import count_query, shard_for, to_utc_datetime
+
+
+class JobQueue(ABC):
+    """
+    Jobs are dicts: id, payload, attempts (including the current one),
+    lease_token and last_error. lease() returns jobs with a fresh lease_token;
+    extend(), complete() and fail() only act while that token still holds.
+    A job's scheduler shard is shard_for(its ID), the same as its post's.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = PUBLISH_MAX_ATTEMPTS,
+        base_delay: float = PUBLISH_RETRY_BASE_DELAY,
+        max_delay: float = PUBLISH_RETRY_MAX_DELAY,
+        max_skipped: int = 100
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_skipped = max_skipped
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff after `attempts` tries, with jitter over the upper half"""
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempts - 1, 0))
+        return random.uniform(delay / 2, delay)
+
+    @abstractmethod
+    async def enqueue(self, job_id: str, payload: dict, delay: float = 0) -> bool:
+        """Add a job unless one with this ID is already queued, returns whether it was added"""
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]:
+        """The queued (or leased) job with this ID, None if there is none"""
+
+    @abstractmethod
+    async def lease(
+        self,
+        limit: int,
+        visibility_timeout: float,
+        accept: Optional[Callable[[dict], bool]] = None,
+        defer: float = 0,
+        shards: Optional[Sequence[int]] = None
+    ) -> List[dict]:
+        """
+        Take up to `limit` visible jobs, oldest first, hiding them for
+        `visibility_timeout` seconds. Jobs `accept` turns down are left unleased
+        and, with `defer`, pushed back that many seconds so the jobs behind them
+        come up; they don't use up an attempt. At most max_skipped are turned
+        down per call. With `shards`, only jobs in those shards are leased.
+        """
+
+    @abstractmethod
+    async def extend(self, job: dict, visibility_timeout: float) -> bool:
+        """Keep a leased job hidden for another `visibility_timeout` seconds"""
+
+    @abstractmethod
+    async def complete(self, job: dict) -> bool:
+        """Remove a finished job"""
+
+    @abstractmethod
+    async def fail(self, job: dict, error: str) -> str:
+        """Schedule a retry, or dead-letter the job once it is out of attempts. Returns 'retry' or 'dead'."""
+
+    @abstractmethod
+    async def counts(self) -> dict:
+        """Number of queued (including leased) and dead-lettered jobs"""
+
+
+class FirestoreJobQueue(JobQueue):
+    """Jobs in a Firestore collection; visibility is the available_at timestamp"""
+
+    def __init__(
+        self,
+        collection: str = COLLECTIONS['publish_jobs'],
+        dead_collection: str = COLLECTIONS['publish_jobs_dead'],
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.collection = collection
+        self.dead_collection = dead_collection
+
+    def _ref(self, job_id: str):
+        return async_db.collection(self.collection).document(job_id)
+
+    async def enqueue(self, job_id: str, payload: dict, delay: float = 0) -> bool:
+        job_ref = self._ref(job_id)
+
+        @firestore.async_transactional
+        async def enqueue_in_transaction(transaction):
+            snapshot = await job_ref.get(transaction=transaction)
+            if snapshot.exists:
+                return False
+            now = datetime.now(timezone.utc)
+            transaction.set(job_ref, {
+                'id': job_id,
+                'payload': payload,
+                'attempts': 0,
+                'available_at': now + timedelta(seconds=delay),
+                'lease_token': None,
+                'last_error': None,
+                'shard': shard_for(job_id),
+                'created_at': now
+            })
+            return True
+
+        return await enqueue_in_transaction(async_db.transaction())
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        snapshot = await self._ref(job_id).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    async def lease(
+        self,
+        limit: int,
+        visibility_timeout: float,
+        accept: Optional[Callable[[dict], bool]] = None,
+        defer: float = 0,
+        shards: Optional[Sequence[int]] = None
+    ) -> List[dict]:
+        now = datetime.now(timezone.utc)
+        query = async_db.collection(self.collection).where(
+            filter=FieldFilter('available_at', '<=', now)
+        )
+        if shards is not None:
+            query = query.where(filter=FieldFilter('shard', 'in', list(shards)))
+        query = query.order_by('available_at')
+
+        jobs, skipped, last = [], 0, None
+        while True:
+            page = query.start_after(last) if last else query
+            docs = await page.limit(limit).get()
+            for doc in docs:
+                if len(jobs) >= limit or skipped >= self.max_skipped:
+                    return jobs
+                if accept is None or accept(doc.to_dict()):
+                    job = await self._claim(doc.reference, visibility_timeout)
+                    if job:
+                        jobs.append(job)
+                else:
+                    skipped += 1
+                    if defer:
+                        await self._defer(doc.reference, defer)
+            if len(docs) < limit or len(jobs) >= limit:
+                return jobs
+            last = docs[-1]
+
+    async def _defer(self, job_ref, delay: float):
+        """Push a visible job back `delay` seconds without leasing it"""
+        @firestore.async_transactional
+        async def defer_in_transaction(transaction):
+            snapshot = await job_ref.get(transaction=transaction)
+            if not self._visible(snapshot):
+                return
+            transaction.update(job_ref, {'available_at': datetime.now(timezone.utc) + timedelta(seconds=delay)})
+
+        await defer_in_transaction(async_db.transaction())
+
+    @staticmethod
+    def _visible(snapshot) -> bool:
+        # Another consumer may have leased it since the query ran
+        return snapshot.exists and to_utc_datetime(snapshot.get('available_at')) <= datetime.now(timezone.utc)
+
+    async def _claim(self, job_ref, visibility_timeout: float) -> Optional[dict]:
+        @firestore.async_transactional
+        async def claim_in_transaction(transaction):
+            snapshot = await job_ref.get(transaction=transaction)
+            if not self._visible(snapshot):
+                return None
+            job = snapshot.to_dict()
+            now = datetime.now(timezone.utc)
+            update = {
+                'attempts': job.get('attempts', 0) + 1,
+                'available_at': now + timedelta(seconds=visibility_timeout),
+                'lease_token': uuid.uuid4().hex,
+                'leased_at': now
+            }
+            transaction.update(job_ref, update)
+            return {**job, **update}
+
+        return await claim_in_transaction(async_db.transaction())
+
+    async def _if_leased(self, job: dict, apply) -> bool:
+        """Run apply(transaction, snapshot_data) only while `job`'s lease still holds"""
+        job_ref = self._ref(job['id'])
+
+        @firestore.async_transactional
+        async def check_in_transaction(transaction):
+            snapshot = await job_ref.get(transaction=transaction)
+            if not snapshot.exists or snapshot.get('lease_token') != job.get('lease_token'):
+                return False
+            apply(transaction, snapshot.to_dict())
+            return True
+
+        return await check_in_transaction(async_db.transaction())
+
+    async def extend(self, job: dict, visibility_timeout: float) -> bool:
+        available_at = datetime.now(timezone.utc) + timedelta(seconds=visibility_timeout)
+        return await self._if_leased(
+            job, lambda transaction, _: transaction.update(self._ref(job['id']), {'available_at': available_at})
+        )
+
+    async def complete(self, job: dict) -> bool:
+        return await self._if_leased(job, lambda transaction, _: transaction.delete(self._ref(job['id'])))
+
+    async def fail(self, job: dict, error: str) -> str:
+        now = datetime.now(timezone.utc)
+        if job.get('attempts', 0) >= self.max_attempts:
+            def dead_letter(transaction, data):
+                transaction.set(async_db.collection(self.dead_collection).document(job['id']), {
+                    **data, 'last_error': error, 'lease_token': None, 'failed_at': now
+                })
+                transaction.delete(self._ref(job['id']))
+
+            await self._if_leased(job, dead_letter)
+            return 'dead'
+
+        retry_at = now + timedelta(seconds=self.retry_delay(job.get('attempts', 0)))
+        await self._if_leased(job, lambda transaction, _: transaction.update(self._ref(job['id']), {
+            'available_at': retry_at, 'lease_token': None, 'last_error': error
+        }))
+        return 'retry'
+
+    async def counts(self) -> dict:
+        return {
+            'queued': await count_query(async_db.collection(self.collection)),
+            'dead': await count_query(async_db.collection(self.dead_collection))
+        }
+
+
+class SqliteJobQueue(JobQueue):
+    """Jobs in a local SQLite file; calls run in a worker thread, one at a time"""
+
+    def __init__(self, path: str = PUBLISH_QUEUE_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        # Computed rather than stored, so existing queue files need no migration
+        self._conn.create_function('shard_for', 1, shard_for, deterministic=True)
+        with self._lock:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    lease_token TEXT,
+                    last_error TEXT,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_available_at ON jobs (available_at);
+                CREATE TABLE IF NOT EXISTS dead_jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    failed_at REAL NOT NULL
+                );
+            """)
+
+    @staticmethod
+    def _now() -> float:
+        return datetime.now(timezone.utc).timestamp()
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    async def _run(self, operation):
+        def locked():
+            with self._lock:
+                self._conn.execute('BEGIN IMMEDIATE')
+                try:
+                    result = operation(self._conn)
+                except BaseException:
+                    self._conn.execute('ROLLBACK')
+                    raise
+                self._conn.execute('COMMIT')
+                return result
+
+        return await asyncio.to_thread(locked)
+
+    async def enqueue(self, job_id: str, payload: dict, delay: float = 0) -> bool:
+        now = self._now()
+        return await self._run(lambda conn: conn.execute(
+            'INSERT OR IGNORE INTO jobs (id, payload, available_at, created_at) VALUES (?, ?, ?, ?)',
+            (job_id, json.dumps(payload), now + delay, now)
+        ).rowcount == 1)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        row = await self._run(lambda conn: conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+        return self._to_job(row) if row else None
+
+    async def lease(
+        self,
+        limit: int,
+        visibility_timeout: float,
+        accept: Optional[Callable[[dict], bool]] = None,
+        defer: float = 0,
+        shards: Optional[Sequence[int]] = None
+    ) -> List[dict]:
+        def lease_jobs(conn):
+            now = self._now()
+            in_shards = ''
+            if shards is not None:
+                in_shards = f" AND shard_for(id) IN ({', '.join(str(int(shard)) for shard in shards) or 'NULL'})"
+            rows = conn.execute(
+                f'SELECT * FROM jobs WHERE available_at <= ?{in_shards} ORDER BY available_at LIMIT ?',
+                (now, limit + self.max_skipped)
+            ).fetchall()
+            jobs, skipped = [], 0
+            for row in rows:
+                if len(jobs) >= limit or skipped >= self.max_skipped:
+                    break
+                job = self._to_job(row)
+                if accept is not None and not accept(job):
+                    skipped += 1
+                    if defer:
+                        conn.execute('UPDATE jobs SET available_at = ? WHERE id = ?', (now + defer, job['id']))
+                    continue
+                job.update(attempts=job['attempts'] + 1, available_at=now + visibility_timeout,
+                           lease_token=uuid.uuid4().hex)
+                conn.execute(
+                    'UPDATE jobs SET attempts = ?, available_at = ?, lease_token = ? WHERE id = ?',
+                    (job['attempts'], job['available_at'], job['lease_token'], job['id'])
+                )
+                jobs.append(job)
+            return jobs
+
+        return await self._run(lease_jobs)
+
+    async def extend(self, job: dict, visibility_timeout: float) -> bool:
+        available_at = self._now() + visibility_timeout
+        return await self._run(lambda conn: conn.execute(
+            'UPDATE jobs SET available_at = ? WHERE id = ? AND lease_token = ?',
+            (available_at, job['id'], job.get('lease_token'))
+        ).rowcount == 1)
+
+    async def complete(self, job: dict) -> bool:
+        return await self._run(lambda conn: conn.execute(
+            'DELETE FROM jobs WHERE id = ? AND lease_token = ?', (job['id'], job.get('lease_token'))
+        ).rowcount == 1)
+
+    async def fail(self, job: dict, error: str) -> str:
+        now = self._now()
+        if job.get('attempts', 0) >= self.max_attempts:
+            def dead_letter(conn):
+                row = conn.execute(
+                    'SELECT * FROM jobs WHERE id = ? AND lease_token = ?', (job['id'], job.get('lease_token'))
+                ).fetchone()
+                if row is None:
+                    return
+                conn.execute(
+                    'INSERT OR REPLACE INTO dead_jobs (id, payload, attempts, last_error, created_at, failed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (row['id'], row['payload'], row['attempts'], error, row['created_at'], now)
+                )
+                conn.execute('DELETE FROM jobs WHERE id = ?', (job['id'],))
+
+            await self._run(dead_letter)
+            return 'dead'
+
+        retry_at = now + self.retry_delay(job.get('attempts', 0))
+        await self._run(lambda conn: conn.execute(
+            'UPDATE jobs SET available_at = ?, lease_token = NULL, last_error = ? WHERE id = ? AND lease_token = ?',
+            (retry_at, error, job['id'], job.get('lease_token'))
+        ))
+        return 'retry'
+
+    async def counts(self) -> dict:
+        def count(conn):
+            return {
+                'queued': conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0],
+                'dead': conn.execute('SELECT COUNT(*) FROM dead_jobs').fetchone()[0]
+            }
+
+        return await self._run(count)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Global publish queue instance
+_publish_queue: Optional[JobQueue] = None
+
+
+def get_publish_queue() -> JobQueue:
+    """Get the publish job queue for the configured backend"""
+    global _publish_queue
+    if _publish_queue is None:
+        if PUBLISH_QUEUE_BACKEND == 'sqlite':
+            _publish_queue = SqliteJobQueue()
+        else:
+            _publish_queue = FirestoreJobQueue()
+    return _publish_queue
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.staticfiles import StaticFiles
@@ -9,25 +10,64 @@ import logging
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # Import routers
-from .routers import auth, users, text, images, videos, activities, posts, social, contact
+from .routers import auth, users, text, images, videos, activities, posts, social, contact, metrics
 
 # Initialize Firebase (this will run when the module is imported)
 from . import firebase_config
 
 # Import scheduler
 from .services.post_scheduler import start_scheduler, stop_scheduler
+from .services.leader_election import (
+    start_scheduler_election, stop_scheduler_election,
+    start_maintenance_election, stop_maintenance_election,
+    start_maintenance_jobs, stop_maintenance_jobs
+)
+from .services.shard_coordinator import start_shard_coordinator, stop_shard_coordinator
+from .firebase_write_buffer import start_write_buffer, stop_write_buffer
+from .firebase_indexes import verify_indexes
+from .config import VERIFY_INDEXES_ON_STARTUP, SCHEDULER_LEADER_ELECTION, SCHEDULER_SHARDS
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager - starts/stops background tasks"""
-    # Startup: Start the post scheduler
-    await start_scheduler()
+    # Startup: Start the write buffer before anything can queue into it
+    await start_write_buffer()
+    # Sharded, each worker runs the scheduler for the shards it leases; otherwise with
+    # leader election only the lease holder among all workers runs it
+    if SCHEDULER_SHARDS > 1:
+        await start_shard_coordinator()
+    elif SCHEDULER_LEADER_ELECTION:
+        await start_scheduler_election()
+    else:
+        await start_scheduler()
+    # The stats reconciler, TTL sweeper and publish recovery run in one instance: whichever
+    # holds the maintenance lease once there can be several workers
+    if SCHEDULER_SHARDS > 1 or SCHEDULER_LEADER_ELECTION:
+        await start_maintenance_election()
+    else:
+        await start_maintenance_jobs()
+    
+    # Probe indexes in the background so a slow Firestore doesn't hold up startup
+    index_check = asyncio.create_task(verify_indexes()) if VERIFY_INDEXES_ON_STARTUP else None
     
     yield
     
-    # Shutdown: Stop the post scheduler
-    await stop_scheduler()
+    if index_check and not index_check.done():
+        index_check.cancel()
+    
+    # Shutdown: Stop background tasks, then drain buffered writes
+    if SCHEDULER_SHARDS > 1 or SCHEDULER_LEADER_ELECTION:
+        await stop_maintenance_election()
+    else:
+        await stop_maintenance_jobs()
+    if SCHEDULER_SHARDS > 1:
+        await stop_shard_coordinator()
+    elif SCHEDULER_LEADER_ELECTION:
+        await stop_scheduler_election()
+    else:
+        await stop_scheduler()
+    await stop_write_buffer()
 
 
 app = FastAPI(
@@ -44,6 +84,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -67,6 +108,7 @@ app.include_router(activities.router)
 app.include_router(posts.router)
 app.include_router(social.router)
 app.include_router(contact.router)
+app.include_router(metrics.router)
 
 
 
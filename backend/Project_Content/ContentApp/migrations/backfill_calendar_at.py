@@ -0,0 +1,84 @@
+"""
+Backfill posts for the calendar range query
+
+Older posts may store scheduled_at as an ISO string or naive datetime and have no
+calendar_at at all. This rewrites scheduled_at as a UTC timestamp and sets
+calendar_at (scheduled_at, falling back to created_at) on every post missing it.
+
+Usage (from backend/Project_Content):
+    python -m ContentApp.migrations.backfill_calendar_at [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+
+from ..firebase_config import async_db, COLLECTIONS
+from ..firebase_db import to_utc_datetime
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+
+def calendar_fields(post: dict) -> dict:
+    """The scheduled_at/calendar_at values a post should have, only those that differ"""
+    updates = {}
+
+    scheduled_at = to_utc_datetime(post.get('scheduled_at'))
+    if post.get('scheduled_at') is not None and post.get('scheduled_at') != scheduled_at:
+        updates['scheduled_at'] = scheduled_at
+
+    calendar_at = scheduled_at or to_utc_datetime(post.get('created_at'))
+    if calendar_at and post.get('calendar_at') != calendar_at:
+        updates['calendar_at'] = calendar_at
+
+    return updates
+
+
+async def backfill(dry_run: bool = False) -> dict:
+    stats = {'scanned': 0, 'updated': 0, 'invalid': 0}
+    batch = async_db.batch()
+    pending = 0
+
+    query = async_db.collection(COLLECTIONS['posts']).select(['scheduled_at', 'created_at', 'calendar_at'])
+    async for doc in query.stream():
+        stats['scanned'] += 1
+        try:
+            updates = calendar_fields(doc.to_dict())
+        except ValueError as e:
+            stats['invalid'] += 1
+            logger.warning(f"Skipping post {doc.id}: {e}")
+            continue
+        if not updates:
+            continue
+
+        stats['updated'] += 1
+        if dry_run:
+            continue
+
+        batch.update(doc.reference, updates)
+        pending += 1
+        if pending == MAX_BATCH_WRITES:
+            await batch.commit()
+            batch = async_db.batch()
+            pending = 0
+
+    if pending:
+        await batch.commit()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Count the posts that would change without writing')
+    args = parser.parse_args()
+
+    stats = asyncio.run(backfill(dry_run=args.dry_run))
+    logger.info(f"{'Would update' if args.dry_run else 'Updated'} {stats['updated']} of {stats['scanned']} posts "
+                f"({stats['invalid']} skipped with invalid timestamps)")
+
+
+if __name__ == '__main__':
+    main()
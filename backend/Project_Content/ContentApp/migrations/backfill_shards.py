@@ -0,0 +1,72 @@
+"""
+Backfill scheduler shards on posts and autoresponder settings
+
+Sharded schedulers only query documents carrying a shard field. This sets it
+(shard_for of the post ID) on every post and autoresponder setting where it is
+missing or was computed for a different SCHEDULER_SHARDS.
+
+Usage (from backend/Project_Content), with SCHEDULER_SHARDS set as the workers will run:
+    python -m ContentApp.migrations.backfill_shards [--dry-run]
+"""
+import argparse
+import asyncio
+import logging
+
+from ..config import SCHEDULER_SHARDS
+from ..firebase_config import async_db, COLLECTIONS
+from ..firebase_db import AutoresponderSettingsDB, shard_for
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+
+# Both are keyed by post ID
+SHARDED_COLLECTIONS = [COLLECTIONS['posts'], AutoresponderSettingsDB.collection]
+
+
+async def backfill_collection(collection: str, dry_run: bool = False) -> dict:
+    stats = {'scanned': 0, 'updated': 0}
+    batch = async_db.batch()
+    pending = 0
+
+    async for doc in async_db.collection(collection).select(['shard']).stream():
+        stats['scanned'] += 1
+        shard = shard_for(doc.id)
+        if doc.to_dict().get('shard') == shard:
+            continue
+
+        stats['updated'] += 1
+        if dry_run:
+            continue
+
+        batch.update(doc.reference, {'shard': shard})
+        pending += 1
+        if pending == MAX_BATCH_WRITES:
+            await batch.commit()
+            batch = async_db.batch()
+            pending = 0
+
+    if pending:
+        await batch.commit()
+    return stats
+
+
+async def backfill(dry_run: bool = False) -> dict:
+    return {collection: await backfill_collection(collection, dry_run) for collection in SHARDED_COLLECTIONS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='Count the documents that would change without writing')
+    args = parser.parse_args()
+
+    results = asyncio.run(backfill(dry_run=args.dry_run))
+    for collection, stats in results.items():
+        logger.info(f"{collection}: {'would update' if args.dry_run else 'updated'} {stats['updated']} of "
+                    f"{stats['scanned']} documents for {SCHEDULER_SHARDS} shards")
+
+
+if __name__ == '__main__':
+    main()
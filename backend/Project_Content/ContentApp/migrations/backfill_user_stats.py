@@ -0,0 +1,32 @@
+"""
+Backfill the per-user post counters
+
+Counters are kept up to date on every post write, but users who posted before
+user_stats existed have no counters, or only the deltas written since. This
+recounts every user's posts and writes complete counters. The stats reconciler
+does the same on start and then every STATS_RECONCILE_INTERVAL; run this to
+have the counters in place before deploying.
+
+Usage (from backend/Project_Content):
+    python -m ContentApp.migrations.backfill_user_stats
+"""
+import argparse
+import asyncio
+import logging
+
+from ..firebase_db import UserStatsDB
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+
+    written = asyncio.run(UserStatsDB.rebuild_all())
+    logger.info(f"Rebuilt post counters for {written} users "
+                "(users whose counters changed during the pass are picked up by the stats reconciler)")
+
+
+if __name__ == '__main__':
+    main()
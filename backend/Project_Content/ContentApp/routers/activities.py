@@ -1,9 +1,12 @@
 from typing import Annotated, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from .auth import get_current_user
-from ..firebase_db import ActivityDB
+from ..firebase_db import (
+    ActivityDB, InvalidCursorError, InvalidFieldsError,
+    ACTIVITY_SUMMARY_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_fields
+)
 
 router = APIRouter(
     prefix='/activities',
@@ -46,13 +49,29 @@ class CreateActivityRequest(BaseModel):
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def get_recent_activities(user: user_dependency, limit: int = 50):
-    """Get recent activities for the current user"""
+async def get_recent_activities(
+    user: user_dependency,
+    response: Response,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_size: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """
+    Get a page of recent activities for the current user.
+    `limit` is kept as an alias of `page_size`; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
     try:
-        activities = ActivityDB.get_by_user(user["id"], limit=limit)
+        activities, next_cursor = await ActivityDB.get_by_user(
+            user["id"], page_size=page_size or limit, cursor=cursor,
+            fields=parse_fields(fields, ACTIVITY_SUMMARY_FIELDS)
+        )
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
         
         # Serialize datetime objects to ISO strings for JSON response
         serialized = []
@@ -66,6 +85,8 @@ async def get_recent_activities(user: user_dependency, limit: int = 50):
                 continue
         
         return serialized
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -73,12 +94,27 @@ async def get_recent_activities(user: user_dependency, limit: int = 50):
 
 
 @router.get("/recent", status_code=status.HTTP_200_OK)
-async def get_activities_last_days(user: user_dependency, days: int = 7):
-    """Get activities from the last N days"""
+async def get_activities_last_days(
+    user: user_dependency,
+    response: Response,
+    days: int = 7,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """Get a page of activities from the last N days"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    activities = ActivityDB.get_recent(user["id"], days=days)
+    try:
+        activities, next_cursor = await ActivityDB.get_recent(
+            user["id"], days=days, page_size=page_size, cursor=cursor,
+            fields=parse_fields(fields, ACTIVITY_SUMMARY_FIELDS)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return activities
 
 
@@ -88,7 +124,7 @@ async def get_activity(user: user_dependency, activity_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    activity = ActivityDB.get_by_id(activity_id)
+    activity = await ActivityDB.get_by_id(activity_id)
     
     if not activity or activity.get('user_id') != user["id"]:
         raise HTTPException(status_code=404, detail="Activity not found")
@@ -110,7 +146,7 @@ async def create_activity(request: CreateActivityRequest, user: user_dependency_
         'metadata': request.metadata or {}
     }
     
-    new_activity = ActivityDB.create(activity_data)
+    new_activity = await ActivityDB.create(activity_data)
     return new_activity
 
 
@@ -120,11 +156,11 @@ async def delete_activity(user: user_dependency, activity_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    activity = ActivityDB.get_by_id(activity_id)
+    activity = await ActivityDB.get_by_id(activity_id)
     
     if not activity or activity.get('user_id') != user["id"]:
         raise HTTPException(status_code=404, detail='Activity not found.')
     
-    success = ActivityDB.delete(activity_id)
+    success = await ActivityDB.delete(activity_id)
     if not success:
         raise HTTPException(status_code=404, detail="Activity not found or already deleted.")
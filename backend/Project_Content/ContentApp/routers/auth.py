@@ -73,9 +73,9 @@ def render_register_page(request: Request):
 
 ### Helper Functions ###
 
-def authenticate_user(username: str, password: str):
+async def authenticate_user(username: str, password: str):
     """Authenticate user with Firebase"""
-    user = UserDB.get_by_username(username)
+    user = await UserDB.get_by_username(username)
     if not user:
         return False
     if not bcrypt_context.verify(password, user.get('hashed_password', '')):
@@ -91,11 +91,11 @@ def create_access_token(username: str, user_id: str, role: str, expires_delta: t
     return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def create_refresh_token_for_user(user_id: str):
+async def create_refresh_token_for_user(user_id: str):
     """Create refresh token and store in Firebase"""
     token = str(uuid.uuid4())
     expires_at = datetime.now(timezone.utc) + timedelta(days=30)
-    RefreshTokenDB.create(user_id, token, expires_at)
+    await RefreshTokenDB.create(user_id, token, expires_at)
     return token
 
 
@@ -119,7 +119,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]):
 async def create_user(create_user_request: CreateUserRequest):
     """Register a new user"""
     # Check if username already exists
-    existing_user = UserDB.get_by_username(create_user_request.username)
+    existing_user = await UserDB.get_by_username(create_user_request.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -127,7 +127,7 @@ async def create_user(create_user_request: CreateUserRequest):
         )
     
     # Check if email already exists
-    existing_email = UserDB.get_by_email(create_user_request.email)
+    existing_email = await UserDB.get_by_email(create_user_request.email)
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -146,14 +146,14 @@ async def create_user(create_user_request: CreateUserRequest):
         'phone_number': create_user_request.phone_number
     }
     
-    UserDB.create(user_data)
+    await UserDB.create(user_data)
     return {"message": "User created successfully"}
 
 
 @router.post("/token", response_model=TokenWithRefresh)
 async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
     """Login and get access token"""
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                             detail='Could not validate user.')
@@ -164,7 +164,7 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
         user['role'], 
         timedelta(minutes=20)
     )
-    refresh_token = create_refresh_token_for_user(user['id'])
+    refresh_token = await create_refresh_token_for_user(user['id'])
 
     return {
         'access_token': access_token,
@@ -176,7 +176,7 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
 @router.post("/forgot-password", status_code=status.HTTP_200_OK)
 async def forgot_password(request: ForgotPasswordRequest):
     """Request password reset"""
-    user = UserDB.get_by_email(request.email)
+    user = await UserDB.get_by_email(request.email)
     
     if not user:
         # Don't reveal if email exists or not
@@ -185,7 +185,7 @@ async def forgot_password(request: ForgotPasswordRequest):
     reset_token = secrets.token_urlsafe(32)
     expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
     
-    PasswordResetTokenDB.create(request.email, reset_token, expires_at)
+    await PasswordResetTokenDB.create(request.email, reset_token, expires_at)
     
     # TODO: Send email with reset link containing the token
     # For now, we'll return the token (in production, send via email)
@@ -199,7 +199,7 @@ async def forgot_password(request: ForgotPasswordRequest):
 @router.post("/reset-password", status_code=status.HTTP_200_OK)
 async def reset_password(request: ResetPasswordRequest):
     """Reset password with token"""
-    reset_token_data = PasswordResetTokenDB.get_by_token(request.token)
+    reset_token_data = await PasswordResetTokenDB.get_by_token(request.token)
     
     if not reset_token_data:
         raise HTTPException(
@@ -215,7 +215,7 @@ async def reset_password(request: ResetPasswordRequest):
             detail='Reset token has expired.'
         )
     
-    user = UserDB.get_by_email(reset_token_data['email'])
+    user = await UserDB.get_by_email(reset_token_data['email'])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -223,12 +223,12 @@ async def reset_password(request: ResetPasswordRequest):
         )
     
     # Update password
-    UserDB.update(user['id'], {
+    await UserDB.update(user['id'], {
         'hashed_password': bcrypt_context.hash(request.new_password)
     })
     
     # Mark token as used
-    PasswordResetTokenDB.mark_as_used(reset_token_data['id'])
+    await PasswordResetTokenDB.mark_as_used(reset_token_data['id'])
     
     return {"message": "Password has been reset successfully."}
 
@@ -236,7 +236,7 @@ async def reset_password(request: ResetPasswordRequest):
 @router.post("/refresh", response_model=Token)
 async def refresh_access_token(request: RefreshTokenRequest):
     """Refresh access token"""
-    refresh_token_data = RefreshTokenDB.get_by_token(request.refresh_token)
+    refresh_token_data = await RefreshTokenDB.get_by_token(request.refresh_token)
     
     if not refresh_token_data:
         raise HTTPException(
@@ -252,7 +252,7 @@ async def refresh_access_token(request: RefreshTokenRequest):
             detail='Refresh token has expired.'
         )
     
-    user = UserDB.get_by_id(refresh_token_data['user_id'])
+    user = await UserDB.get_by_id(refresh_token_data['user_id'])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
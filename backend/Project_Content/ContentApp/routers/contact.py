@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from ..firebase_db import db
+from ..firebase_db import async_db
 
 router = APIRouter(prefix="/contact", tags=["contact"])
 
@@ -26,8 +26,8 @@ async def submit_contact_form(submission: ContactSubmission):
         }
         
         # Save to Firebase
-        contact_ref = db.collection('contact_submissions').document()
-        contact_ref.set(contact_data)
+        contact_ref = async_db.collection('contact_submissions').document()
+        await contact_ref.set(contact_data)
         
         
         return {
@@ -46,7 +46,7 @@ async def submit_contact_form(submission: ContactSubmission):
 async def get_contact_submissions(status_filter: str = None, limit: int = 50):
     """Get all contact form submissions (admin endpoint)"""
     try:
-        query = db.collection('contact_submissions')
+        query = async_db.collection('contact_submissions')
         
         if status_filter:
             query = query.where('status', '==', status_filter)
@@ -54,7 +54,7 @@ async def get_contact_submissions(status_filter: str = None, limit: int = 50):
         query = query.order_by('created_at', direction='DESCENDING').limit(limit)
         
         submissions = []
-        for doc in query.stream():
+        async for doc in query.stream():
             submission_data = doc.to_dict()
             submission_data['id'] = doc.id
             submissions.append(submission_data)
@@ -2,14 +2,17 @@ import base64
 import uuid
 from typing import Annotated, Optional
 from pydantic import BaseModel, Field
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .auth import get_current_user
 from ..services.bimage import generate_image
 from ..services.openai_client import get_openai_client
 from ..services.aws_clients import get_s3, S3_BUCKET
 from ..config import AWS_REGION
-from ..firebase_db import GeneratedContentDB, ActivityDB
+from ..firebase_db import (
+    GeneratedContentDB, ActivityDB, InvalidCursorError, InvalidFieldsError,
+    GENERATED_CONTENT_SUMMARY_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_fields
+)
 
 router = APIRouter(
     prefix='/content/images',
@@ -51,12 +54,26 @@ class RequestImage(BaseModel):
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def fetch_all_images(user: user_dependency):
-    """Fetch all image content for the current user"""
+async def fetch_all_images(
+    user: user_dependency,
+    response: Response,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """Fetch a page of image content for the current user (next cursor in X-Next-Cursor)"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    results = GeneratedContentDB.get_by_owner(user["id"], content_type="image")
+    try:
+        results, next_cursor = await GeneratedContentDB.get_by_owner(
+            user["id"], content_type="image", page_size=page_size, cursor=cursor,
+            fields=parse_fields(fields, GENERATED_CONTENT_SUMMARY_FIELDS)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return results
 
 
@@ -66,7 +83,7 @@ async def read_image(user: user_dependency, image_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    image = GeneratedContentDB.get_by_id(image_id)
+    image = await GeneratedContentDB.get_by_id(image_id)
     
     if not image or image.get('owner_id') != user["id"] or image.get('type') != 'image':
         raise HTTPException(status_code=404, detail="Image not found")
@@ -80,12 +97,12 @@ async def delete_image(user: user_dependency, image_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    image = GeneratedContentDB.get_by_id(image_id)
+    image = await GeneratedContentDB.get_by_id(image_id)
     
     if not image or image.get('owner_id') != user["id"]:
         raise HTTPException(status_code=404, detail='Content not found.')
     
-    success = GeneratedContentDB.delete(image_id)
+    success = await GeneratedContentDB.delete(image_id)
     if not success:
         raise HTTPException(status_code=404, detail="Image not found or already deleted.")
 
@@ -183,12 +200,12 @@ async def create_image(request: RequestImage, user: user_dependency_optional = N
         'owner_id': user['id'] if user else None
     }
     
-    new_image = GeneratedContentDB.create(content_data)
+    new_image = await GeneratedContentDB.create(content_data)
     
     # Log activity
     if user:
         try:
-            ActivityDB.create({
+            await ActivityDB.create({
                 'user_id': user['id'],
                 'type': 'content_generated',
                 'action': 'Generated Image',
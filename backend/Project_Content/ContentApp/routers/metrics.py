@@ -0,0 +1,126 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, status
+from .auth import get_current_user
+from ..firebase_cache import get_cache_stats
+from ..firebase_db import LeaseDB
+from ..firebase_indexes import index_status, verify_indexes
+from ..job_queue import get_publish_queue
+from ..services.leader_election import get_scheduler_election, get_maintenance_election
+from ..services.post_scheduler import get_scheduler
+from ..services.publish_recovery import get_publish_recovery
+from ..services.shard_coordinator import get_shard_coordinator
+from ..services.stats_reconciler import get_stats_reconciler
+from ..services.ttl_sweeper import get_ttl_sweeper
+
+router = APIRouter(
+    prefix='/metrics',
+    tags=['metrics']
+)
+
+user_dependency = Annotated[dict, Depends(get_current_user)]
+
+
+def _require_admin(user: dict):
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    if user.get('user_role') != 'admin':
+        raise HTTPException(status_code=403, detail='Admin access required')
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+async def get_cache_metrics(user: user_dependency):
+    """Hit/miss counters for the read-through entity caches"""
+    _require_admin(user)
+    return get_cache_stats()
+
+
+@router.get("/scheduler", status_code=status.HTTP_200_OK)
+async def get_scheduler_metrics(user: user_dependency):
+    """Tick and publish counters for the post scheduler"""
+    _require_admin(user)
+    return get_scheduler().stats
+
+
+@router.get("/scheduler/queue", status_code=status.HTTP_200_OK)
+async def get_publish_queue_metrics(user: user_dependency):
+    """Queued and dead-lettered publish jobs, shared by every instance"""
+    _require_admin(user)
+    return await get_publish_queue().counts()
+
+
+@router.get("/scheduler/lease", status_code=status.HTTP_200_OK)
+async def get_scheduler_lease(user: user_dependency):
+    """This instance's view of the scheduler lease, plus the stored lease"""
+    _require_admin(user)
+    election = get_scheduler_election()
+    return {**election.stats, 'lease_document': await LeaseDB.get('post_scheduler')}
+
+
+@router.get("/maintenance/lease", status_code=status.HTTP_200_OK)
+async def get_maintenance_lease(user: user_dependency):
+    """This instance's view of the lease for the single-instance maintenance jobs"""
+    _require_admin(user)
+    election = get_maintenance_election()
+    return {**election.stats, 'lease_document': await LeaseDB.get('maintenance')}
+
+
+@router.get("/scheduler/shards", status_code=status.HTTP_200_OK)
+async def get_scheduler_shards(user: user_dependency):
+    """Shards this instance owns and the workers currently sharing them"""
+    _require_admin(user)
+    coordinator = get_shard_coordinator()
+    members = await LeaseDB.list_active('post_scheduler:member:')
+    return {**coordinator.stats, 'workers': sorted(m['owner'] for m in members)}
+
+
+@router.get("/publish-recovery", status_code=status.HTTP_200_OK)
+async def get_publish_recovery_metrics(user: user_dependency):
+    """Counters for posts recovered from a stalled publish"""
+    _require_admin(user)
+    return get_publish_recovery().stats
+
+
+@router.post("/publish-recovery/run", status_code=status.HTTP_200_OK)
+async def run_publish_recovery(user: user_dependency):
+    """Re-queue posts whose publish has stalled now"""
+    _require_admin(user)
+    return await get_publish_recovery().sweep()
+
+
+@router.get("/stats-reconciler", status_code=status.HTTP_200_OK)
+async def get_stats_reconciler_metrics(user: user_dependency):
+    """Run counters for the user_stats reconciler"""
+    _require_admin(user)
+    return get_stats_reconciler().stats
+
+
+@router.post("/stats-reconciler/run", status_code=status.HTTP_200_OK)
+async def run_stats_reconciler(user: user_dependency):
+    """Rebuild every user's post counters now"""
+    _require_admin(user)
+    users = await get_stats_reconciler().reconcile()
+    return {"users_reconciled": users}
+
+
+@router.get("/ttl-sweeper", status_code=status.HTTP_200_OK)
+async def get_ttl_sweeper_metrics(user: user_dependency):
+    """Deletion counters for the expired-document sweeper"""
+    _require_admin(user)
+    return get_ttl_sweeper().stats
+
+
+@router.post("/ttl-sweeper/run", status_code=status.HTTP_200_OK)
+async def run_ttl_sweeper(user: user_dependency):
+    """Sweep expired tokens, OAuth states and stale comment reservations now"""
+    _require_admin(user)
+    deleted = await get_ttl_sweeper().sweep()
+    return {"deleted": deleted}
+
+
+@router.get("/indexes", status_code=status.HTTP_200_OK)
+async def get_index_status(user: user_dependency, refresh: bool = False):
+    """Result of the startup index probe, or a fresh probe with refresh=true"""
+    _require_admin(user)
+    if refresh:
+        return await verify_indexes()
+    return index_status
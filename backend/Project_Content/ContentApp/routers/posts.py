@@ -3,16 +3,36 @@ Posts Router for MediaMint
 Handles creating, scheduling, and managing posts with S3 media upload
 """
 
-from typing import Annotated, Optional, List
-from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import asyncio
+import logging
+from typing import Annotated, Callable, Optional, List, Dict, Tuple
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Path, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from .auth import get_current_user
-from ..firebase_db import ContentDB, ActivityDB, GeneratedContentDB
-from ..firebase_config import db, COLLECTIONS, generate_id
+from ..firebase_db import (
+    ContentDB,
+    ActivityDB,
+    GeneratedContentDB,
+    UserStatsDB,
+    fetch_page,
+    count_query,
+    get_many,
+    to_utc_datetime,
+    shard_for,
+    parse_fields,
+    InvalidCursorError,
+    InvalidFieldsError,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE
+)
+from ..firebase_config import async_db, COLLECTIONS, generate_id
+from ..firebase_cache import post_stats_cache
 from ..services.s3_upload import upload_file_to_s3, upload_base64_to_s3, generate_presigned_upload_url, delete_file_from_s3
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix='/posts',
     tags=['posts']
@@ -77,14 +97,50 @@ class PresignedUrlRequest(BaseModel):
     content_type: str
     folder: Optional[str] = "posts"
 
+# Compact projection for list screens; the full post is available from GET /posts/{post_id}
+POST_SUMMARY_FIELDS = [
+    'id', 'media_type', 'platforms', 'caption', 'media_url', 'status', 'scheduled_at', 'created_at'
+]
+
+# Fields the calendar view renders
+CALENDAR_FIELDS = [
+    'id', 'caption', 'prompt', 'media_url', 'media_type', 'platforms', 'status', 'calendar_at'
+]
+
+
+# Called with (post_id, written fields) after PostDB writes a post and (post_id, None)
+# after it deletes one. The scheduler uses this to keep its publish timers current.
+PostChangeListener = Callable[[str, Optional[dict]], None]
+_post_change_listeners: List[PostChangeListener] = []
+
+
+def add_post_change_listener(listener: PostChangeListener):
+    _post_change_listeners.append(listener)
+
+
+def remove_post_change_listener(listener: PostChangeListener):
+    if listener in _post_change_listeners:
+        _post_change_listeners.remove(listener)
+
+
+def _notify_post_changed(post_id: str, data: Optional[dict]):
+    for listener in list(_post_change_listeners):
+        try:
+            listener(post_id, data)
+        except Exception as e:
+            logger.error(f"Post change listener failed for {post_id}: {e}")
+
+
 class PostDB:
     """Database operations for posts"""
     collection = 'posts'
     
     @staticmethod
-    def create(data: dict) -> dict:
+    async def create(data: dict) -> dict:
         """Create a new post"""
         post_id = generate_id()
+        now = datetime.now(timezone.utc)
+        scheduled_at = to_utc_datetime(data.get('scheduled_at'))
         post_data = {
             'id': post_id,
             'user_id': data.get('user_id'),
@@ -96,60 +152,205 @@ class PostDB:
             'prompt': data.get('prompt'),
             'style': data.get('style'),
             'status': data.get('status', 'published'),
-            'scheduled_at': data.get('scheduled_at'),
-            'created_at': datetime.now(timezone.utc),
-            'updated_at': datetime.now(timezone.utc)
+            'scheduled_at': scheduled_at,
+            'shard': shard_for(post_id),
+            # Where the post sits on the calendar, always a timestamp so months are range queries
+            'calendar_at': scheduled_at or now,
+            'created_at': now,
+            'updated_at': now
         }
-        db.collection(PostDB.collection).document(post_id).set(post_data)
+        # Write the post and bump the owner's counters atomically
+        batch = async_db.batch()
+        batch.set(async_db.collection(PostDB.collection).document(post_id), post_data)
+        UserStatsDB.apply(batch, post_data['user_id'], UserStatsDB.delta(None, post_data))
+        await batch.commit()
+        post_stats_cache.invalidate(post_data['user_id'])
+        _notify_post_changed(post_id, post_data)
         return post_data
     
     @staticmethod
-    def get_by_id(post_id: str) -> Optional[dict]:
+    async def get_by_id(post_id: str) -> Optional[dict]:
         """Get post by ID"""
-        doc = db.collection(PostDB.collection).document(post_id).get()
+        doc = await async_db.collection(PostDB.collection).document(post_id).get()
         if doc.exists:
             return doc.to_dict()
         return None
     
     @staticmethod
-    def get_by_user(user_id: str, status: Optional[str] = None, limit: int = 50) -> List[dict]:
-        """Get all posts for a user"""
+    async def get_many(post_ids: List[str]) -> Dict[str, dict]:
+        """Get several posts by ID in batched reads"""
+        return await get_many(PostDB.collection, post_ids)
+    
+    @staticmethod
+    async def get_by_user(
+        user_id: str,
+        status: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get a page of posts for a user, optionally limited to `fields`"""
         from google.cloud.firestore_v1 import FieldFilter
         
-        try:
-            query = db.collection(PostDB.collection).where(
-                filter=FieldFilter('user_id', '==', user_id)
-            )
-            
-            if status:
-                query = query.where(filter=FieldFilter('status', '==', status))
-            
-            # Try with ordering first (requires composite index)
-            try:
-                docs = query.order_by('created_at', direction='DESCENDING').limit(limit).get()
-            except Exception as e:
-                # Fallback: query without ordering
-                docs = query.limit(limit).get()
-            
-            return [doc.to_dict() for doc in docs]
-        except Exception as e:
-            return []
+        query = async_db.collection(PostDB.collection).where(
+            filter=FieldFilter('user_id', '==', user_id)
+        )
+        if status:
+            query = query.where(filter=FieldFilter('status', '==', status))
+        
+        return await fetch_page(query, 'created_at', page_size, cursor, fields=fields)
+    
+    @staticmethod
+    async def get_calendar_range(
+        user_id: str,
+        start: datetime,
+        end: datetime,
+        fields: Optional[List[str]] = None
+    ) -> List[dict]:
+        """Get a user's posts whose calendar_at falls in [start, end), oldest first"""
+        from google.cloud.firestore_v1 import FieldFilter
+        
+        query = async_db.collection(PostDB.collection).where(
+            filter=FieldFilter('user_id', '==', user_id)
+        ).where(
+            filter=FieldFilter('calendar_at', '>=', start)
+        ).where(
+            filter=FieldFilter('calendar_at', '<', end)
+        ).order_by('calendar_at')
+        if fields:
+            query = query.select(list(dict.fromkeys([*fields, 'calendar_at'])))
+        
+        return [doc.to_dict() async for doc in query.stream()]
+    
+    @staticmethod
+    async def get_due(
+        now: datetime,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        shards: Optional[List[int]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Get a page of scheduled posts whose scheduled_at is at or before `now`,
+        oldest first, only those in `shards` when given
+        """
+        from google.cloud.firestore_v1 import FieldFilter
+        
+        query = async_db.collection(PostDB.collection).where(
+            filter=FieldFilter('status', '==', 'scheduled')
+        )
+        if shards is not None:
+            query = query.where(filter=FieldFilter('shard', 'in', shards))
+        query = query.where(filter=FieldFilter('scheduled_at', '<=', now))
+        
+        return await fetch_page(query, 'scheduled_at', page_size, cursor, direction='ASCENDING')
+    
+    @staticmethod
+    async def get_stale_publishing(cutoff: datetime, limit: int) -> List[dict]:
+        """Get posts stuck in 'publishing' whose last heartbeat is before `cutoff`, oldest first"""
+        from google.cloud.firestore_v1 import FieldFilter
+        
+        docs = await async_db.collection(PostDB.collection).where(
+            filter=FieldFilter('status', '==', 'publishing')
+        ).where(
+            filter=FieldFilter('publishing_heartbeat_at', '<', cutoff)
+        ).order_by('publishing_heartbeat_at').limit(limit).get()
+        return [doc.to_dict() for doc in docs]
+    
+    @staticmethod
+    async def heartbeat(post_id: str):
+        """Record that a publishing worker is still working on the post"""
+        # Written directly: not a user-visible change, so updated_at and listeners are left alone
+        await async_db.collection(PostDB.collection).document(post_id).update({
+            'publishing_heartbeat_at': datetime.now(timezone.utc)
+        })
     
     @staticmethod
-    def update(post_id: str, data: dict) -> bool:
-        """Update a post"""
+    async def count_by_user(
+        user_id: str,
+        status: Optional[str] = None,
+        scheduled_from: Optional[datetime] = None,
+        scheduled_to: Optional[datetime] = None
+    ) -> int:
+        """Count a user's posts, optionally by status and a [from, to) scheduled_at range"""
+        from google.cloud.firestore_v1 import FieldFilter
+        
+        query = async_db.collection(PostDB.collection).where(
+            filter=FieldFilter('user_id', '==', user_id)
+        )
+        if status:
+            query = query.where(filter=FieldFilter('status', '==', status))
+        if scheduled_from:
+            query = query.where(filter=FieldFilter('scheduled_at', '>=', scheduled_from))
+        if scheduled_to:
+            query = query.where(filter=FieldFilter('scheduled_at', '<', scheduled_to))
+        
+        return await count_query(query)
+    
+    @staticmethod
+    async def update(post_id: str, data: dict) -> bool:
+        """Update a post, adjusting the owner's counters when a counted field changes"""
+        from google.cloud import firestore
+        
         try:
             data['updated_at'] = datetime.now(timezone.utc)
-            db.collection(PostDB.collection).document(post_id).update(data)
+            if 'scheduled_at' in data:
+                data['scheduled_at'] = to_utc_datetime(data['scheduled_at'])
+                if data['scheduled_at']:
+                    data['calendar_at'] = data['scheduled_at']
+            post_ref = async_db.collection(PostDB.collection).document(post_id)
+            
+            # scheduled_today in the cached stats and calendar_at both follow scheduled_at
+            if not (UserStatsDB.counted_fields | {'scheduled_at'}) & data.keys():
+                await post_ref.update(data)
+                _notify_post_changed(post_id, data)
+                return True
+            
+            @firestore.async_transactional
+            async def update_in_transaction(transaction):
+                snapshot = await post_ref.get(transaction=transaction)
+                if not snapshot.exists:
+                    return None
+                before = snapshot.to_dict()
+                if 'scheduled_at' in data and not data['scheduled_at']:
+                    # Unscheduled: back on the calendar at its creation time, as when created
+                    created_at = to_utc_datetime(before.get('created_at'))
+                    data['calendar_at'] = created_at or firestore.DELETE_FIELD
+                after = {**before, **data}
+                transaction.update(post_ref, data)
+                UserStatsDB.apply(transaction, before.get('user_id'), UserStatsDB.delta(before, after))
+                return before.get('user_id')
+            
+            user_id = await update_in_transaction(async_db.transaction())
+            if user_id is None:
+                return False
+            post_stats_cache.invalidate(user_id)
+            _notify_post_changed(post_id, data)
             return True
         except Exception:
             return False
     
     @staticmethod
-    def delete(post_id: str) -> bool:
-        """Delete a post"""
+    async def delete(post_id: str) -> bool:
+        """Delete a post and take it out of the owner's counters"""
+        from google.cloud import firestore
+        
         try:
-            db.collection(PostDB.collection).document(post_id).delete()
+            post_ref = async_db.collection(PostDB.collection).document(post_id)
+            
+            @firestore.async_transactional
+            async def delete_in_transaction(transaction):
+                snapshot = await post_ref.get(transaction=transaction)
+                transaction.delete(post_ref)
+                if snapshot.exists:
+                    before = snapshot.to_dict()
+                    UserStatsDB.apply(transaction, before.get('user_id'), UserStatsDB.delta(before, None))
+                    return before.get('user_id')
+                return None
+            
+            user_id = await delete_in_transaction(async_db.transaction())
+            if user_id:
+                post_stats_cache.invalidate(user_id)
+            _notify_post_changed(post_id, None)
             return True
         except Exception:
             return False
@@ -159,16 +360,31 @@ class PostDB:
 @router.get("/", status_code=status.HTTP_200_OK)
 async def get_posts(
     user: user_dependency,
+    response: Response,
     post_status: Optional[str] = None,
-    limit: int = 50
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    page_size: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
 ):
-    """Get all posts for the current user"""
+    """
+    Get a page of posts for the current user.
+    `limit` is kept as an alias of `page_size`; the next page's cursor is
+    returned in the X-Next-Cursor header.
+    """
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
     try:
-        posts = PostDB.get_by_user(user["id"], status=post_status, limit=limit)
+        posts, next_cursor = await PostDB.get_by_user(
+            user["id"], status=post_status, page_size=page_size or limit, cursor=cursor,
+            fields=parse_fields(fields, POST_SUMMARY_FIELDS)
+        )
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
         return posts
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch posts: {str(e)}")
 
@@ -179,7 +395,7 @@ async def get_post(user: user_dependency, post_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    post = PostDB.get_by_id(post_id)
+    post = await PostDB.get_by_id(post_id)
     
     if not post or post.get('user_id') != user["id"]:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -203,7 +419,7 @@ async def create_post(request: CreatePostRequest, user: user_dependency):
     # Validation: precise check for connected accounts before doing anything else
     if request.status in ['published', 'scheduled'] and request.platforms:
         from .social import SocialAccountDB
-        user_accounts = SocialAccountDB.get_by_user(user['id'])
+        user_accounts = await SocialAccountDB.get_by_user(user['id'])
         
         for platform in request.platforms:
             account = next((a for a in user_accounts if a.get('platform') == platform), None)
@@ -250,7 +466,7 @@ async def create_post(request: CreatePostRequest, user: user_dependency):
         'scheduled_at': scheduled_at
     }
     
-    new_post = PostDB.create(post_data)
+    new_post = await PostDB.create(post_data)
     
     # If status is 'published', immediately publish to social platforms
     social_post_ids = {}
@@ -262,7 +478,7 @@ async def create_post(request: CreatePostRequest, user: user_dependency):
         for platform in request.platforms:
             try:
                 # Get user's connected account for this platform
-                accounts = SocialAccountDB.get_by_user(user['id'])
+                accounts = await SocialAccountDB.get_by_user(user['id'])
                 account = next((a for a in accounts if a.get('platform') == platform), None)
                 
                 if not account:
@@ -310,7 +526,7 @@ async def create_post(request: CreatePostRequest, user: user_dependency):
         
         # Update post with social_post_ids
         if social_post_ids:
-            PostDB.update(new_post['id'], {
+            await PostDB.update(new_post['id'], {
                 'social_post_ids': social_post_ids,
                 'published_at': datetime.now(timezone.utc)
             })
@@ -333,7 +549,7 @@ async def create_post(request: CreatePostRequest, user: user_dependency):
             activity_action = 'Created Post'
             activity_description = f'Published {request.media_type} to {platform_names}'
         
-        ActivityDB.create({
+        await ActivityDB.create({
             'user_id': user['id'],
             'type': activity_type,
             'action': activity_action,
@@ -435,7 +651,7 @@ async def update_post(user: user_dependency, post_id: str, request: UpdatePostRe
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    post = PostDB.get_by_id(post_id)
+    post = await PostDB.get_by_id(post_id)
     
     if not post or post.get('user_id') != user["id"]:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -452,11 +668,11 @@ async def update_post(user: user_dependency, post_id: str, request: UpdatePostRe
             raise HTTPException(status_code=400, detail="Invalid scheduled_at format")
     
     if update_data:
-        success = PostDB.update(post_id, update_data)
+        success = await PostDB.update(post_id, update_data)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to update post")
     
-    updated_post = PostDB.get_by_id(post_id)
+    updated_post = await PostDB.get_by_id(post_id)
     return updated_post
 
 
@@ -466,7 +682,7 @@ async def delete_post(user: user_dependency, post_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    post = PostDB.get_by_id(post_id)
+    post = await PostDB.get_by_id(post_id)
     
     if not post or post.get('user_id') != user["id"]:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -486,7 +702,7 @@ async def delete_post(user: user_dependency, post_id: str):
             from ..services.meta_service import MetaService, MetaAPIError
             
             # Get user accounts to find access tokens
-            accounts = SocialAccountDB.get_by_user(user['id'])
+            accounts = await SocialAccountDB.get_by_user(user['id'])
             
             for platform, social_post_id in social_ids.items():
                 # Find matching account
@@ -511,33 +727,61 @@ async def delete_post(user: user_dependency, post_id: str):
     # Delete autoresponder settings if they exist
     try:
         from .social import AutoresponderSettingsDB
-        AutoresponderSettingsDB.delete(post_id)
+        await AutoresponderSettingsDB.delete(post_id)
     except Exception as e:
         pass
 
     # Delete the post
-    success = PostDB.delete(post_id)
+    success = await PostDB.delete(post_id)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to delete post")
 
 
 @router.get("/scheduled/upcoming", status_code=status.HTTP_200_OK)
-async def get_scheduled_posts(user: user_dependency):
-    """Get all scheduled posts for the current user"""
+async def get_scheduled_posts(
+    user: user_dependency,
+    response: Response,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """Get a page of scheduled posts for the current user"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    posts = PostDB.get_by_user(user["id"], status="scheduled")
+    try:
+        posts, next_cursor = await PostDB.get_by_user(
+            user["id"], status="scheduled", page_size=page_size, cursor=cursor,
+            fields=parse_fields(fields, POST_SUMMARY_FIELDS)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return posts
 
 
 @router.get("/drafts/all", status_code=status.HTTP_200_OK)
-async def get_draft_posts(user: user_dependency):
-    """Get all draft posts for the current user"""
+async def get_draft_posts(
+    user: user_dependency,
+    response: Response,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """Get a page of draft posts for the current user"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    posts = PostDB.get_by_user(user["id"], status="draft")
+    try:
+        posts, next_cursor = await PostDB.get_by_user(
+            user["id"], status="draft", page_size=page_size, cursor=cursor,
+            fields=parse_fields(fields, POST_SUMMARY_FIELDS)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return posts
 
 
@@ -547,45 +791,34 @@ async def get_posts_stats(user: user_dependency):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
+    found, cached = post_stats_cache.get(user["id"])
+    if found:
+        return cached
+    
     try:
-        from datetime import date
-        
-        # Get all posts for the user
-        all_posts = PostDB.get_by_user(user["id"], limit=1000)
+        # Day boundaries in UTC, matching how scheduled_at is stored
+        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        today_end = today_start + timedelta(days=1)
         
-        # Calculate stats
-        total_posts = len(all_posts)
-        published_count = sum(1 for p in all_posts if p.get('status') == 'published')
-        scheduled_count = sum(1 for p in all_posts if p.get('status') == 'scheduled')
-        draft_count = sum(1 for p in all_posts if p.get('status') == 'draft')
-        
-        # Get today's date
-        today = date.today()
-        
-        # Count posts scheduled for today
-        scheduled_today = 0
-        for post in all_posts:
-            if post.get('status') == 'scheduled' and post.get('scheduled_at'):
-                try:
-                    scheduled_at = post['scheduled_at']
-                    # Handle both string and datetime objects
-                    if isinstance(scheduled_at, str):
-                        scheduled_date = datetime.fromisoformat(scheduled_at.replace('Z', '+00:00')).date()
-                    else:
-                        scheduled_date = scheduled_at.date()
-                    
-                    if scheduled_date == today:
-                        scheduled_today += 1
-                except Exception as e:
-                    continue
+        # Counters are a single document read; only today's count depends on the clock
+        counters, scheduled_today = await asyncio.gather(
+            UserStatsDB.get_complete(user["id"]),
+            PostDB.count_by_user(user["id"], status='scheduled', scheduled_from=today_start, scheduled_to=today_end)
+        )
         
-        return {
-            "total_posts": total_posts,
-            "published": published_count,
-            "scheduled": scheduled_count,
-            "drafts": draft_count,
-            "scheduled_today": scheduled_today
+        by_status = counters.get('by_status', {})
+        stats = {
+            "total_posts": counters.get('total', 0),
+            "published": by_status.get('published', 0),
+            "scheduled": by_status.get('scheduled', 0),
+            "drafts": by_status.get('draft', 0),
+            "scheduled_today": scheduled_today,
+            "by_status": by_status,
+            "by_platform": counters.get('by_platform', {}),
+            "by_media_type": counters.get('by_media_type', {})
         }
+        post_stats_cache.set(user["id"], stats)
+        return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get posts stats: {str(e)}")
 
@@ -638,60 +871,41 @@ async def get_scheduler_status(user: user_dependency):
 
 
 @router.get("/calendar/{year}/{month}", status_code=status.HTTP_200_OK)
-async def get_calendar_posts(year: int, month: int, user: user_dependency):
-    """Get all posts organized by day for a specific month (all statuses)"""
+async def get_calendar_posts(
+    user: user_dependency,
+    year: int = Path(ge=1970, le=9999),
+    month: int = Path(ge=1, le=12)
+):
+    """
+    Get the posts on the calendar for a month (all statuses), grouped by day.
+    Only days that have posts are included in `calendar`.
+    """
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
     try:
         from calendar import monthrange
 
-        # Get ALL posts for the user (no status filter) to show on calendar
-        all_posts = PostDB.get_by_user(user["id"], limit=1000)
-
-        # Get the number of days in the month
         _, days_in_month = monthrange(year, month)
+        month_start = datetime(year, month, 1, tzinfo=timezone.utc)
+        month_end = month_start + timedelta(days=days_in_month)
 
-        # Initialize calendar with empty lists for each day (use string keys for JSON)
-        calendar_data = {str(day): [] for day in range(1, days_in_month + 1)}
-
-        # Organize posts by day - use scheduled_at or created_at
-        for post in all_posts:
-            # Use scheduled_at if available, otherwise use created_at
-            post_datetime = post.get('scheduled_at') or post.get('created_at')
-            if not post_datetime:
-                continue
+        posts = await PostDB.get_calendar_range(user["id"], month_start, month_end, fields=CALENDAR_FIELDS)
 
-            try:
-                # Handle various datetime formats
-                if isinstance(post_datetime, str):
-                    post_date = datetime.fromisoformat(post_datetime.replace('Z', '+00:00'))
-                elif hasattr(post_datetime, 'timestamp'):
-                    # Handle Firestore Timestamp objects
-                    post_date = datetime.fromtimestamp(post_datetime.timestamp(), tz=timezone.utc)
-                else:
-                    post_date = post_datetime
-
-                # Check if post is in the requested month/year
-                if post_date.year == year and post_date.month == month:
-                    day = str(post_date.day)
-                    calendar_data[day].append({
-                        "id": post.get('id'),
-                        "caption": post.get('caption') or post.get('prompt') or 'No caption',
-                        "media_url": post.get('media_url'),
-                        "media_base64": post.get('media_base64'),
-                        "media_type": post.get('media_type', 'image'),
-                        "platforms": post.get('platforms', []),
-                        "status": post.get('status', 'draft'),
-                        "scheduled_at": post_datetime if isinstance(post_datetime, str) else post_date.isoformat(),
-                        "scheduled_time": post_date.strftime("%H:%M")
-                    })
-            except Exception as e:
-                continue
-
-        # Sort posts within each day by time
-        for day in calendar_data:
-            calendar_data[day].sort(key=lambda x: x.get('scheduled_time', ''))
+        # Posts come back ordered by calendar_at, so each day is already sorted by time
+        calendar_data = {}
+        for post in posts:
+            post_date = to_utc_datetime(post['calendar_at'])
+            calendar_data.setdefault(str(post_date.day), []).append({
+                "id": post.get('id'),
+                "caption": post.get('caption') or post.get('prompt') or 'No caption',
+                "media_url": post.get('media_url'),
+                "media_type": post.get('media_type', 'image'),
+                "platforms": post.get('platforms', []),
+                "status": post.get('status', 'draft'),
+                "scheduled_at": post_date.isoformat(),
+                "scheduled_time": post_date.strftime("%H:%M")
+            })
 
         return {
             "year": year,
@@ -710,7 +924,7 @@ async def get_posts_with_social_ids(user: user_dependency):
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
     try:
-        posts = PostDB.get_by_user(user["id"], limit=100)
+        posts, _ = await PostDB.get_by_user(user["id"], page_size=100)
         
         # Filter posts with social_post_ids
         posts_with_social_ids = []
@@ -100,7 +100,7 @@ async def initiate_meta_oauth(user: user_dependency):
     
     
     # Create OAuth state
-    state = OAuthStateDB.create(user['id'], 'meta')
+    state = await OAuthStateDB.create(user['id'], 'meta')
     
     # Generate OAuth URL
     oauth_url = MetaService.get_oauth_url(state)
@@ -124,7 +124,7 @@ async def meta_oauth_callback(
     """
     
     # Validate state
-    state_data = OAuthStateDB.get_and_validate(state)
+    state_data = await OAuthStateDB.get_and_validate(state)
     if not state_data:
         return HTMLResponse(
             content="""
@@ -172,13 +172,16 @@ async def meta_oauth_callback(
         
         connected_accounts = []
         
+        # Check which pages are already connected in one batched query
+        existing_accounts = await SocialAccountDB.get_by_page_ids([p.get('id') for p in pages])
+        
         for page in pages:
             page_id = page.get('id')
             page_name = page.get('name')
             page_access_token = page.get('access_token')
             
             # Check if already connected
-            existing = SocialAccountDB.get_by_page_id(page_id)
+            existing = existing_accounts.get(page_id)
             if existing and existing.get('userID') != user_id:
                 continue  # Page connected to different user
             
@@ -199,7 +202,7 @@ async def meta_oauth_callback(
             
             # Create or update account
             if existing:
-                SocialAccountDB.update(existing['accountID'], {
+                await SocialAccountDB.update(existing['accountID'], {
                     'accessToken': access_token,
                     'page_access_token': page_access_token,
                     'token_expires_at': datetime.now(timezone.utc) + timedelta(seconds=expires_in),
@@ -214,7 +217,7 @@ async def meta_oauth_callback(
                 })
             else:
                 # Create new account - one for Facebook page
-                fb_account = SocialAccountDB.create({
+                fb_account = await SocialAccountDB.create({
                     'userID': user_id,
                     'platform': 'facebook',
                     'username': page_name,
@@ -236,7 +239,7 @@ async def meta_oauth_callback(
                 
                 # If Instagram is connected, create separate Instagram account entry
                 if instagram_id and instagram_username:
-                    ig_account = SocialAccountDB.create({
+                    ig_account = await SocialAccountDB.create({
                         'userID': user_id,
                         'platform': 'instagram',
                         'username': instagram_username,
@@ -374,7 +377,7 @@ async def get_connected_accounts(
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    accounts = SocialAccountDB.get_by_user(user['id'], platform)
+    accounts = await SocialAccountDB.get_by_user(user['id'], platform)
     safe_accounts = []
     if accounts:
     
@@ -415,11 +418,11 @@ async def manual_connect_account(request: ManualConnectRequest, user: user_depen
     from datetime import timedelta
     
     # Check if page already connected
-    existing = SocialAccountDB.get_by_page_id(request.page_id)
+    existing = await SocialAccountDB.get_by_page_id(request.page_id)
     if existing:
         if existing.get('userID') == user['id']:
             # Update existing
-            SocialAccountDB.update(existing['accountID'], {
+            await SocialAccountDB.update(existing['accountID'], {
                 'page_access_token': request.page_access_token,
                 'instagram_account_id': request.instagram_account_id,
                 'instagram_username': request.instagram_username,
@@ -430,7 +433,7 @@ async def manual_connect_account(request: ManualConnectRequest, user: user_depen
             raise HTTPException(status_code=400, detail='Page already connected to another user')
     
     # Create Facebook account
-    fb_account = SocialAccountDB.create({
+    fb_account = await SocialAccountDB.create({
         'userID': user['id'],
         'platform': 'facebook',
         'username': request.page_name,
@@ -447,7 +450,7 @@ async def manual_connect_account(request: ManualConnectRequest, user: user_depen
     
     # Create Instagram account if provided
     if request.instagram_account_id and request.instagram_username:
-        ig_account = SocialAccountDB.create({
+        ig_account = await SocialAccountDB.create({
             'userID': user['id'],
             'platform': 'instagram',
             'username': request.instagram_username,
@@ -473,12 +476,12 @@ async def disconnect_account(user: user_dependency, account_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(account_id)
+    account = await SocialAccountDB.get_by_id(account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
     
-    success = SocialAccountDB.delete(account_id)
+    success = await SocialAccountDB.delete(account_id)
     
     if not success:
         raise HTTPException(status_code=500, detail='Failed to disconnect account')
@@ -496,9 +499,10 @@ async def publish_to_social(request: PublishPostRequest, user: user_dependency):
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
     results = []
+    accounts = await SocialAccountDB.get_many(request.account_ids)
     
     for account_id in request.account_ids:
-        account = SocialAccountDB.get_by_id(account_id)
+        account = accounts.get(account_id)
         
         if not account or account.get('userID') != user['id']:
             results.append({
@@ -567,7 +571,7 @@ async def publish_to_social(request: PublishPostRequest, user: user_dependency):
             await meta_service.close()
             
             # Record the published post
-            PublishedPostDB.create({
+            await PublishedPostDB.create({
                 'internal_post_id': request.post_id,
                 'user_id': user['id'],
                 'account_id': account_id,
@@ -586,7 +590,7 @@ async def publish_to_social(request: PublishPostRequest, user: user_dependency):
             
         except MetaAPIError as e:
             # Record failed attempt
-            PublishedPostDB.create({
+            await PublishedPostDB.create({
                 'internal_post_id': request.post_id,
                 'user_id': user['id'],
                 'account_id': account_id,
@@ -633,7 +637,7 @@ async def get_post_comments(
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(account_id)
+    account = await SocialAccountDB.get_by_id(account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
@@ -660,7 +664,7 @@ async def reply_to_comment(request: ReplyToCommentRequest, user: user_dependency
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(request.account_id)
+    account = await SocialAccountDB.get_by_id(request.account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
@@ -743,7 +747,7 @@ async def get_autoresponder_settings(user: user_dependency, post_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    settings = AutoresponderSettingsDB.get_by_post(post_id)
+    settings = await AutoresponderSettingsDB.get_by_post(post_id)
     
     if settings and settings.get('user_id') != user['id']:
         raise HTTPException(status_code=403, detail='Not authorized')
@@ -769,7 +773,7 @@ async def save_autoresponder_settings(
     
     # Get the post to verify ownership and get social_post_ids
     from .posts import PostDB
-    post = PostDB.get_by_id(post_id)
+    post = await PostDB.get_by_id(post_id)
     
     if not post:
         raise HTTPException(status_code=404, detail='Post not found')
@@ -787,7 +791,7 @@ async def save_autoresponder_settings(
         'post_caption': post.get('caption', '')
     }
     
-    saved = AutoresponderSettingsDB.save(post_id, user['id'], settings)
+    saved = await AutoresponderSettingsDB.save(post_id, user['id'], settings)
     
     return {
         'success': True,
@@ -801,12 +805,12 @@ async def delete_autoresponder_settings(user: user_dependency, post_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    settings = AutoresponderSettingsDB.get_by_post(post_id)
+    settings = await AutoresponderSettingsDB.get_by_post(post_id)
     
     if settings and settings.get('user_id') != user['id']:
         raise HTTPException(status_code=403, detail='Not authorized')
     
-    AutoresponderSettingsDB.delete(post_id)
+    await AutoresponderSettingsDB.delete(post_id)
     
     return {'success': True}
 
@@ -817,7 +821,7 @@ async def get_comment_threads(user: user_dependency, post_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    threads = CommentThreadDB.get_by_post(post_id)
+    threads = await CommentThreadDB.get_by_post(post_id)
     
     # Filter to only user's threads
     user_threads = [t for t in threads if t.get('user_id') == user['id']]
@@ -836,7 +840,7 @@ async def get_conversations(
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(account_id)
+    account = await SocialAccountDB.get_by_id(account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
@@ -868,7 +872,7 @@ async def get_conversation_messages(
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(account_id)
+    account = await SocialAccountDB.get_by_id(account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
@@ -892,7 +896,7 @@ async def send_message(request: SendMessageRequest, user: user_dependency):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(request.account_id)
+    account = await SocialAccountDB.get_by_id(request.account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
@@ -944,7 +948,7 @@ async def manual_connect_instagram(
     
     try:
         # Check if account already exists
-        existing = SocialAccountDB.get_by_page_id(request.page_id)
+        existing = await SocialAccountDB.get_by_page_id(request.page_id)
         if existing:
             raise HTTPException(
                 status_code=400, 
@@ -971,7 +975,7 @@ async def manual_connect_instagram(
             'scopes': ['instagram_basic', 'instagram_content_publish', 'pages_show_list', 'pages_read_engagement']
         }
         
-        account = SocialAccountDB.create(account_data)
+        account = await SocialAccountDB.create(account_data)
         
         
         return {
@@ -1001,7 +1005,7 @@ async def get_account_insights(
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    account = SocialAccountDB.get_by_id(account_id)
+    account = await SocialAccountDB.get_by_id(account_id)
     
     if not account or account.get('userID') != user['id']:
         raise HTTPException(status_code=404, detail='Account not found')
@@ -1039,7 +1043,7 @@ async def get_analytics_summary(user: user_dependency):
     
     try:
         # Get all Facebook accounts for the user
-        accounts = SocialAccountDB.get_by_user(user['id'])
+        accounts = await SocialAccountDB.get_by_user(user['id'])
         facebook_accounts = [acc for acc in accounts if acc.get('platform') == 'facebook']
         
         if not facebook_accounts:
@@ -1,10 +1,13 @@
 from typing import Annotated, Optional
 from pydantic import BaseModel, Field
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, status, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .auth import get_current_user
 from ContentApp.services.btext import generate_text
-from ..firebase_db import GeneratedContentDB, ActivityDB
+from ..firebase_db import (
+    GeneratedContentDB, ActivityDB, InvalidCursorError, InvalidFieldsError,
+    GENERATED_CONTENT_SUMMARY_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_fields
+)
 
 router = APIRouter(
     prefix='/content/text',
@@ -41,12 +44,26 @@ class RequestText(BaseModel):
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def fetch_all_texts(user: user_dependency):
-    """Fetch all text content for the current user"""
+async def fetch_all_texts(
+    user: user_dependency,
+    response: Response,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """Fetch a page of text content for the current user (next cursor in X-Next-Cursor)"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    results = GeneratedContentDB.get_by_owner(user["id"], content_type="text")
+    try:
+        results, next_cursor = await GeneratedContentDB.get_by_owner(
+            user["id"], content_type="text", page_size=page_size, cursor=cursor,
+            fields=parse_fields(fields, GENERATED_CONTENT_SUMMARY_FIELDS)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return results
 
 
@@ -56,7 +73,7 @@ async def read_text(user: user_dependency, text_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    text = GeneratedContentDB.get_by_id(text_id)
+    text = await GeneratedContentDB.get_by_id(text_id)
     
     if not text or text.get('owner_id') != user["id"] or text.get('type') != 'text':
         raise HTTPException(status_code=404, detail="Text not found")
@@ -70,12 +87,12 @@ async def delete_text(user: user_dependency, text_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    text = GeneratedContentDB.get_by_id(text_id)
+    text = await GeneratedContentDB.get_by_id(text_id)
     
     if not text or text.get('owner_id') != user["id"]:
         raise HTTPException(status_code=404, detail='Content not found.')
     
-    success = GeneratedContentDB.delete(text_id)
+    success = await GeneratedContentDB.delete(text_id)
     if not success:
         raise HTTPException(status_code=404, detail="Text not found or already deleted.")
 
@@ -111,12 +128,12 @@ async def generate_text_route(request: RequestText, user: user_dependency_option
         'owner_id': user['id'] if user else None
     }
     
-    new_record = GeneratedContentDB.create(content_data)
+    new_record = await GeneratedContentDB.create(content_data)
     
     # Log activity
     if user:
         try:
-            ActivityDB.create({
+            await ActivityDB.create({
                 'user_id': user['id'],
                 'type': 'content_generated',
                 'action': 'Generated Story',
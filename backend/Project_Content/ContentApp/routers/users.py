@@ -1,12 +1,18 @@
-from typing import Annotated
+import base64
+import json
+import zlib
+from datetime import datetime
+from typing import Annotated, AsyncIterator, Optional
 from pydantic import BaseModel, Field
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from starlette import status
 from .auth import get_current_user
 from passlib.context import CryptContext
 
 # Firebase imports
-from ..firebase_db import UserDB
+from ..firebase_db import UserDB, CommentThreadDB, PublishedPostDB, stream_where
+from ..firebase_config import COLLECTIONS
 
 router = APIRouter(
     prefix='/user',
@@ -17,6 +23,21 @@ user_dependency = Annotated[dict, Depends(get_current_user)]
 bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
 
+# Collections included in a data export, with the field holding the owner's ID.
+# linked_accounts is left out on purpose: it holds access tokens.
+USER_EXPORT_SOURCES = [
+    (COLLECTIONS['posts'], 'user_id'),
+    (COLLECTIONS['generated_content'], 'owner_id'),
+    (COLLECTIONS['activities'], 'user_id'),
+    (COLLECTIONS['notifications'], 'userID'),
+    (CommentThreadDB.collection, 'user_id'),
+    (PublishedPostDB.collection, 'user_id'),
+]
+
+# Lines are buffered into chunks of about this size before being sent
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
 class UserVerification(BaseModel):
     password: str
     new_password: str = Field(min_length=6)
@@ -34,7 +55,7 @@ async def get_user(user: user_dependency):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    user_data = UserDB.get_by_id(user.get('id'))
+    user_data = await UserDB.get_by_id(user.get('id'))
     if not user_data:
         raise HTTPException(status_code=404, detail='User not found')
     
@@ -49,14 +70,14 @@ async def change_password(user: user_dependency, user_verification: UserVerifica
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    user_data = UserDB.get_by_id(user.get('id'))
+    user_data = await UserDB.get_by_id(user.get('id'))
     if not user_data:
         raise HTTPException(status_code=404, detail='User not found')
 
     if not bcrypt_context.verify(user_verification.password, user_data.get('hashed_password', '')):
         raise HTTPException(status_code=401, detail='Error on password change')
     
-    UserDB.update(user.get('id'), {
+    await UserDB.update(user.get('id'), {
         'hashed_password': bcrypt_context.hash(user_verification.new_password)
     })
 
@@ -67,7 +88,7 @@ async def change_phonenumber(user: user_dependency, phone_number: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    UserDB.update(user.get('id'), {'phone_number': phone_number})
+    await UserDB.update(user.get('id'), {'phone_number': phone_number})
 
 
 @router.put("/profile", status_code=status.HTTP_200_OK)
@@ -83,21 +104,75 @@ async def update_profile(user: user_dependency, user_update: UserUpdate):
         update_data['last_name'] = user_update.last_name
     if user_update.email:
         # Check if email is already taken by another user
-        existing = UserDB.get_by_email(user_update.email)
+        existing = await UserDB.get_by_email(user_update.email)
         if existing and existing.get('id') != user.get('id'):
             raise HTTPException(status_code=400, detail='Email already in use')
         update_data['email'] = user_update.email
     
     if update_data:
-        UserDB.update(user.get('id'), update_data)
+        await UserDB.update(user.get('id'), update_data)
     
     # Return updated user data
-    updated_user = UserDB.get_by_id(user.get('id'))
+    updated_user = await UserDB.get_by_id(user.get('id'))
     updated_user.pop('hashed_password', None)
     return updated_user
 
 
+def _export_default(value):
+    """JSON encoding for Firestore values"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    return str(value)
 
 
+def _export_line(collection: str, data: dict) -> bytes:
+    return (json.dumps({'collection': collection, 'data': data}, default=_export_default) + '\n').encode()
 
 
+async def _export_chunks(user_id: str, profile: dict, compress: bool) -> AsyncIterator[bytes]:
+    """NDJSON of the profile and every owned document, gzipped on the fly if requested"""
+    # wbits=31 writes a gzip header and trailer
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray(_export_line(COLLECTIONS['users'], profile))
+    
+    for collection, owner_field in USER_EXPORT_SOURCES:
+        async for data in stream_where(collection, owner_field, user_id):
+            buffer += _export_line(collection, data)
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+                buffer.clear()
+                if chunk:
+                    yield chunk
+    
+    if compressor:
+        yield compressor.compress(bytes(buffer)) + compressor.flush()
+    elif buffer:
+        yield bytes(buffer)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_user_data(user: user_dependency, user_id: Optional[str] = None, gzip: bool = False):
+    """
+    Stream all of a user's data as NDJSON, one {"collection", "data"} object
+    per line. Admins can export another user with user_id.
+    """
+    if user is None:
+        raise HTTPException(status_code=401, detail='Authentication Failed')
+    
+    target_id = user_id or user.get('id')
+    if target_id != user.get('id') and user.get('user_role') != 'admin':
+        raise HTTPException(status_code=403, detail='Admin access required')
+    
+    profile = await UserDB.get_by_id(target_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail='User not found')
+    profile = {k: v for k, v in profile.items() if k != 'hashed_password'}
+    
+    filename = f"mediamint-export-{target_id}.ndjson" + ('.gz' if gzip else '')
+    return StreamingResponse(
+        _export_chunks(target_id, profile, gzip),
+        media_type='application/gzip' if gzip else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
@@ -1,10 +1,13 @@
 from typing import Annotated, Optional
 from pydantic import BaseModel, Field
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .auth import get_current_user
 from ..services.bvideo import generate_video
-from ..firebase_db import GeneratedContentDB, ActivityDB
+from ..firebase_db import (
+    GeneratedContentDB, ActivityDB, InvalidCursorError, InvalidFieldsError,
+    GENERATED_CONTENT_SUMMARY_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, parse_fields
+)
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
@@ -48,12 +51,26 @@ class RequestVideo(BaseModel):
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def fetch_all_videos(user: user_dependency):
-    """Fetch all video content for the current user"""
+async def fetch_all_videos(
+    user: user_dependency,
+    response: Response,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(default=None, description="'summary' or a comma-separated list of fields")
+):
+    """Fetch a page of video content for the current user (next cursor in X-Next-Cursor)"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
     
-    results = GeneratedContentDB.get_by_owner(user["id"], content_type="video")
+    try:
+        results, next_cursor = await GeneratedContentDB.get_by_owner(
+            user["id"], content_type="video", page_size=page_size, cursor=cursor,
+            fields=parse_fields(fields, GENERATED_CONTENT_SUMMARY_FIELDS)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return results
 
 
@@ -63,7 +80,7 @@ async def read_video(user: user_dependency, video_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    video = GeneratedContentDB.get_by_id(video_id)
+    video = await GeneratedContentDB.get_by_id(video_id)
     
     if not video or video.get('owner_id') != user["id"] or video.get('type') != 'video':
         raise HTTPException(status_code=404, detail="Video not found")
@@ -77,27 +94,28 @@ async def delete_video(user: user_dependency, video_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    video = GeneratedContentDB.get_by_id(video_id)
+    video = await GeneratedContentDB.get_by_id(video_id)
     
     if not video or video.get('owner_id') != user["id"]:
         raise HTTPException(status_code=404, detail='Content not found.')
     
-    success = GeneratedContentDB.delete(video_id)
+    success = await GeneratedContentDB.delete(video_id)
     if not success:
         raise HTTPException(status_code=404, detail="Video not found or already deleted.")
 
 
-def _generate_video_background(video_id: str, prompt: str, content_type: str, style: str, user_id: str = None):
+async def _generate_video_background(video_id: str, prompt: str, content_type: str, style: str, user_id: str = None):
     """Background task to generate video and update the record"""
     try:
-        data_url = generate_video(
-            prompt=prompt,
-            content_type=content_type,
-            style=style
+        # Video generation is blocking, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        data_url = await loop.run_in_executor(
+            _executor,
+            lambda: generate_video(prompt=prompt, content_type=content_type, style=style)
         )
         
         # Update the video record with the generated URL
-        GeneratedContentDB.update(video_id, {
+        await GeneratedContentDB.update(video_id, {
             'file_url': data_url,
             'status': 'completed'
         })
@@ -105,7 +123,7 @@ def _generate_video_background(video_id: str, prompt: str, content_type: str, st
         # Log activity
         if user_id:
             try:
-                ActivityDB.create({
+                await ActivityDB.create({
                     'user_id': user_id,
                     'type': 'content_generated',
                     'action': 'Generated Video',
@@ -122,7 +140,7 @@ def _generate_video_background(video_id: str, prompt: str, content_type: str, st
                 
     except Exception as e:
         # Update status to failed
-        GeneratedContentDB.update(video_id, {
+        await GeneratedContentDB.update(video_id, {
             'status': 'failed',
             'error': str(e)
         })
@@ -141,7 +159,7 @@ async def create_video(request: RequestVideo, background_tasks: BackgroundTasks,
         'owner_id': user['id'] if user else None
     }
     
-    new_video = GeneratedContentDB.create(content_data)
+    new_video = await GeneratedContentDB.create(content_data)
     
     # Start video generation in background
     background_tasks.add_task(
@@ -164,7 +182,7 @@ async def create_video(request: RequestVideo, background_tasks: BackgroundTasks,
 @router.get("/status/{video_id}", status_code=status.HTTP_200_OK)
 async def get_video_status(video_id: str, user: user_dependency_optional = None):
     """Check the status of a video generation job"""
-    video = GeneratedContentDB.get_by_id(video_id)
+    video = await GeneratedContentDB.get_by_id(video_id)
     
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
@@ -1,8 +1,8 @@
-from typing import Annotated
+from typing import Annotated, Optional
 from pydantic import BaseModel, Field
-from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status, Query, Response
 from starlette import status
-from ..firebase_db import GeneratedContentDB, ActivityDB
+from ..firebase_db import GeneratedContentDB, ActivityDB, InvalidCursorError, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from .auth import get_current_user
 from starlette.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -30,10 +30,23 @@ def redirect_to_login():
     return redirect_response
 
 @router.get("/", status_code=status.HTTP_200_OK)
-async def fetch_all_audio(user: user_dependency):
+async def fetch_all_audio(
+    user: user_dependency,
+    response: Response,
+    page_size: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """Fetch a page of audio content for the current user (next cursor in X-Next-Cursor)"""
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
-    results = GeneratedContentDB.get_by_owner(user["id"], content_type="audio")
+    try:
+        results, next_cursor = await GeneratedContentDB.get_by_owner(
+            user["id"], content_type="audio", page_size=page_size, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
     return results
 
 
@@ -42,7 +55,7 @@ async def read_audio(user: user_dependency, audio_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    audio = GeneratedContentDB.get_by_id(audio_id)
+    audio = await GeneratedContentDB.get_by_id(audio_id)
     
     if not audio or audio.get('owner_id') != user["id"] or audio.get('type') != 'audio':
         raise HTTPException(status_code=404, detail="Audio not found")
@@ -55,11 +68,11 @@ async def delete_audio_clip(user: user_dependency, audio_id: str):
     if user is None:
         raise HTTPException(status_code=401, detail='Authentication Failed')
 
-    audio = GeneratedContentDB.get_by_id(audio_id)
+    audio = await GeneratedContentDB.get_by_id(audio_id)
     if not audio or audio.get('owner_id') != user.get('id'):
         raise HTTPException(status_code=404, detail='Content not found.')
     
-    success = GeneratedContentDB.delete(audio_id)
+    success = await GeneratedContentDB.delete(audio_id)
     if not success:
         raise HTTPException(status_code=404, detail="Audio clip not found or already deleted.")
 
@@ -81,11 +94,11 @@ async def create_audio_clip(request: VoiceRequest, user: user_dependency):
         'owner_id': user["id"]
     }
     
-    new_audio = GeneratedContentDB.create(content_data)
+    new_audio = await GeneratedContentDB.create(content_data)
     
     # Log activity
     try:
-        ActivityDB.create({
+        await ActivityDB.create({
             'user_id': user['id'],
             'type': 'content_generated',
             'action': 'Generated Audio',
@@ -3,7 +3,7 @@ AWS Client Configuration
 S3 client for file storage. AI generation now uses OpenAI.
 """
 import boto3
-from ..config import AWS_REGION, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET
+from ..config import AWS_REGION, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET, FAKE_BACKENDS
 
 
 def get_aws_session():
@@ -20,6 +20,9 @@ def get_aws_session():
 
 def get_s3_client():
     """Get S3 client for file storage"""
+    if FAKE_BACKENDS:
+        from ..fakes import get_fake_s3
+        return get_fake_s3()
     session = get_aws_session()
     return session.client("s3", region_name=AWS_REGION)
 
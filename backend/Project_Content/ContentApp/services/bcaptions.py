@@ -16,7 +16,7 @@ transcribe = get_transcribe()
 BucketName = S3_BUCKET
 
 
-def generateContent(video_key: str, user_id: str):
+async def generateContent(video_key: str, user_id: str):
    
     try:
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -87,7 +87,7 @@ def generateContent(video_key: str, user_id: str):
                 'userID': user_id
             }
             
-            newContent = ContentDB.create(content_data)
+            newContent = await ContentDB.create(content_data)
 
             s3.delete_object(Bucket=BucketName,Key=audio_key)
 
@@ -96,8 +96,8 @@ def generateContent(video_key: str, user_id: str):
     except Exception as e:
         return{"status":"error","message":f"Generation failed: {str(e)}"}
        
-def approveContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def approveContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
 
     if not content:
         return{"status":"error", "message":"Content not found"}
@@ -108,7 +108,7 @@ def approveContent(content_id: str):
                    Key=new_key)
     s3.delete_object(Bucket=BucketName, Key=old_key)
     
-    ContentDB.update(content_id, {
+    await ContentDB.update(content_id, {
         'mediaURL': f"https://{BucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}",
         'isApproved': True,
         'status': "published"
@@ -116,14 +116,14 @@ def approveContent(content_id: str):
 
     return{"status":"success","url":f"https://{BucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}"}
 
-def deleteContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def deleteContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
     if not content:
         return{"status":"error", "message":"Content not found"}
     path_key=content.get('mediaURL', '').split(".com/")[-1]
     s3.delete_object(Bucket=BucketName,Key=path_key)
     
-    ContentDB.delete(content_id)
+    await ContentDB.delete(content_id)
     return {"status":"success","message":"Content deleted"}
 
 def generate_auto_captions(video_key: str):
@@ -41,7 +41,7 @@ STYLE_ENHANCEMENTS = {
     'natural': "natural lighting, organic, authentic, warm tones",
 }
 
-def generateContent(prompt: str, user_id: str, content_type: str = 'post', style: str = None):
+async def generateContent(prompt: str, user_id: str, content_type: str = 'post', style: str = None):
     """
     Generate Instagram-optimized image content using DALL-E 3.
     
@@ -94,15 +94,15 @@ def generateContent(prompt: str, user_id: str, content_type: str = 'post', style
             'status': "pending",
             'userID': user_id,
         }
-        newContent = ContentDB.create(content_data)
+        newContent = await ContentDB.create(content_data)
         return {"status": "success", "content": newContent}
 
     except Exception as e:
         return {"status": "error", "message": str(e)}
     
   
-def approveContent(content_id: str):
-   content = ContentDB.get_by_id(content_id)
+async def approveContent(content_id: str):
+   content = await ContentDB.get_by_id(content_id)
    if not content:
     return{"status":"error", "message":"Content not found"}
    
@@ -118,7 +118,7 @@ def approveContent(content_id: str):
      
     s3.delete_object(Bucket=bucketName, Key=old_key)
     
-    ContentDB.update(content_id, {
+    await ContentDB.update(content_id, {
         'mediaURL': f"https://{bucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}",
         'isApproved': True,
         'status': "published"
@@ -128,13 +128,13 @@ def approveContent(content_id: str):
    except Exception as e:
       return{"status":"error", "message":str(e)}
    
-def deleteContent(content_id: str):
-   content = ContentDB.get_by_id(content_id)
+async def deleteContent(content_id: str):
+   content = await ContentDB.get_by_id(content_id)
    if not content:
     return{"status":"error", "message":"Content not found"}
    path_key= content.get('mediaURL', '').split(".com/")[-1]
    s3.delete_object(Bucket=bucketName, Key=path_key) 
-   ContentDB.delete(content_id)
+   await ContentDB.delete(content_id)
    return{"status":"success", "message":"Content deleted"}
 
 def generate_image(prompt: str, content_type: str = 'post', style: str = None):
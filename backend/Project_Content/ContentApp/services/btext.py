@@ -7,7 +7,7 @@ from ..firebase_db import ContentDB
 from .openai_client import get_openai_client
 
 
-def generateContent(prompt: str, user_id: str):
+async def generateContent(prompt: str, user_id: str):
     """Generate text content and save to database"""
     try:
         client = get_openai_client()
@@ -30,32 +30,32 @@ def generateContent(prompt: str, user_id: str):
             'status': "pending",
             'userID': user_id
         }
-        newContent = ContentDB.create(content_data)
+        newContent = await ContentDB.create(content_data)
         return {"status": "success", "content": newContent}
 
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
-def approveContent(content_id: str):
+async def approveContent(content_id: str):
     """Approve and publish text content"""
-    content = ContentDB.get_by_id(content_id)
+    content = await ContentDB.get_by_id(content_id)
     if not content:
         return {"status": "error", "message": "Content not found"}
     
-    ContentDB.update(content_id, {
+    await ContentDB.update(content_id, {
         'isApproved': True,
         'status': "published"
     })
     return {"status": "success", "message": "Text content approved and published"}
 
 
-def deleteContent(content_id: str):
+async def deleteContent(content_id: str):
     """Delete text content"""
-    content = ContentDB.get_by_id(content_id)
+    content = await ContentDB.get_by_id(content_id)
     if not content:
         return {"status": "error", "message": "Content not found"}
-    ContentDB.delete(content_id)
+    await ContentDB.delete(content_id)
     return {"status": "success", "message": "Content deleted successfully"}
 
 
@@ -39,7 +39,7 @@ VIDEO_STYLE_ENHANCEMENTS = {
 }
 
 
-def generateContent(prompt: str, user_id: str, content_type: str = 'reel', style: str = None):
+async def generateContent(prompt: str, user_id: str, content_type: str = 'reel', style: str = None):
     """
     Generate video content using OpenAI Sora.
     
@@ -107,7 +107,7 @@ def generateContent(prompt: str, user_id: str, content_type: str = 'reel', style
             'status': "pending",
             'userID': user_id
         }
-        newContent = ContentDB.create(content_data)
+        newContent = await ContentDB.create(content_data)
         return {"status": "success", "content": newContent}
 
     except OpenAIError as e:
@@ -155,21 +155,21 @@ def _poll_video_job(client, job_id: str, timeout: int = 300, poll_interval: int
     
     return None
     
-def approveContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def approveContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
 
     if not content:
         return{"status":"error", "message":"Content not found"}
     
-    ContentDB.update(content_id, {
+    await ContentDB.update(content_id, {
         'isApproved': True,
         'status': "published"
     })
 
     return{"status":"success","message":"Video published successfully "}
 
-def deleteContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def deleteContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
     if not content:
         return{"status":"error", "message":"Content not found"}
     try:
@@ -177,7 +177,7 @@ def deleteContent(content_id: str):
             Bucket=outputBucket,
             Key=content.get('mediaURL', '')
         )
-        ContentDB.delete(content_id)
+        await ContentDB.delete(content_id)
 
         return{"status":"success","message":"Content deleted successfully"}
     except Exception as e:
@@ -8,7 +8,7 @@ polly = get_polly()
 s3 = get_s3()
 BucketName = S3_BUCKET
 
-def generateContent(user_id: str, text: str, lang: str = 'en'):
+async def generateContent(user_id: str, text: str, lang: str = 'en'):
     try:
         voice_map = {
             "en": "Joanna",
@@ -44,14 +44,14 @@ def generateContent(user_id: str, text: str, lang: str = 'en'):
             'status': "pending",
             'userID': user_id
         }
-        newContent = ContentDB.create(content_data)
+        newContent = await ContentDB.create(content_data)
         return{"status":"success","content":newContent}
     
     except Exception as e:
         return {"status":"error","message":f"Music merge failed:{str(e)}"}
     
-def approveContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def approveContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
 
     if not content:
         return{"status":"error", "message":"Content not found"}
@@ -63,20 +63,20 @@ def approveContent(content_id: str):
                    Key=new_key)
     s3.delete_object(Bucket=BucketName, Key=old_key)
 
-    ContentDB.update(content_id, {
+    await ContentDB.update(content_id, {
         'mediaURL': f"https://{BucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}",
         'isApproved': True,
         'status': "published"
     })
     return{"status":"success","url":f"https://{BucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}"}
 
-def deleteContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def deleteContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
     if not content:
         return{"status":"error", "message":"Content not found"}
     path_key=content.get('mediaURL', '').split(".com/")[-1]
     s3.delete_object(Bucket=BucketName,Key=path_key)
-    ContentDB.delete(content_id)
+    await ContentDB.delete(content_id)
     return {"status":"success", "message":"Content deleted"}
 
 def text_to_speech(text: str, lang: str = 'en'):
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from ..config import LEADER_LEASE_TTL, LEADER_LEASE_RENEW_INTERVAL
+from ..firebase_db import LeaseDB
+
+logger = logging.getLogger(__name__)
+
+
+def instance_id() -> str:
+    """Identifies this process across hosts and restarts"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderElection:
+    """
+    Runs a background job in exactly one instance. Every instance tries to
+    take the named lease; the holder runs on_elected and renews the lease, and
+    the others keep trying so one takes over within a TTL if the holder dies.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        ttl: float = LEADER_LEASE_TTL,
+        renew_interval: float = LEADER_LEASE_RENEW_INTERVAL
+    ):
+        self._name = name
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._ttl = ttl
+        self._renew_interval = renew_interval
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_renewed: Optional[float] = None
+        self.owner_id = instance_id()
+        self.is_leader = False
+        self.stats = {
+            'lease': name,
+            'owner_id': self.owner_id,
+            'is_leader': False,
+            'elected': 0,
+            'demoted': 0,
+            'renew_failures': 0,
+            'last_renewed_at': None
+        }
+
+    async def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Leader election for '{self._name}' started as {self.owner_id}")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self._demote()
+            # Hand over at once instead of making the next leader wait out the TTL
+            try:
+                await LeaseDB.release(self._name, self.owner_id)
+            except Exception as e:
+                logger.error(f"Failed to release lease '{self._name}': {e}")
+        logger.info(f"Leader election for '{self._name}' stopped")
+
+    async def _run(self):
+        while self._running:
+            await self.campaign()
+            await asyncio.sleep(self._renew_interval)
+
+    async def campaign(self):
+        """Take or renew the lease once, starting or stopping the job to match"""
+        try:
+            held = await LeaseDB.acquire(self._name, self.owner_id, self._ttl)
+        except Exception as e:
+            self.stats['renew_failures'] += 1
+            logger.error(f"Lease '{self._name}' renewal failed: {e}")
+            # Keep leading through brief errors, but stop before the lease can expire
+            # and another instance take over
+            held = (
+                self.is_leader and self._last_renewed is not None
+                and time.monotonic() - self._last_renewed < self._ttl - self._renew_interval
+            )
+        else:
+            if held:
+                self._last_renewed = time.monotonic()
+                self.stats['last_renewed_at'] = datetime.now(timezone.utc).isoformat()
+
+        if held and not self.is_leader:
+            await self._elect()
+        elif not held and self.is_leader:
+            await self._demote()
+
+    async def _elect(self):
+        logger.info(f"{self.owner_id} is now the leader for '{self._name}'")
+        self.is_leader = self.stats['is_leader'] = True
+        self.stats['elected'] += 1
+        try:
+            await self._on_elected()
+        except Exception as e:
+            logger.error(f"Failed to start '{self._name}' after election: {e}")
+
+    async def _demote(self):
+        logger.warning(f"{self.owner_id} is no longer the leader for '{self._name}'")
+        self.is_leader = self.stats['is_leader'] = False
+        self.stats['demoted'] += 1
+        try:
+            await self._on_demoted()
+        except Exception as e:
+            logger.error(f"Failed to stop '{self._name}' after losing the lease: {e}")
+
+
+# Global election for the post scheduler
+_scheduler_election: Optional[LeaderElection] = None
+
+
+def get_scheduler_election() -> LeaderElection:
+    """Get the election that decides which instance runs the post scheduler"""
+    global _scheduler_election
+    if _scheduler_election is None:
+        from .post_scheduler import start_scheduler, stop_scheduler
+        _scheduler_election = LeaderElection('post_scheduler', start_scheduler, stop_scheduler)
+    return _scheduler_election
+
+
+async def start_scheduler_election():
+    """Start competing for the scheduler lease"""
+    await get_scheduler_election().start()
+
+
+async def stop_scheduler_election():
+    """Stop the scheduler if this instance runs it and release the lease"""
+    await get_scheduler_election().stop()
+
+
+async def start_maintenance_jobs():
+    """Start the background jobs that must run in only one instance"""
+    from .stats_reconciler import start_stats_reconciler
+    from .ttl_sweeper import start_ttl_sweeper
+    from .publish_recovery import start_publish_recovery
+
+    await start_stats_reconciler()
+    await start_ttl_sweeper()
+    await start_publish_recovery()
+
+
+async def stop_maintenance_jobs():
+    """Stop the single-instance background jobs"""
+    from .stats_reconciler import stop_stats_reconciler
+    from .ttl_sweeper import stop_ttl_sweeper
+    from .publish_recovery import stop_publish_recovery
+
+    await stop_publish_recovery()
+    await stop_ttl_sweeper()
+    await stop_stats_reconciler()
+
+
+# Global election for the maintenance jobs, separate from the scheduler's so it also
+# picks a single instance when the scheduler is sharded across workers
+_maintenance_election: Optional[LeaderElection] = None
+
+
+def get_maintenance_election() -> LeaderElection:
+    """Get the election that decides which instance runs the maintenance jobs"""
+    global _maintenance_election
+    if _maintenance_election is None:
+        _maintenance_election = LeaderElection('maintenance', start_maintenance_jobs, stop_maintenance_jobs)
+    return _maintenance_election
+
+
+async def start_maintenance_election():
+    """Start competing for the maintenance lease"""
+    await get_maintenance_election().start()
+
+
+async def stop_maintenance_election():
+    """Stop the maintenance jobs if this instance runs them and release the lease"""
+    await get_maintenance_election().stop()
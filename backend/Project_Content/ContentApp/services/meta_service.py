@@ -5,23 +5,43 @@ managing comments, and handling DMs.
 """
 
 import httpx
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timezone
 from ..config import (
     META_APP_ID,
     META_APP_SECRET,
     META_REDIRECT_URI,
     META_GRAPH_API_VERSION,
-    META_GRAPH_API_BASE
+    META_GRAPH_API_BASE,
+    FAKE_BACKENDS
 )
 
 
+def _http_client(**kwargs) -> httpx.AsyncClient:
+    """HTTP client for Graph API calls, served by the in-memory Graph API when fakes are enabled"""
+    if FAKE_BACKENDS:
+        from ..fakes import get_fake_graph_api
+        kwargs['transport'] = get_fake_graph_api().transport()
+    return httpx.AsyncClient(**kwargs)
+
+
+# Graph API error codes that clear up on their own: unknown/service errors and rate limits
+TRANSIENT_ERROR_CODES = {1, 2, 4, 17, 32, 341, 613}
+
+
 class MetaAPIError(Exception):
     """Custom exception for Meta API errors"""
-    def __init__(self, message: str, error_code: Optional[int] = None, error_subcode: Optional[int] = None):
+    def __init__(
+        self,
+        message: str,
+        error_code: Optional[int] = None,
+        error_subcode: Optional[int] = None,
+        transient: bool = False
+    ):
         self.message = message
         self.error_code = error_code
         self.error_subcode = error_subcode
+        self.transient = transient or error_code in TRANSIENT_ERROR_CODES
         super().__init__(self.message)
 
 
@@ -31,7 +51,7 @@ class MetaService:
     def __init__(self, access_token: str):
         self.access_token = access_token
         self.base_url = META_GRAPH_API_BASE
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = _http_client(timeout=60.0)
     
     async def close(self):
         """Close the HTTP client"""
@@ -100,7 +120,12 @@ class MetaService:
             return result
             
         except httpx.HTTPError as e:
-            raise MetaAPIError(f"HTTP error: {str(e)}")
+            # Only failures before the request went out are safe to retry: after a read
+            # timeout, a publish may already have gone through
+            raise MetaAPIError(
+                f"HTTP error: {str(e)}",
+                transient=isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+            )
     
     @staticmethod
     def get_oauth_url(state: str, scopes: List[str] = None) -> str:
@@ -142,7 +167,7 @@ class MetaService:
             "code": code
         }
         
-        async with httpx.AsyncClient() as client:
+        async with _http_client() as client:
             response = await client.get(url, params=params)
             result = response.json()
             
@@ -164,7 +189,7 @@ class MetaService:
             "fb_exchange_token": short_lived_token
         }
         
-        async with httpx.AsyncClient() as client:
+        async with _http_client() as client:
             response = await client.get(url, params=params)
             result = response.json()
             
@@ -532,6 +557,38 @@ class MetaService:
         )
         return result.get("data", [])
     
+    async def get_comments_since(
+        self,
+        object_id: str,
+        platform: str,
+        since: Optional[datetime] = None,
+        page_size: int = 100,
+        max_pages: int = 10
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Comments on a Facebook post or Instagram media created at or after
+        `since` (whole seconds), oldest first. Follows the paging cursors for up
+        to max_pages; returns the comments and whether more pages were left.
+        """
+        if platform == 'instagram':
+            fields = "id,text,username,timestamp"
+        else:
+            fields = "id,message,from{id,name},created_time"
+        params = {"fields": fields, "limit": page_size, "order": "chronological"}
+        if since:
+            params["since"] = int(since.timestamp())
+        
+        comments = []
+        for _ in range(max_pages):
+            result = await self._make_request("GET", f"{object_id}/comments", params=params)
+            comments.extend(result.get("data", []))
+            paging = result.get("paging", {})
+            after = paging.get("cursors", {}).get("after")
+            if not paging.get("next") or not after:
+                return comments, False
+            params = {**params, "after": after}
+        return comments, True
+    
     async def reply_to_instagram_comment(
         self,
         comment_id: str,
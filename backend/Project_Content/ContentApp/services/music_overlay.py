@@ -12,7 +12,7 @@ s3 = get_s3()
 BucketName = S3_BUCKET
 
 
-def generateContent(user_id: str, video_s3_key: str, music_s3_key: str):
+async def generateContent(user_id: str, video_s3_key: str, music_s3_key: str):
     try:
         temp_dir=tempfile.gettempdir()
         temp_video_path =os.path.join(temp_dir,f"vid_{uuid.uuid4().hex}.mp4")
@@ -64,7 +64,7 @@ def generateContent(user_id: str, video_s3_key: str, music_s3_key: str):
             'userID': user_id
         }
         
-        newContent = ContentDB.create(content_data)
+        newContent = await ContentDB.create(content_data)
         for p in [temp_video_path,temp_music_path, temp_output_path]:
             if os.path.exists(p):
                 os.remove(p)
@@ -73,8 +73,8 @@ def generateContent(user_id: str, video_s3_key: str, music_s3_key: str):
     except Exception as e:
         return {"status":"error","message":f"Music merge failed:{str(e)}"}
     
-def approveContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def approveContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
 
     if not content:
         return{"status":"error", "message":"Content not found"}
@@ -85,20 +85,20 @@ def approveContent(content_id: str):
                    Key=new_key)
     s3.delete_object(Bucket=BucketName, Key=old_key)
 
-    ContentDB.update(content_id, {
+    await ContentDB.update(content_id, {
         'mediaURL': f"https://{BucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}",
         'isApproved': True,
         'status': "published"
     })
     return{"status":"success","url":f"https://{BucketName}.s3.{AWS_REGION}.amazonaws.com/{new_key}"}
 
-def deleteContent(content_id: str):
-    content = ContentDB.get_by_id(content_id)
+async def deleteContent(content_id: str):
+    content = await ContentDB.get_by_id(content_id)
     if not content:
         return{"status":"error", "message":"Content not found"}
     path_key=content.get('mediaURL', '').split(".com/")[-1]
     s3.delete_object(Bucket=BucketName,Key=path_key)
-    ContentDB.delete(content_id)
+    await ContentDB.delete(content_id)
     return {"status":"success", "message":"Content deleted"}
 
 def add_music_to_video(video_s3_key: str, music_s3_key: str):
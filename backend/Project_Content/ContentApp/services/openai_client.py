@@ -3,7 +3,7 @@ OpenAI Client Configuration
 Provides singleton OpenAI client for text and image generation
 """
 from openai import OpenAI
-from ..config import OPENAI_API_KEY
+from ..config import OPENAI_API_KEY, FAKE_BACKENDS
 
 _openai_client = None
 
@@ -12,6 +12,10 @@ def get_openai_client():
     """Get or create OpenAI client singleton"""
     global _openai_client
     if _openai_client is None:
+        if FAKE_BACKENDS:
+            from ..fakes import get_fake_openai
+            _openai_client = get_fake_openai()
+            return _openai_client
         if not OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is not set in environment variables")
         _openai_client = OpenAI(api_key=OPENAI_API_KEY)
@@ -1,11 +1,37 @@
 import asyncio
+import heapq
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Set, Tuple
 import threading
 import logging
+import time
 
-from ..firebase_config import db, COLLECTIONS
-from ..firebase_db import ActivityDB, NotificationDB
+from ..config import (
+    AUTORESPONDER_CONCURRENCY,
+    AUTORESPONDER_REPLY_CONCURRENCY,
+    AUTORESPONDER_ACCOUNT_CALLS_PER_MINUTE,
+    COMMENT_POLL_PAGE_SIZE,
+    COMMENT_POLL_MAX_PAGES,
+    DUE_POSTS_PAGE_SIZE,
+    DUE_POSTS_MAX_PER_TICK,
+    PUBLISH_CONCURRENCY,
+    PUBLISH_PER_USER_LIMIT,
+    PUBLISH_PER_ACCOUNT_LIMIT,
+    PUBLISH_SHUTDOWN_GRACE,
+    PUBLISH_VISIBILITY_TIMEOUT,
+    PUBLISH_QUEUE_POLL_INTERVAL,
+    PUBLISHING_HEARTBEAT_INTERVAL,
+    SCHEDULER_POLL_INTERVAL,
+    SCHEDULER_LOOKAHEAD,
+    SCHEDULER_SNAPSHOT_LISTENER,
+    SCHEDULER_LISTENER_CHECK_INTERVAL
+)
+from ..firebase_config import async_db, db
+from ..firebase_db import ActivityDB, NotificationDB, PublishedPostDB, UserStatsDB, to_utc_datetime, shard_for
+from ..job_queue import JobQueue, get_publish_queue
+from ..routers.posts import PostDB, add_post_change_listener, remove_post_change_listener
 from ..routers.social import AutoresponderSettingsDB, CommentThreadDB, SocialAccountDB
 from .meta_service import MetaService, MetaAPIError
 from .btext import generate_text
@@ -15,78 +41,455 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class KeyedLimiter:
+    """Caps concurrency per key; a key's semaphore is dropped once nobody holds or waits on it"""
+    
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._holders = Counter()
+    
+    @asynccontextmanager
+    async def hold(self, key: str, on_wait: Optional[Callable[[], ContextManager]] = None):
+        """Hold a slot for `key`; if it has to wait for one, it does so inside on_wait()"""
+        semaphore = self._semaphores.setdefault(key, asyncio.Semaphore(self._limit))
+        self._holders[key] += 1
+        try:
+            if semaphore.locked() and on_wait is not None:
+                with on_wait():
+                    await semaphore.acquire()
+            else:
+                await semaphore.acquire()
+            try:
+                yield
+            finally:
+                semaphore.release()
+        finally:
+            self._holders[key] -= 1
+            if not self._holders[key]:
+                del self._holders[key]
+                del self._semaphores[key]
+
+
+class CallBudget:
+    """Token bucket per key: `rate` calls per `per` seconds, with bursts of up to `rate`"""
+    
+    def __init__(self, rate: float, per: float = 60.0):
+        self._rate = rate
+        self._per = per
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, refilled at)
+    
+    def available(self, key: str) -> float:
+        now = time.monotonic()
+        tokens, refilled_at = self._buckets.get(key, (self._rate, now))
+        tokens = min(self._rate, tokens + (now - refilled_at) * self._rate / self._per)
+        self._buckets[key] = (tokens, now)
+        return tokens
+    
+    def take(self, key: str, calls: int = 1) -> bool:
+        """Spend `calls` if the budget allows, returns whether it did"""
+        if self.available(key) < calls:
+            return False
+        self.charge(key, calls)
+        return True
+    
+    def charge(self, key: str, calls: int):
+        """Spend `calls` unconditionally, e.g. for calls already made"""
+        self._buckets[key] = (self.available(key) - calls, time.monotonic())
+    
+    def prune(self):
+        """Forget keys whose budget has fully refilled"""
+        for key in list(self._buckets):
+            if self.available(key) >= self._rate:
+                del self._buckets[key]
+
+
+def _comment_time(comment: dict) -> Optional[datetime]:
+    """When a Graph comment was made: created_time on Facebook, timestamp on Instagram"""
+    value = comment.get('created_time') or comment.get('timestamp')
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S%z') if value else None
+    except ValueError:
+        return None
+
+
+class RetryablePublishError(Exception):
+    """A publish attempt failed in a way a later attempt may not"""
+
+
 class PostScheduler: 
-    def __init__(self):
+    def __init__(self, queue: Optional[JobQueue] = None):
         self._running = False
         self._task: Optional[asyncio.Task] = None
-        self._check_interval = 60  # Check every 60 seconds
+        self._check_interval = 60  # Check comments every 60 seconds
+        self._autoresponder_task: Optional[asyncio.Task] = None
+        self._autoresponder_slots = asyncio.Semaphore(AUTORESPONDER_CONCURRENCY)
+        self._reply_slots = asyncio.Semaphore(AUTORESPONDER_REPLY_CONCURRENCY)
+        self._call_budget = CallBudget(AUTORESPONDER_ACCOUNT_CALLS_PER_MINUTE)
+        self._poll_interval = SCHEDULER_POLL_INTERVAL  # Safety-net reload of the publish timers
         self._processing_comments = set()  # Track comments currently being processed
         
+        # Min-heap of (scheduled_at, post_id) for posts due before _horizon, or for every
+        # scheduled post while the snapshot listener is live. _timers holds each post's current
+        # time; heap entries that no longer match it are stale and skipped.
+        self._heap: List[tuple] = []
+        self._timers: Dict[str, datetime] = {}
+        self._horizon: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # Snapshot listener on scheduled posts. Each (re)connect gets a new generation; its
+        # first snapshot replaces the timers, later ones apply changes
+        self._listener_check_interval = SCHEDULER_LISTENER_CHECK_INTERVAL
+        self._listener_task: Optional[asyncio.Task] = None
+        self._watch = None
+        self._watch_generation = 0
+        self._listening = False
+        self._listener_lock = asyncio.Lock()
+        
+        # Shards this instance handles when the scheduler is sharded, None for all posts
+        self._shards: Optional[List[int]] = None
+        self._reload_requested = False
+        
+        # Due posts are queued as durable jobs; consumers lease up to PUBLISH_CONCURRENCY of
+        # them at once and publish each in a background task so one slow reel doesn't hold up the rest
+        self._tick_lock = asyncio.Lock()
+        self._queue = queue or get_publish_queue()
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._jobs_available = asyncio.Event()
+        # The per-user cap is applied when leasing, so a job never holds a slot waiting on its user.
+        # Jobs waiting for an account slot (_blocked) don't count against PUBLISH_CONCURRENCY either
+        self._user_jobs = Counter()
+        self._account_limiter = KeyedLimiter(PUBLISH_PER_ACCOUNT_LIMIT)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._blocked = Counter()
+        self.stats = {
+            'ticks': 0,
+            'skipped_ticks': 0,
+            'timers': 0,
+            'listener_connects': 0,
+            'snapshot_changes': 0,
+            'jobs_enqueued': 0,
+            'jobs_retried': 0,
+            'jobs_dead_lettered': 0,
+            'publishes_started': 0,
+            'publishes_failed': 0,
+            'in_flight': 0,
+            'last_publish_lag_seconds': None,
+            'max_publish_lag_seconds': 0.0,
+            'platform_latency': {},
+            'autoresponder': {
+                'ticks': 0,
+                'overruns': 0,
+                'posts_checked': 0,
+                'replies': 0,
+                'budget_skips': 0,
+                'last_tick_seconds': None,
+                'max_tick_seconds': 0.0
+            }
+        }
+        
+    @property
+    def running(self) -> bool:
+        return self._running
+    
+    async def set_shards(self, shards: Optional[Set[int]]):
+        """Only handle posts in `shards` (None for all), reloading the timers to match"""
+        self._shards = sorted(shards) if shards is not None else None
+        if not self._running:
+            return
+        
+        self._timers = {post_id: when for post_id, when in self._timers.items() if self._owns(post_id)}
+        self.stats['timers'] = len(self._timers)
+        if self._watch is not None:
+            await self._connect_listener()
+        self._reload_requested = True
+        self._wakeup.set()
+    
+    def _owns(self, post_id: str) -> bool:
+        return self._shards is None or shard_for(post_id) in self._shards
+    
     async def start(self):
         if self._running:
             logger.warning("Scheduler is already running")
             return
             
         self._running = True
+        self._loop = asyncio.get_running_loop()
+        add_post_change_listener(self._on_post_changed)
+        if SCHEDULER_SNAPSHOT_LISTENER:
+            self._listener_task = asyncio.create_task(self._supervise_listener())
         self._task = asyncio.create_task(self._run_scheduler())
-        logger.info("Post scheduler started - checking every minute")
+        self._consumer_task = asyncio.create_task(self._run_consumers())
+        self._autoresponder_task = asyncio.create_task(self._run_autoresponder())
+        logger.info("Post scheduler started")
         
     async def stop(self):
         self._running = False
-        if self._task:
-            self._task.cancel()
+        remove_post_change_listener(self._on_post_changed)
+        if self._listener_task:
+            self._listener_task.cancel()
             try:
-                await self._task
+                await self._listener_task
             except asyncio.CancelledError:
                 pass
+        async with self._listener_lock:
+            if self._watch is not None:
+                # Closing the real listener waits for its background thread
+                await asyncio.to_thread(self._watch.unsubscribe)
+                self._watch = None
+                self._listening = False
+        for task in (self._task, self._consumer_task, self._autoresponder_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        # Jobs cancelled here stay leased and are picked up again once their visibility timeout passes
+        await self.drain(timeout=PUBLISH_SHUTDOWN_GRACE)
         logger.info("Post scheduler stopped")
+    
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait for in-flight publishes, cancelling any still running after `timeout` seconds"""
+        tasks = list(self._in_flight.values())
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            logger.warning("Cancelling a publish that did not finish in time")
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
         
     async def _run_scheduler(self):
+        next_poll = 0.0
         while self._running:
+            # Cleared before the work below so a change arriving meanwhile still wakes the loop
+            self._wakeup.clear()
             try:
-                # 1. Publish scheduled posts
-                await self._check_and_publish_due_posts()
-                
-                # 2. Check for new comments (Auto-Responder)
-                await self._check_autoresponders()
+                # Publish scheduled posts: a full reload now and then, otherwise just the due timers
+                if self._reload_requested or time.monotonic() >= next_poll:
+                    self._reload_requested = False
+                    next_poll = time.monotonic() + self._poll_interval
+                    await self._check_and_publish_due_posts()
+                else:
+                    await self._publish_due_timers()
                 
             except Exception as e:
                 logger.error(f"Scheduler error: {e}")
             
-            # Wait for next check interval
-            await asyncio.sleep(self._check_interval)
+            # Sleep until the next timer or periodic check, or until a post changes
+            timeout = next_poll - time.monotonic()
+            if self._heap:
+                until_next = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+                timeout = min(timeout, until_next)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+    
+    def _on_post_changed(self, post_id: str, data: Optional[dict]):
+        """PostDB change listener; may be called from another thread's event loop"""
+        if not self._running or self._loop is None:
+            return
+        if data is not None and not {'status', 'scheduled_at'} & data.keys():
+            return
+        if not self._owns(post_id):
+            return
+        
+        if data is None or data.get('status', 'scheduled') != 'scheduled':
+            self._loop.call_soon_threadsafe(self._clear_timer, post_id)
+        else:
+            # Without a time (e.g. only the status changed) the timer fires at once and
+            # _publish_due_timers reads the post's actual scheduled_at
+            when = to_utc_datetime(data.get('scheduled_at')) or datetime.now(timezone.utc)
+            self._loop.call_soon_threadsafe(self._set_timer, post_id, when)
+    
+    async def _supervise_listener(self):
+        """Keep the scheduled-posts snapshot listener connected"""
+        while self._running:
+            if self._watch is None or not self._watch.is_active:
+                try:
+                    await self._connect_listener()
+                except Exception as e:
+                    logger.error(f"Failed to start the scheduled-posts listener: {e}")
+            await asyncio.sleep(self._listener_check_interval)
+    
+    async def _connect_listener(self):
+        # The supervisor and set_shards may both reconnect; one at a time
+        async with self._listener_lock:
+            await self._reconnect_listener()
+    
+    async def _reconnect_listener(self):
+        from google.cloud.firestore_v1 import FieldFilter
+        
+        if self._watch is not None:
+            if not self._watch.is_active:
+                logger.warning("Scheduled-posts listener disconnected, reconnecting")
+            self._listening = False
+            # Bumped first so snapshots the old listener delivers while closing are ignored
+            self._watch_generation += 1
+            watch, self._watch = self._watch, None
+            # Closing the real listener waits for its background thread
+            await asyncio.to_thread(watch.unsubscribe)
+            if not self._running:
+                return
+        
+        self._watch_generation += 1
+        self.stats['listener_connects'] += 1
+        generation = self._watch_generation
+        initial = True
+        
+        # Runs on the listener's background thread
+        def on_snapshot(docs, changes, read_time):
+            nonlocal initial
+            if initial:
+                initial = False
+                reset, changed = True, docs
+            else:
+                reset = False
+                changed = [c.document for c in changes if c.type.name != 'REMOVED']
+            timers = {doc.id: (doc.to_dict() or {}).get('scheduled_at') for doc in changed}
+            removed = [c.document.id for c in changes if c.type.name == 'REMOVED']
+            try:
+                self._loop.call_soon_threadsafe(self._apply_snapshot, generation, reset, timers, removed)
+            except RuntimeError:
+                # The event loop has already closed
+                pass
+        
+        query = db.collection(PostDB.collection).where(filter=FieldFilter('status', '==', 'scheduled'))
+        if self._shards is not None:
+            query = query.where(filter=FieldFilter('shard', 'in', self._shards))
+        self._watch = query.on_snapshot(on_snapshot)
+    
+    def _apply_snapshot(self, generation: int, reset: bool, timers: Dict[str, Any], removed: List[str]):
+        if generation != self._watch_generation or not self._running:
+            # From a listener that has since been replaced
+            return
+        
+        if reset:
+            self._heap = []
+            self._timers = {}
+            self._listening = True
+        for post_id in removed:
+            self._clear_timer(post_id)
+        for post_id, scheduled_at in timers.items():
+            try:
+                when = to_utc_datetime(scheduled_at)
+            except ValueError:
+                when = None
+            if when:
+                self._set_timer(post_id, when)
+            else:
+                self._clear_timer(post_id)
+        
+        self.stats['snapshot_changes'] += len(timers) + len(removed)
+        self.stats['timers'] = len(self._timers)
+        self._wakeup.set()
+    
+    def _set_timer(self, post_id: str, when: datetime):
+        if not self._listening and (self._horizon is None or when > self._horizon):
+            # Beyond the loaded window; the next reload picks it up
+            self._clear_timer(post_id)
+            return
+        self._timers[post_id] = when
+        heapq.heappush(self._heap, (when, post_id))
+        self.stats['timers'] = len(self._timers)
+        self._wakeup.set()
+    
+    def _clear_timer(self, post_id: str):
+        if self._timers.pop(post_id, None) is not None:
+            self.stats['timers'] = len(self._timers)
+    
+    def _pop_due_timers(self, now: datetime) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, post_id = heapq.heappop(self._heap)
+            if self._timers.get(post_id) == when:
+                del self._timers[post_id]
+                due.append(post_id)
+        self.stats['timers'] = len(self._timers)
+        return due
+    
+    async def _publish_due_timers(self):
+        """Start publishing the posts whose timers have fired"""
+        now = datetime.now(timezone.utc)
+        post_ids = self._pop_due_timers(now)
+        if not post_ids:
+            return
+        
+        # The timer may be out of date; go by what is stored now
+        due_posts = []
+        for post_id, post in (await PostDB.get_many(post_ids)).items():
+            if post.get('status') != 'scheduled':
+                continue
+            when = to_utc_datetime(post.get('scheduled_at'))
+            if when is None:
+                continue
+            if when <= now:
+                due_posts.append({**post, 'id': post_id})
+            else:
+                self._set_timer(post_id, when)
+        
+        await self._enqueue_publishes(due_posts)
 
+    async def _run_autoresponder(self):
+        """Check for new comments every _check_interval, apart from publishing so neither holds up the other"""
+        while self._running:
+            started = time.monotonic()
+            await self._check_autoresponders()
+            elapsed = time.monotonic() - started
+            self._record_autoresponder_tick(elapsed)
+            await asyncio.sleep(max(self._check_interval - elapsed, 0))
+    
+    def _record_autoresponder_tick(self, seconds: float):
+        stats = self.stats['autoresponder']
+        stats['ticks'] += 1
+        stats['last_tick_seconds'] = seconds
+        stats['max_tick_seconds'] = max(stats['max_tick_seconds'], seconds)
+        if seconds > self._check_interval:
+            stats['overruns'] += 1
+            logger.warning(f"Auto-responder tick took {seconds:.1f}s, longer than the {self._check_interval}s interval")
+    
     async def _check_autoresponders(self):
         try:
             # Get all enabled settings
-            active_settings = AutoresponderSettingsDB.get_all_active()
+            active_settings = await AutoresponderSettingsDB.get_all_active(self._shards)
             if not active_settings:
                 # logger.info("   (No active auto-responders)")
                 return
 
             logger.info(f"Checking {len(active_settings)} active auto-responders...")
-
-            for setting in active_settings:
-                try:
-                    await self._process_auto_response_for_post(setting)
-                except Exception as e:
-                    logger.error(f"Error processing auto-responder for post {setting.get('post_id')}: {e}")
+            self._call_budget.prune()
+            await asyncio.gather(*[self._check_autoresponder(setting) for setting in active_settings])
 
         except Exception as e:
             logger.error(f"Error checking auto-responders: {e}")
+    
+    async def _check_autoresponder(self, setting: dict):
+        async with self._autoresponder_slots:
+            self.stats['autoresponder']['posts_checked'] += 1
+            try:
+                await self._process_auto_response_for_post(setting)
+            except Exception as e:
+                logger.error(f"Error processing auto-responder for post {setting.get('post_id')}: {e}")
 
     async def _process_auto_response_for_post(self, setting: dict):
         user_id = setting.get('user_id')
-        internal_post_id = setting.get('post_id')
         social_post_ids = setting.get('social_post_ids', {})
+        cursors = setting.get('comment_cursors') or {}
         
         if not social_post_ids:
             return
 
         # Get user accounts once
-        accounts = SocialAccountDB.get_by_user(user_id)
+        accounts = await SocialAccountDB.get_by_user(user_id)
         
         for platform, social_id in social_post_ids.items():
+            if platform not in ('facebook', 'instagram'):
+                continue
+            
             # Find account for this platform
             account = next((a for a in accounts if a.get('platform') == platform), None)
             if not account:
@@ -99,46 +502,7 @@ class PostScheduler:
             # Check comments
             meta_service = MetaService(access_token)
             try:
-                if platform == 'facebook':
-                    comments = await meta_service.get_post_comments(social_id)
-                elif platform == 'instagram':
-                    comments = await meta_service.get_instagram_media_comments(social_id)
-                else:
-                    comments = []
-
-                # Process each comment
-                for comment in comments:
-                    comment_id = comment.get('id')
-                    
-                    if not comment_id:
-                        continue
-
-                    # Skip if we already responded (check replied flag in database)
-                    if CommentThreadDB.has_responded_to_comment(comment_id):
-                        continue
-                    
-                    # Skip if currently processing this comment (in-memory lock)
-                    if comment_id in self._processing_comments:
-                         continue
-                    
-                    # Try to reserve this comment in database to prevent race conditions
-                    if not CommentThreadDB.mark_as_replied(comment_id):
-                        # Another process already reserved this comment
-                        continue
-                         
-                    # Add to processing set
-                    self._processing_comments.add(comment_id)
-                    
-                    # Generate and Post Reply
-                    try:
-                        await self._generate_and_reply(
-                            setting, account, platform, internal_post_id, social_id, comment, meta_service
-                        )
-                    finally:
-                        # Remove from processing set when done
-                        if comment_id in self._processing_comments:
-                            self._processing_comments.remove(comment_id)
-
+                await self._poll_comments(setting, account, platform, social_id, cursors.get(platform), meta_service)
             except Exception as e:
                 # Log error but don't crash scheduler
                 # logger.error(f"Error polling comments for {platform} post {social_id}: {e}")
@@ -146,14 +510,107 @@ class PostScheduler:
             finally:
                 await meta_service.close()
 
-    async def _generate_and_reply(self, setting, account, platform, internal_post_id, social_post_id, comment, meta_service):
+    async def _poll_comments(self, setting, account, platform, social_id, cursor, meta_service):
+        """Reply to the comments made since the platform's cursor, then move the cursor past them"""
+        # A cursor kept for another social post (the post was published again) doesn't apply
+        if not cursor or cursor.get('social_post_id') != social_id:
+            cursor = {}
+        since = start_since = to_utc_datetime(cursor.get('since'))
+        seen_ids = set(cursor.get('seen_ids', []))
+        start_seen = set(seen_ids)
+        
+        # Read no more pages than the account's budget allows
+        budget_key = self._budget_key(account)
+        max_pages = min(COMMENT_POLL_MAX_PAGES, int(self._call_budget.available(budget_key)))
+        if max_pages < 1:
+            self.stats['autoresponder']['budget_skips'] += 1
+            return
+        comments, truncated = await meta_service.get_comments_since(
+            social_id, platform, since, page_size=COMMENT_POLL_PAGE_SIZE, max_pages=max_pages
+        )
+        self._call_budget.charge(budget_key, max_pages if truncated else len(comments) // COMMENT_POLL_PAGE_SIZE + 1)
+        # `since` is whole seconds and inclusive, so comments at the cursor's own second come back
+        comments = [c for c in comments if c.get('id') and c['id'] not in seen_ids]
+        if not comments:
+            return
+        
+        # One batched read for every new comment's thread: a thread means we already
+        # replied, or another run holds the reservation
+        threads = await CommentThreadDB.get_many([c['id'] for c in comments])
+        
+        # The cursor only moves past comments that are done with. One whose reply failed
+        # keeps it in place, so it is polled again once its reservation is released
+        comments.sort(key=lambda c: _comment_time(c) or datetime.min.replace(tzinfo=timezone.utc))
+        handled = await asyncio.gather(*[
+            self._handle_comment(setting, account, platform, social_id, comment, threads, meta_service)
+            for comment in comments
+        ])
+        advancing = True
+        for comment, done in zip(comments, handled):
+            if not done:
+                advancing = False
+            created = _comment_time(comment)
+            if advancing and created:
+                if created != since:
+                    since, seen_ids = created, set()
+                seen_ids.add(comment['id'])
+        
+        if since != start_since or seen_ids != start_seen:
+            await AutoresponderSettingsDB.set_comment_cursor(setting.get('post_id'), platform, {
+                'social_post_id': social_id,
+                'since': since,
+                'seen_ids': sorted(seen_ids)
+            })
+
+    @staticmethod
+    def _budget_key(account: dict) -> str:
+        # Facebook and Instagram calls made with one page's token count against that page
+        return account.get('pageID') or account.get('accountID') or account.get('id')
+    
+    async def _handle_comment(self, setting, account, platform, social_id, comment, threads, meta_service) -> bool:
+        """Reply to one comment unless that already happened; returns whether the comment is done with"""
+        comment_id = comment['id']
+        
+        # Already replied, or reserved by a run that may yet fail
+        if comment_id in threads:
+            return bool(threads[comment_id].get('replied'))
+        
+        # Skip if currently processing this comment (in-memory lock)
+        if comment_id in self._processing_comments:
+            return False
+        
+        # Out of Graph calls for this account; a later tick picks the comment up
+        if not self._call_budget.take(self._budget_key(account)):
+            self.stats['autoresponder']['budget_skips'] += 1
+            return False
+        
+        # Try to reserve this comment in database to prevent race conditions
+        if not await CommentThreadDB.mark_as_replied(comment_id):
+            # Another process already reserved this comment
+            return False
+        
+        # Add to processing set
+        self._processing_comments.add(comment_id)
+        
+        # Generate and Post Reply
+        try:
+            async with self._reply_slots:
+                return await self._generate_and_reply(
+                    setting, account, platform, setting.get('post_id'), social_id, comment, meta_service
+                )
+        finally:
+            # Remove from processing set when done
+            self._processing_comments.discard(comment_id)
+
+    async def _generate_and_reply(self, setting, account, platform, internal_post_id, social_post_id, comment, meta_service) -> bool:
+        """Generate and post a reply, returns False if posting it failed"""
         comment_id = comment.get('id')
         comment_text = comment.get('message') or comment.get('text')
         commenter_name = comment.get('from', {}).get('name') or comment.get('username')
         commenter_id = comment.get('from', {}).get('id')
         
         if not comment_text:
-            return
+            return True
 
         logger.info(f" Found new comment on {platform}: '{comment_text}' by {commenter_name}")
 
@@ -182,7 +639,8 @@ class PostScheduler:
         # Try to generate AI response, fall back to standard message on failure
         response_text = ""
         try:
-            response_text = generate_text(prompt).strip()
+            # The client is synchronous; run it off the event loop
+            response_text = (await asyncio.to_thread(generate_text, prompt)).strip()
             # Remove quotes if AI added them
             if response_text.startswith('"') and response_text.endswith('"'):
                 response_text = response_text[1:-1]
@@ -192,7 +650,7 @@ class PostScheduler:
             response_text = "Thanks for your interaction!"
 
         if not response_text:
-            return
+            return True
 
         try:
             # Post Reply
@@ -202,7 +660,7 @@ class PostScheduler:
                 await meta_service.reply_to_instagram_comment(comment_id, response_text)
             
             # Record it
-            CommentThreadDB.record_response({
+            await CommentThreadDB.record_response({
                 'post_id': internal_post_id,
                 'social_post_id': social_post_id,
                 'comment_id': comment_id,
@@ -215,43 +673,229 @@ class PostScheduler:
                 'tone': tone
             })
             logger.info(f"✅ Auto-responded to comment {comment_id}")
+            self.stats['autoresponder']['replies'] += 1
+            return True
 
         except Exception as e:
             logger.error(f"Failed to post reply: {e}")
+            return False
 
   
     
     async def _check_and_publish_due_posts(self):
-        logger.info(f"Checking for scheduled posts at {datetime.now(timezone.utc).isoformat()}")
+        """
+        Reload the timers from Firestore and publish everything already due. While
+        the snapshot listener keeps the timers, this only publishes what is due.
+        """
+        # Ticks never overlap; a tick only starts publishes, it doesn't wait for them
+        if self._tick_lock.locked():
+            self.stats['skipped_ticks'] += 1
+            logger.info("Previous publish tick still running, skipping")
+            return
         
-        try:
-            # Get all scheduled posts that are due
-            due_posts = self._get_due_posts()
+        async with self._tick_lock:
+            self.stats['ticks'] += 1
+            now = datetime.now(timezone.utc)
+            logger.info(f"Checking for scheduled posts at {now.isoformat()}")
             
-            if not due_posts:
-                logger.info("No posts due for publishing")
-                return
+            try:
+                if self._listening:
+                    due_posts = await self._get_due_posts(now)
+                else:
+                    due_posts = await self._reload_timers(now)
+                
+                if not due_posts:
+                    logger.info("No posts due for publishing")
+                    return
                 
-            logger.info(f"Found {len(due_posts)} posts due for publishing")
+                await self._enqueue_publishes(due_posts)
+                        
+            except Exception as e:
+                logger.error(f"Error checking due posts: {e}")
+    
+    async def _reload_timers(self, now: datetime) -> List[dict]:
+        """Replace the timers with the posts due before the look-ahead horizon, returns those already due"""
+        horizon = now + timedelta(seconds=SCHEDULER_LOOKAHEAD)
+        upcoming = await self._get_due_posts(horizon)
+        if len(upcoming) >= DUE_POSTS_MAX_PER_TICK:
+            # Truncated: only trust the window up to the last post loaded
+            horizon = upcoming[-1]['scheduled_at']
+        
+        self._heap = [(p['scheduled_at'], p['id']) for p in upcoming if p['scheduled_at'] > now]
+        heapq.heapify(self._heap)
+        self._timers = {post_id: when for when, post_id in self._heap}
+        self._horizon = horizon
+        self.stats['timers'] = len(self._timers)
+        return [p for p in upcoming if p['scheduled_at'] <= now]
+    
+    async def _enqueue_publishes(self, due_posts: List[dict]):
+        """Queue a publish job per due post and move the posts out of 'scheduled'"""
+        if not due_posts:
+            return
+        
+        logger.info(f"Found {len(due_posts)} posts due for publishing")
+        
+        for post in due_posts:
+            post_id = post.get('id')
+            try:
+                # Keyed by post ID, so a post queued before a crash isn't queued twice
+                if await self._queue.enqueue(post_id, {'post_id': post_id, 'user_id': post.get('user_id')}):
+                    self.stats['jobs_enqueued'] += 1
+                # Once 'publishing', timers and ticks stop picking it up; the job carries it from here
+                await self._mark_as_publishing(post_id)
+            except Exception as e:
+                logger.error(f"Failed to queue post {post_id}: {e}")
+        self._jobs_available.set()
+    
+    async def _run_consumers(self):
+        """Lease queued jobs whenever publish slots are free"""
+        while self._running:
+            self._jobs_available.clear()
+            try:
+                await self.dispatch()
+            except Exception as e:
+                logger.error(f"Publish queue error: {e}")
             
-            for post in due_posts:
-                post_id = post.get('id')
-                try:
-                    # Mark as publishing FIRST to prevent duplicate processing
-                    if not self._mark_as_publishing(post_id):
-                        logger.info(f"Post {post_id} already being processed, skipping")
-                        continue
-                    
-                    await self._publish_post(post)
-                except Exception as e:
-                    logger.error(f"Failed to publish post {post_id}: {e}")
-                    # Update post status to failed
-                    self._update_post_status(post_id, 'failed', str(e))
-                    
+            # Woken by new jobs and finished publishes; the poll catches retries coming due
+            # and jobs queued by other instances
+            try:
+                await asyncio.wait_for(self._jobs_available.wait(), timeout=PUBLISH_QUEUE_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def dispatch(self) -> int:
+        """
+        Lease as many jobs as there are free slots and start publishing them,
+        returns how many. Jobs of users already at PUBLISH_PER_USER_LIMIT are
+        passed over and pushed back so other users' jobs behind them come up.
+        """
+        free = PUBLISH_CONCURRENCY - (len(self._in_flight) - len(self._blocked))
+        if free <= 0:
+            return 0
+        
+        reserved = Counter(self._user_jobs)
+        
+        def has_user_slot(job: dict) -> bool:
+            user_id = job['payload'].get('user_id')
+            if reserved[user_id] >= PUBLISH_PER_USER_LIMIT:
+                return False
+            reserved[user_id] += 1
+            return True
+        
+        jobs = await self._queue.lease(
+            free, PUBLISH_VISIBILITY_TIMEOUT, accept=has_user_slot, defer=PUBLISH_QUEUE_POLL_INTERVAL,
+            shards=self._shards
+        )
+        for job in jobs:
+            user_id = job['payload'].get('user_id')
+            self._user_jobs[user_id] += 1
+            task = asyncio.create_task(self._run_job(job))
+            self._in_flight[job['id']] = task
+            task.add_done_callback(lambda _, job_id=job['id'], user_id=user_id: self._publish_done(job_id, user_id))
+        self.stats['in_flight'] = len(self._in_flight)
+        return len(jobs)
+    
+    async def _run_job(self, job: dict):
+        """Publish the post behind a leased job, then complete, retry or dead-letter the job"""
+        post_id = job['payload'].get('post_id') or job['id']
+        heartbeat = asyncio.create_task(self._heartbeat(job, post_id))
+        try:
+            await self._publish_due_post(post_id, job['attempts'])
+        except Exception as e:
+            await self._fail_job(job, post_id, e)
+            return
+        finally:
+            heartbeat.cancel()
+        
+        try:
+            await self._queue.complete(job)
         except Exception as e:
-            logger.error(f"Error checking due posts: {e}")
+            # The job reappears after its visibility timeout and finds the post no longer publishing
+            logger.error(f"Failed to complete publish job for post {post_id}: {e}")
     
-    def _mark_as_publishing(self, post_id: str) -> bool:
+    async def _heartbeat(self, job: dict, post_id: str):
+        """
+        While a job runs, extend its lease so a long upload isn't handed to another
+        consumer, and stamp the post so publish recovery knows it is still alive
+        """
+        interval = min(PUBLISHING_HEARTBEAT_INTERVAL, PUBLISH_VISIBILITY_TIMEOUT / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self._queue.extend(job, PUBLISH_VISIBILITY_TIMEOUT):
+                    logger.warning(f"Lost the lease on publish job {job['id']}")
+                    return
+                await PostDB.heartbeat(post_id)
+            except Exception as e:
+                logger.error(f"Publish heartbeat for post {post_id} failed: {e}")
+    
+    async def _fail_job(self, job: dict, post_id: str, error: Exception):
+        try:
+            outcome = await self._queue.fail(job, str(error))
+        except Exception as e:
+            logger.error(f"Failed to reschedule publish job for post {post_id}: {e}")
+            return
+        
+        if outcome == 'dead':
+            self.stats['jobs_dead_lettered'] += 1
+            self.stats['publishes_failed'] += 1
+            logger.error(f"Giving up on post {post_id} after {job['attempts']} attempts: {error}")
+            await self._update_post_status(post_id, 'failed', str(error))
+            await self._create_notification(job['payload'].get('user_id'), "Failed to publish your scheduled post. Please try again.")
+        else:
+            self.stats['jobs_retried'] += 1
+            logger.warning(f"Attempt {job['attempts']} to publish post {post_id} failed, retrying: {error}")
+    
+    async def _publish_due_post(self, post_id: str, attempt: int):
+        """Publish one queued post"""
+        post = await PostDB.get_by_id(post_id)
+        if not post:
+            return
+        
+        # Normally marked when queued; a job left behind by a crash may find it still scheduled
+        if post.get('status') == 'scheduled':
+            if not await self._mark_as_publishing(post_id):
+                logger.info(f"Post {post_id} already being processed, skipping")
+                return
+        elif post.get('status') != 'publishing':
+            logger.info(f"Post {post_id} is {post.get('status')}, nothing to publish")
+            return
+        
+        if attempt == 1:
+            self.stats['publishes_started'] += 1
+            self._record_publish_lag(post)
+        await self._publish_post(post, attempt)
+    
+    def _publish_done(self, post_id: str, user_id: Optional[str]):
+        self._in_flight.pop(post_id, None)
+        self._user_jobs[user_id] -= 1
+        if not self._user_jobs[user_id]:
+            del self._user_jobs[user_id]
+        self.stats['in_flight'] = len(self._in_flight)
+        # A slot is free for the next job
+        self._jobs_available.set()
+    
+    @contextmanager
+    def _waiting_for_account(self, post_id: str):
+        """While a post waits for an account slot its global slot is free for another job"""
+        self._blocked[post_id] += 1
+        self._jobs_available.set()
+        try:
+            yield
+        finally:
+            self._blocked[post_id] -= 1
+            if not self._blocked[post_id]:
+                del self._blocked[post_id]
+    
+    def _record_publish_lag(self, post: dict):
+        scheduled_at = post.get('scheduled_at')
+        if not isinstance(scheduled_at, datetime):
+            return
+        lag = (datetime.now(timezone.utc) - scheduled_at).total_seconds()
+        self.stats['last_publish_lag_seconds'] = lag
+        self.stats['max_publish_lag_seconds'] = max(self.stats['max_publish_lag_seconds'], lag)
+    
+    async def _mark_as_publishing(self, post_id: str) -> bool:
         """
         Atomically mark a post as 'publishing' to prevent duplicate processing.
         Returns True if successfully marked, False if already being processed.
@@ -259,11 +903,11 @@ class PostScheduler:
         from google.cloud import firestore
         
         try:
-            post_ref = db.collection('posts').document(post_id)
+            post_ref = async_db.collection('posts').document(post_id)
             
-            @firestore.transactional
-            def update_in_transaction(transaction):
-                snapshot = post_ref.get(transaction=transaction)
+            @firestore.async_transactional
+            async def update_in_transaction(transaction):
+                snapshot = await post_ref.get(transaction=transaction)
                 if not snapshot.exists:
                     return False
                 
@@ -273,77 +917,56 @@ class PostScheduler:
                     return False
                 
                 # Mark as publishing
+                now = datetime.now(timezone.utc)
                 transaction.update(post_ref, {
                     'status': 'publishing',
-                    'publishing_started_at': datetime.now(timezone.utc)
+                    'publishing_started_at': now,
+                    'publishing_heartbeat_at': now
                 })
+                before = snapshot.to_dict()
+                UserStatsDB.apply(
+                    transaction, before.get('user_id'),
+                    UserStatsDB.delta(before, {**before, 'status': 'publishing'})
+                )
                 return True
             
-            transaction = db.transaction()
-            return update_in_transaction(transaction)
+            transaction = async_db.transaction()
+            return await update_in_transaction(transaction)
             
         except Exception as e:
             logger.error(f"Error marking post as publishing: {e}")
             return False
     
-    def _get_due_posts(self) -> List[dict]:
-        from google.cloud.firestore_v1 import FieldFilter
-        
-        now = datetime.now(timezone.utc)
-        logger.info(f"Current time (UTC): {now.isoformat()}")
+    async def _get_due_posts(self, until: Optional[datetime] = None) -> List[dict]:
+        """
+        Page through the scheduled posts due by `until` (default now), oldest
+        first, up to DUE_POSTS_MAX_PER_TICK. Anything left over is picked up
+        next tick.
+        """
+        until = until or datetime.now(timezone.utc)
         
         try:
-            docs = db.collection('posts').where(
-                filter=FieldFilter('status', '==', 'scheduled')
-            ).get()
-            
-            all_scheduled = list(docs)
-            logger.info(f"Found {len(all_scheduled)} posts with status 'scheduled'")
-            
             due_posts = []
-            for doc in all_scheduled:
-                post = doc.to_dict()
-                post['id'] = doc.id  # Ensure we have the document ID
-                
-                scheduled_at = post.get('scheduled_at')
-                # logger.info(f"   - Post {doc.id}: scheduled_at={scheduled_at} (type: {type(scheduled_at).__name__})")
-                
-                if not scheduled_at:
-                    logger.warning(f"   Post {doc.id} has no scheduled_at field")
-                    continue
-                
-                # Handle various datetime formats
-                if isinstance(scheduled_at, str):
-                    try:
-                        scheduled_at = datetime.fromisoformat(scheduled_at.replace('Z', '+00:00'))
-                    except ValueError:
-                        logger.warning(f"   Invalid scheduled_at format for post {doc.id}: {scheduled_at}")
-                        continue
-                elif hasattr(scheduled_at, 'timestamp'):
-                    # Handle Firestore Timestamp objects
-                    scheduled_at = datetime.fromtimestamp(scheduled_at.timestamp(), tz=timezone.utc)
-                elif not isinstance(scheduled_at, datetime):
-                    logger.warning(f"   Unknown scheduled_at type for post {doc.id}: {type(scheduled_at)}")
-                    continue
-                
-                # Ensure timezone awareness
-                if scheduled_at.tzinfo is None:
-                    scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
-                
-                # Check if post is due (scheduled time has passed or is now)
-                is_due = scheduled_at <= now
-                # logger.info(f"   - Post {doc.id}: scheduled_at={scheduled_at.isoformat()}, is_due={is_due}")
-                
-                if is_due:
-                    due_posts.append(post)
-                    
+            cursor = None
+            while len(due_posts) < DUE_POSTS_MAX_PER_TICK:
+                page_size = min(DUE_POSTS_PAGE_SIZE, DUE_POSTS_MAX_PER_TICK - len(due_posts))
+                posts, cursor = await PostDB.get_due(until, page_size=page_size, cursor=cursor, shards=self._shards)
+                due_posts.extend(posts)
+                if not cursor:
+                    break
+            
             return due_posts
             
         except Exception as e:
             logger.error(f"Error fetching due posts: {e}")
             return []
     
-    async def _publish_post(self, post: dict):
+    async def _publish_post(self, post: dict, attempt: int = 1):
+        """
+        Publish a post to its platforms. Before the last attempt, raises
+        RetryablePublishError if a platform failed transiently. A retry, or a run
+        after publish recovery, skips the platforms already published to.
+        """
         post_id = post.get('id')
         user_id = post.get('user_id')
         platforms = post.get('platforms', [])
@@ -359,62 +982,40 @@ class PostScheduler:
         
         if not platforms:
             logger.warning(f" Post {post_id} has no platforms specified")
-            self._update_post_status(post_id, 'failed', 'No platforms specified')
+            await self._update_post_status(post_id, 'failed', 'No platforms specified')
             return
             
         if not media_url:
             logger.warning(f"Post {post_id} has no media URL")
-            self._update_post_status(post_id, 'failed', 'No media URL')
+            await self._update_post_status(post_id, 'failed', 'No media URL')
             return
         
         # Get user's connected social accounts
-        connected_accounts = self._get_user_accounts(user_id)
+        connected_accounts = await self._get_user_accounts(user_id)
         
         if not connected_accounts:
             logger.warning(f"User {user_id} has no connected social accounts")
-            self._update_post_status(post_id, 'failed', 'No connected social accounts')
+            await self._update_post_status(post_id, 'failed', 'No connected social accounts')
             return
         
-        publish_results = []
-        successful_platforms = []
-        failed_platforms = []
+        resuming = attempt > 1 or post.get('publishing_recoveries')
+        already_published = await self._get_published_platforms(post_id) if resuming else {}
         
-        for platform in platforms:
-            # Find matching account for this platform
-            account = self._find_account_for_platform(connected_accounts, platform)
-            
-            if not account:
-                logger.warning(f" No connected account found for platform: {platform}")
-                failed_platforms.append({
-                    'platform': platform,
-                    'error': 'No connected account'
-                })
-                continue
-            
-            try:
-                result = await self._publish_to_platform(
-                    account=account,
-                    platform=platform,
-                    media_url=media_url,
-                    caption=caption,
-                    media_type=media_type,
-                    post_id=post_id,
-                    user_id=user_id
-                )
-                
-                successful_platforms.append({
-                    'platform': platform,
-                    'platform_post_id': result.get('platform_post_id')
-                })
-                
-                logger.info(f" Successfully published to {platform}")
-                
-            except Exception as e:
-                logger.error(f" Failed to publish to {platform}: {e}")
-                failed_platforms.append({
-                    'platform': platform,
-                    'error': str(e)
-                })
+        # Publish to every platform at once; one platform failing doesn't affect the others
+        results = await asyncio.gather(*[
+            self._publish_to_target(connected_accounts, platform, media_url, caption, media_type, post_id, user_id)
+            for platform in platforms if platform not in already_published
+        ])
+        successful_platforms = [
+            {'platform': platform, 'platform_post_id': platform_post_id}
+            for platform, platform_post_id in already_published.items() if platform in platforms
+        ] + [r for r in results if 'error' not in r]
+        failed_platforms = [r for r in results if 'error' in r]
+        
+        retryable = [p for p in failed_platforms if p.get('retryable')]
+        if retryable and attempt < self._queue.max_attempts:
+            raise RetryablePublishError(f"Failed to publish to {[p['platform'] for p in retryable]}: "
+                                        f"{[p['error'] for p in retryable]}")
         
         # Build social_post_ids map from successful platforms
         social_post_ids = {}
@@ -425,36 +1026,87 @@ class PostScheduler:
         # Update post status based on results
         if successful_platforms and not failed_platforms:
             # All platforms succeeded
-            self._update_post_status(post_id, 'published', social_post_ids=social_post_ids)
-            self._create_activity(user_id, post, 'published', successful_platforms)
-            self._create_notification(user_id, f"Your post has been published to {', '.join([p['platform'] for p in successful_platforms])}")
+            await self._update_post_status(post_id, 'published', social_post_ids=social_post_ids)
+            await self._create_activity(user_id, post, 'published', successful_platforms)
+            await self._create_notification(user_id, f"Your post has been published to {', '.join([p['platform'] for p in successful_platforms])}")
         elif successful_platforms and failed_platforms:
             # Partial success
-            self._update_post_status(post_id, 'partially_published', 
+            await self._update_post_status(post_id, 'partially_published', 
                 f"Published to: {[p['platform'] for p in successful_platforms]}, Failed: {[p['platform'] for p in failed_platforms]}",
                 social_post_ids=social_post_ids)
-            self._create_activity(user_id, post, 'partially_published', successful_platforms)
-            self._create_notification(user_id, f"Your post was partially published. Some platforms failed.")
+            await self._create_activity(user_id, post, 'partially_published', successful_platforms)
+            await self._create_notification(user_id, f"Your post was partially published. Some platforms failed.")
         else:
             # All failed
-            self._update_post_status(post_id, 'failed', 
+            await self._update_post_status(post_id, 'failed', 
                 f"Failed to publish to all platforms: {[p['error'] for p in failed_platforms]}")
-            self._create_notification(user_id, f"Failed to publish your scheduled post. Please try again.")
+            await self._create_notification(user_id, f"Failed to publish your scheduled post. Please try again.")
     
-    def _get_user_accounts(self, user_id: str) -> List[dict]:
-        """Get all connected social accounts for a user"""
-        from google.cloud.firestore_v1 import FieldFilter
+    async def _publish_to_target(
+        self,
+        connected_accounts: List[dict],
+        platform: str,
+        media_url: str,
+        caption: str,
+        media_type: str,
+        post_id: str,
+        user_id: str
+    ) -> dict:
+        """Publish to one platform, returning {'platform', 'platform_post_id'} or {'platform', 'error', 'retryable'}"""
+        # Find matching account for this platform
+        account = self._find_account_for_platform(connected_accounts, platform)
         
+        if not account:
+            logger.warning(f" No connected account found for platform: {platform}")
+            return {'platform': platform, 'error': 'No connected account'}
+        
+        started = time.monotonic()
         try:
-            # Query by userID only to avoid composite index requirement
-            # Then filter is_active in Python
-            docs = db.collection(COLLECTIONS['linked_accounts']).where(
-                filter=FieldFilter('userID', '==', user_id)
-            ).get()
+            # Caps concurrent uploads to one connected account across all posts. Keyed per
+            # platform: Instagram is usually reached through the same account as Facebook
+            account_key = f"{platform.lower()}:{account.get('accountID') or account.get('pageID') or account.get('id')}"
+            async with self._account_limiter.hold(account_key, on_wait=lambda: self._waiting_for_account(post_id)):
+                result = await self._publish_to_platform(
+                    account=account,
+                    platform=platform,
+                    media_url=media_url,
+                    caption=caption,
+                    media_type=media_type,
+                    post_id=post_id,
+                    user_id=user_id
+                )
+            
+            logger.info(f" Successfully published to {platform}")
+            return {'platform': platform, 'platform_post_id': result.get('platform_post_id')}
             
+        except Exception as e:
+            logger.error(f" Failed to publish to {platform}: {e}")
+            return {'platform': platform, 'error': str(e), 'retryable': isinstance(e, MetaAPIError) and e.transient}
+        
+        finally:
+            self._record_platform_latency(platform, time.monotonic() - started)
+    
+    def _record_platform_latency(self, platform: str, seconds: float):
+        latency = self.stats['platform_latency'].setdefault(platform.lower(), {
+            'count': 0, 'total_seconds': 0.0, 'last_seconds': None, 'max_seconds': 0.0
+        })
+        latency['count'] += 1
+        latency['total_seconds'] += seconds
+        latency['last_seconds'] = seconds
+        latency['max_seconds'] = max(latency['max_seconds'], seconds)
+    
+    async def _get_published_platforms(self, post_id: str) -> Dict[str, Optional[str]]:
+        """Platforms an earlier attempt published the post to, with their platform post IDs"""
+        records = await PublishedPostDB.get_by_internal_post(post_id)
+        return {r['platform']: r.get('platform_post_id') for r in records if r.get('status') == 'published'}
+    
+    async def _get_user_accounts(self, user_id: str) -> List[dict]:
+        """Get all connected social accounts for a user"""
+        try:
+            # Query by userID only (served from the account cache when warm)
+            # Then filter is_active in Python
             accounts = []
-            for doc in docs:
-                account = doc.to_dict()
+            for account in await SocialAccountDB.get_by_user(user_id):
                 # Filter active accounts in Python
                 if account.get('is_active', True):  # Default to True if not set
                     accounts.append(account)
@@ -550,7 +1202,7 @@ class PostScheduler:
                 raise Exception(f"Unsupported platform: {platform}")
             
             # Record the published post
-            self._record_published_post(
+            await self._record_published_post(
                 internal_post_id=post_id,
                 user_id=user_id,
                 account_id=account.get('accountID'),
@@ -564,7 +1216,7 @@ class PostScheduler:
             
         except MetaAPIError as e:
             # Record failed attempt
-            self._record_published_post(
+            await self._record_published_post(
                 internal_post_id=post_id,
                 user_id=user_id,
                 account_id=account.get('accountID'),
@@ -574,16 +1226,15 @@ class PostScheduler:
                 status='failed',
                 error_message=e.message
             )
-            raise Exception(e.message)
+            raise
             
         finally:
             await meta_service.close()
     
-    def _update_post_status(self, post_id: str, status: str, error_message: str = None, social_post_ids: dict = None):
+    async def _update_post_status(self, post_id: str, status: str, error_message: str = None, social_post_ids: dict = None):
         try:
             update_data = {
-                'status': status,
-                'updated_at': datetime.now(timezone.utc)
+                'status': status
             }
             
             if status == 'published':
@@ -597,14 +1248,17 @@ class PostScheduler:
                 update_data['social_post_ids'] = social_post_ids
                 logger.info(f"📝 Saving social_post_ids: {social_post_ids}")
                 
-            db.collection('posts').document(post_id).update(update_data)
+            # PostDB.update sets updated_at and moves the post between status counters
+            if not await PostDB.update(post_id, update_data):
+                logger.error(f"Failed to update post {post_id} status to: {status}")
+                return
             logger.info(f"📝 Updated post {post_id} status to: {status}")
             
             # Update autoresponder settings with social_post_ids if available
             if social_post_ids:
                 try:
                     # Check if autoresponder settings exist for this post
-                    current_settings = AutoresponderSettingsDB.get_by_post(post_id)
+                    current_settings = await AutoresponderSettingsDB.get_by_post(post_id)
                     if current_settings:
                         # Update with new social IDs
                         user_id = current_settings.get('user_id')
@@ -620,7 +1274,7 @@ class PostScheduler:
                             'social_post_ids': existing_ids,
                             'post_caption': current_settings.get('post_caption')
                         }
-                        AutoresponderSettingsDB.save(post_id, user_id, settings_update)
+                        await AutoresponderSettingsDB.save(post_id, user_id, settings_update)
                         logger.info(f"Updated autoresponder settings with social IDs for post {post_id}")
                 except Exception as e:
                     logger.error(f"Failed to update autoresponder settings: {e}")
@@ -628,7 +1282,7 @@ class PostScheduler:
         except Exception as e:
             logger.error(f"Failed to update post status: {e}")
     
-    def _record_published_post(
+    async def _record_published_post(
         self,
         internal_post_id: str,
         user_id: str,
@@ -656,17 +1310,17 @@ class PostScheduler:
                 'error_message': error_message,
                 'published_at': datetime.now(timezone.utc)
             }
-            db.collection('published_posts').document(record_id).set(record_data)
+            await async_db.collection('published_posts').document(record_id).set(record_data)
             
         except Exception as e:
             logger.error(f"Failed to record published post: {e}")
     
-    def _create_activity(self, user_id: str, post: dict, status: str, platforms: List[dict]):
+    async def _create_activity(self, user_id: str, post: dict, status: str, platforms: List[dict]):
         """Create an activity record for the published post"""
         try:
             platform_names = ', '.join([p['platform'] for p in platforms])
             
-            ActivityDB.create({
+            await ActivityDB.create({
                 'user_id': user_id,
                 'type': 'post_published',
                 'action': 'Published Scheduled Post',
@@ -683,10 +1337,10 @@ class PostScheduler:
         except Exception as e:
             logger.error(f"Failed to create activity: {e}")
     
-    def _create_notification(self, user_id: str, message: str):
+    async def _create_notification(self, user_id: str, message: str):
         """Create a notification for the user"""
         try:
-            NotificationDB.create({
+            await NotificationDB.create({
                 'userID': user_id,
                 'type': 'scheduled_post',
                 'message': message
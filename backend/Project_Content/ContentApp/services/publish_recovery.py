@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Dict, Optional
+
+from google.cloud import firestore
+
+from ..config import (
+    PUBLISH_RECOVERY_INTERVAL,
+    PUBLISH_RECOVERY_BATCH_SIZE,
+    PUBLISHING_STALE_AFTER,
+    PUBLISH_MAX_RECOVERIES
+)
+from ..firebase_config import async_db
+from ..firebase_cache import post_stats_cache
+from ..firebase_db import NotificationDB, UserStatsDB, to_utc_datetime
+from ..job_queue import JobQueue, get_publish_queue
+from ..routers.posts import PostDB, _notify_post_changed
+
+logger = logging.getLogger(__name__)
+
+
+class PublishRecovery:
+    """
+    Finds posts left in 'publishing' by a worker that died mid-publish: their
+    heartbeat has gone stale and the queue holds no job for them. Each is put
+    back on the queue, and the consumer skips the platforms published_posts
+    already records so nothing is posted twice. A post that stalls more than
+    max_recoveries times is marked failed instead.
+    """
+
+    def __init__(
+        self,
+        interval: float = PUBLISH_RECOVERY_INTERVAL,
+        stale_after: float = PUBLISHING_STALE_AFTER,
+        batch_size: int = PUBLISH_RECOVERY_BATCH_SIZE,
+        max_recoveries: int = PUBLISH_MAX_RECOVERIES,
+        queue: Optional[JobQueue] = None
+    ):
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._interval = interval
+        self._stale_after = stale_after
+        self._batch_size = batch_size
+        self._max_recoveries = max_recoveries
+        self._queue = queue or get_publish_queue()
+        self._lock = asyncio.Lock()
+        self.stats = {
+            'runs': 0,
+            'failed_runs': 0,
+            'stale_found': 0,
+            'still_queued': 0,
+            'requeued': 0,
+            'failed': 0,
+            'last_run': None,
+            'last_run_at': None,
+            'last_error': None
+        }
+
+    async def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Publish recovery started - checking every {self._interval:.0f}s")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Publish recovery stopped")
+
+    async def _run(self):
+        while self._running:
+            await self.sweep()
+            await asyncio.sleep(self._interval)
+
+    async def sweep(self) -> Dict[str, int]:
+        """Recover one batch of stalled posts, returns how each was handled"""
+        async with self._lock:
+            started = datetime.now(timezone.utc)
+            cutoff = started - timedelta(seconds=self._stale_after)
+            counts = {'stale_found': 0, 'still_queued': 0, 'requeued': 0, 'failed': 0}
+            try:
+                for post in await PostDB.get_stale_publishing(cutoff, self._batch_size):
+                    counts['stale_found'] += 1
+                    outcome = await self._recover(post, cutoff)
+                    if outcome:
+                        counts[outcome] += 1
+            except Exception as e:
+                self.stats['failed_runs'] += 1
+                self.stats['last_error'] = str(e)
+                logger.error(f"Publish recovery failed: {e}")
+                return counts
+
+            self.stats['runs'] += 1
+            for name, count in counts.items():
+                self.stats[name] += count
+            self.stats['last_run'] = counts
+            self.stats['last_run_at'] = started.isoformat()
+            self.stats['last_error'] = None
+            if counts['requeued'] or counts['failed']:
+                logger.warning(f"Publish recovery handled stalled posts: {counts}")
+            return counts
+
+    async def _recover(self, post: dict, cutoff: datetime) -> Optional[str]:
+        post_id = post['id']
+        # Waiting for a free slot or a retry; the job still carries it
+        if await self._queue.get(post_id):
+            return 'still_queued'
+
+        if post.get('publishing_recoveries', 0) >= self._max_recoveries:
+            failure = {'status': 'failed', 'error_message': 'Publishing stalled repeatedly'}
+            if not await self._claim(post_id, cutoff, lambda stalled: failure):
+                return None
+            await NotificationDB.create({
+                'userID': post.get('user_id'),
+                'type': 'scheduled_post',
+                'message': 'Failed to publish your scheduled post. Please try again.'
+            })
+            return 'failed'
+
+        if not await self._claim(post_id, cutoff, lambda stalled: {
+            'publishing_heartbeat_at': datetime.now(timezone.utc),
+            'publishing_recoveries': stalled.get('publishing_recoveries', 0) + 1
+        }):
+            return None
+        await self._queue.enqueue(post_id, {'post_id': post_id, 'user_id': post.get('user_id')})
+        return 'requeued'
+
+    async def _claim(self, post_id: str, cutoff: datetime, changes: Callable[[dict], dict]) -> bool:
+        """Write `changes` to the post, unless it moved on or another sweep got there first"""
+        post_ref = async_db.collection(PostDB.collection).document(post_id)
+
+        @firestore.async_transactional
+        async def claim_in_transaction(transaction):
+            snapshot = await post_ref.get(transaction=transaction)
+            if not snapshot.exists or snapshot.get('status') != 'publishing':
+                return None
+            before = snapshot.to_dict()
+            heartbeat = to_utc_datetime(before.get('publishing_heartbeat_at'))
+            if heartbeat and heartbeat >= cutoff:
+                return None
+            data = {**changes(before), 'updated_at': datetime.now(timezone.utc)}
+            transaction.update(post_ref, data)
+            UserStatsDB.apply(transaction, before.get('user_id'), UserStatsDB.delta(before, {**before, **data}))
+            return before, data
+
+        claimed = await claim_in_transaction(async_db.transaction())
+        if claimed is None:
+            return False
+        before, data = claimed
+        if 'status' in data:
+            post_stats_cache.invalidate(before.get('user_id'))
+        _notify_post_changed(post_id, data)
+        return True
+
+
+# Global recovery instance
+_recovery: Optional[PublishRecovery] = None
+
+
+def get_publish_recovery() -> PublishRecovery:
+    """Get the global publish recovery instance"""
+    global _recovery
+    if _recovery is None:
+        _recovery = PublishRecovery()
+    return _recovery
+
+
+async def start_publish_recovery():
+    """Start the global publish recovery"""
+    await get_publish_recovery().start()
+
+
+async def stop_publish_recovery():
+    """Stop the global publish recovery"""
+    await get_publish_recovery().stop()
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional, Set
+
+from ..config import SCHEDULER_SHARDS, LEADER_LEASE_TTL, LEADER_LEASE_RENEW_INTERVAL
+from ..firebase_db import LeaseDB, shard_for
+from .leader_election import instance_id
+
+logger = logging.getLogger(__name__)
+
+
+class ShardCoordinator:
+    """
+    Splits `shards` between the live workers through leases. Each worker
+    heartbeats a member lease, works out its fair share (shards / members,
+    with the remainder going one each to the first members by ID) and leases
+    free shards up to it, handing back any above it so a joining worker can
+    pick them up. Shards of a worker that dies are taken
+    over once their leases expire.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_change: Callable[[Set[int]], Awaitable[None]],
+        shards: int = SCHEDULER_SHARDS,
+        ttl: float = LEADER_LEASE_TTL,
+        renew_interval: float = LEADER_LEASE_RENEW_INTERVAL
+    ):
+        self._name = name
+        self._on_change = on_change
+        self._shards = shards
+        self._ttl = ttl
+        self._renew_interval = renew_interval
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_rebalanced: Optional[float] = None
+        self.owner_id = instance_id()
+        self.owned: Set[int] = set()
+        self.stats = {
+            'owner_id': self.owner_id,
+            'shards': shards,
+            'owned': [],
+            'members': 0,
+            'rebalances': 0,
+            'failures': 0,
+            'last_rebalanced_at': None
+        }
+
+    def _member_lease(self, owner: str) -> str:
+        return f"{self._name}:member:{owner}"
+
+    def _shard_lease(self, shard: int) -> str:
+        return f"{self._name}:shard:{shard}"
+
+    async def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Shard coordinator for '{self._name}' started as {self.owner_id} ({self._shards} shards)")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        released = sorted(self.owned)
+        await self._set_owned(set())
+        # Hand the shards over at once instead of making the others wait out the TTL
+        try:
+            for shard in released:
+                await LeaseDB.release(self._shard_lease(shard), self.owner_id)
+            await LeaseDB.release(self._member_lease(self.owner_id), self.owner_id)
+        except Exception as e:
+            logger.error(f"Failed to release leases for '{self._name}': {e}")
+        logger.info(f"Shard coordinator for '{self._name}' stopped")
+
+    async def _run(self):
+        while self._running:
+            await self.rebalance()
+            await asyncio.sleep(self._renew_interval)
+
+    async def rebalance(self):
+        """Renew this worker's leases and take or hand back shards to reach its fair share"""
+        try:
+            await LeaseDB.acquire(self._member_lease(self.owner_id), self.owner_id, self._ttl)
+            owners = sorted({lease['owner'] for lease in await LeaseDB.list_active(f"{self._name}:member:")} | {self.owner_id})
+            members = len(owners)
+            fair_share = self._fair_share(owners.index(self.owner_id), members)
+
+            held = set()
+            for shard in sorted(self.owned):
+                if await LeaseDB.acquire(self._shard_lease(shard), self.owner_id, self._ttl):
+                    held.add(shard)
+
+            for shard in sorted(held, reverse=True)[:max(len(held) - fair_share, 0)]:
+                await LeaseDB.release(self._shard_lease(shard), self.owner_id)
+                held.discard(shard)
+
+            # Start looking at a different shard per worker so they don't all race for the same one
+            start = shard_for(self.owner_id, self._shards)
+            for offset in range(self._shards):
+                if len(held) >= fair_share:
+                    break
+                shard = (start + offset) % self._shards
+                if shard not in held and await LeaseDB.acquire(self._shard_lease(shard), self.owner_id, self._ttl):
+                    held.add(shard)
+        except Exception as e:
+            self.stats['failures'] += 1
+            logger.error(f"Shard rebalance for '{self._name}' failed: {e}")
+            # Keep the shards through brief errors, but let go before their leases can expire
+            if self._last_rebalanced is None or time.monotonic() - self._last_rebalanced >= self._ttl - self._renew_interval:
+                await self._set_owned(set())
+            return
+
+        self._last_rebalanced = time.monotonic()
+        self.stats['members'] = members
+        self.stats['last_rebalanced_at'] = datetime.now(timezone.utc).isoformat()
+        await self._set_owned(held)
+
+    def _fair_share(self, index: int, members: int) -> int:
+        """Shards for the member at `index` of the sorted owners, so the shares add up to exactly `shards`"""
+        share, remainder = divmod(self._shards, members)
+        return share + (1 if index < remainder else 0)
+
+    async def _set_owned(self, shards: Set[int]):
+        if shards == self.owned:
+            return
+        logger.info(f"{self.owner_id} now owns shards {sorted(shards)} of '{self._name}'")
+        self.owned = set(shards)
+        self.stats['owned'] = sorted(shards)
+        self.stats['rebalances'] += 1
+        try:
+            await self._on_change(set(shards))
+        except Exception as e:
+            logger.error(f"Failed to apply shards {sorted(shards)} for '{self._name}': {e}")
+
+
+async def _run_scheduler_shards(shards: Set[int]):
+    """Point the scheduler at `shards`, starting or stopping it as needed"""
+    from .post_scheduler import get_scheduler
+
+    scheduler = get_scheduler()
+    if not shards:
+        await scheduler.stop()
+        return
+    await scheduler.set_shards(shards)
+    if not scheduler.running:
+        await scheduler.start()
+
+
+# Global coordinator for the post scheduler
+_coordinator: Optional[ShardCoordinator] = None
+
+
+def get_shard_coordinator() -> ShardCoordinator:
+    """Get the coordinator that assigns scheduler shards to this instance"""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = ShardCoordinator('post_scheduler', _run_scheduler_shards)
+    return _coordinator
+
+
+async def start_shard_coordinator():
+    """Start claiming scheduler shards"""
+    await get_shard_coordinator().start()
+
+
+async def stop_shard_coordinator():
+    """Stop the scheduler for this instance's shards and release them"""
+    await get_shard_coordinator().stop()
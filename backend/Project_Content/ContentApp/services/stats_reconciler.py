@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from ..config import STATS_RECONCILE_INTERVAL
+from ..firebase_db import UserStatsDB
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReconciler:
+    """Periodically rebuilds the user_stats counters to correct any drift"""
+
+    def __init__(self, interval: float = STATS_RECONCILE_INTERVAL):
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._interval = interval
+        self.stats = {
+            'runs': 0,
+            'failed_runs': 0,
+            'users_reconciled': 0,
+            'last_run_at': None
+        }
+
+    async def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Stats reconciler started - rebuilding every {self._interval:.0f}s")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("Stats reconciler stopped")
+
+    async def _run(self):
+        while self._running:
+            # A pass on start also fills in counters for users who posted before they existed
+            await self.reconcile()
+            await asyncio.sleep(self._interval)
+
+    async def reconcile(self) -> int:
+        """Rebuild every user's counters, returns the number of users written"""
+        try:
+            count = await UserStatsDB.rebuild_all()
+        except Exception as e:
+            self.stats['failed_runs'] += 1
+            logger.error(f"Stats reconcile failed: {e}")
+            return 0
+
+        self.stats['runs'] += 1
+        self.stats['users_reconciled'] = count
+        self.stats['last_run_at'] = datetime.now(timezone.utc).isoformat()
+        logger.info(f"Reconciled post counters for {count} users")
+        return count
+
+
+# Global reconciler instance
+_reconciler: Optional[StatsReconciler] = None
+
+
+def get_stats_reconciler() -> StatsReconciler:
+    """Get the global reconciler instance"""
+    global _reconciler
+    if _reconciler is None:
+        _reconciler = StatsReconciler()
+    return _reconciler
+
+
+async def start_stats_reconciler():
+    """Start the global reconciler"""
+    await get_stats_reconciler().start()
+
+
+async def stop_stats_reconciler():
+    """Stop the global reconciler"""
+    await get_stats_reconciler().stop()
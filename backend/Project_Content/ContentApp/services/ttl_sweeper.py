@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from ..config import (
+    TTL_SWEEP_INTERVAL,
+    TTL_SWEEP_BATCH_SIZE,
+    TTL_SWEEP_MAX_DELETES_PER_SECOND,
+    EXPIRED_TOKEN_RETENTION_HOURS,
+    COMMENT_RESERVATION_TIMEOUT
+)
+from ..firebase_db import RefreshTokenDB, PasswordResetTokenDB, OAuthStateDB, CommentThreadDB
+
+logger = logging.getLogger(__name__)
+
+
+class TTLSweeper:
+    """
+    Periodically deletes expired tokens and OAuth states and releases comment
+    reservations abandoned by crashed autoresponder runs. Deletes go out in
+    batches, paced to stay under max_deletes_per_second.
+    """
+
+    def __init__(
+        self,
+        interval: float = TTL_SWEEP_INTERVAL,
+        batch_size: int = TTL_SWEEP_BATCH_SIZE,
+        max_deletes_per_second: float = TTL_SWEEP_MAX_DELETES_PER_SECOND
+    ):
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self._interval = interval
+        self._batch_size = batch_size
+        self._max_deletes_per_second = max_deletes_per_second
+        self._lock = asyncio.Lock()
+        self._purgers: Dict[str, Callable[[datetime, int], Awaitable[int]]] = {
+            'oauth_states': OAuthStateDB.purge_expired,
+            'password_reset_tokens': PasswordResetTokenDB.purge_expired,
+            'refresh_tokens': RefreshTokenDB.purge_expired,
+            'comment_reservations': CommentThreadDB.release_stale_reservations
+        }
+        self.stats = {
+            'runs': 0,
+            'failed_runs': 0,
+            'deleted': {name: 0 for name in self._purgers},
+            'last_run_deleted': 0,
+            'last_run_seconds': None,
+            'last_run_at': None,
+            'last_error': None
+        }
+
+    async def start(self):
+        if self._running:
+            return
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"TTL sweeper started - sweeping every {self._interval:.0f}s")
+
+    async def stop(self):
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        logger.info("TTL sweeper stopped")
+
+    async def _run(self):
+        while self._running:
+            await self.sweep()
+            await asyncio.sleep(self._interval)
+
+    def _cutoffs(self) -> Dict[str, datetime]:
+        now = datetime.now(timezone.utc)
+        token_cutoff = now - timedelta(hours=EXPIRED_TOKEN_RETENTION_HOURS)
+        return {
+            'oauth_states': token_cutoff,
+            'password_reset_tokens': token_cutoff,
+            'refresh_tokens': token_cutoff,
+            'comment_reservations': now - timedelta(seconds=COMMENT_RESERVATION_TIMEOUT)
+        }
+
+    async def _sweep_collection(self, name: str, cutoff: datetime) -> int:
+        purge = self._purgers[name]
+        total = 0
+        while True:
+            deleted = await purge(cutoff, self._batch_size)
+            total += deleted
+            self.stats['deleted'][name] += deleted
+            if deleted < self._batch_size:
+                return total
+            # Pace batches so a large backlog doesn't compete with request traffic
+            if self._max_deletes_per_second > 0:
+                await asyncio.sleep(deleted / self._max_deletes_per_second)
+
+    async def sweep(self) -> Dict[str, int]:
+        """Run one pass over every collection, returns deletions per collection"""
+        async with self._lock:
+            started = datetime.now(timezone.utc)
+            deleted = {}
+            try:
+                for name, cutoff in self._cutoffs().items():
+                    deleted[name] = await self._sweep_collection(name, cutoff)
+            except Exception as e:
+                self.stats['failed_runs'] += 1
+                self.stats['last_error'] = str(e)
+                logger.error(f"TTL sweep failed: {e}")
+                return deleted
+
+            self.stats['runs'] += 1
+            self.stats['last_run_deleted'] = sum(deleted.values())
+            self.stats['last_run_seconds'] = round((datetime.now(timezone.utc) - started).total_seconds(), 3)
+            self.stats['last_run_at'] = started.isoformat()
+            self.stats['last_error'] = None
+            if self.stats['last_run_deleted']:
+                logger.info(f"TTL sweep removed {deleted}")
+            return deleted
+
+
+# Global sweeper instance
+_sweeper: Optional[TTLSweeper] = None
+
+
+def get_ttl_sweeper() -> TTLSweeper:
+    """Get the global sweeper instance"""
+    global _sweeper
+    if _sweeper is None:
+        _sweeper = TTLSweeper()
+    return _sweeper
+
+
+async def start_ttl_sweeper():
+    """Start the global sweeper"""
+    await get_ttl_sweeper().start()
+
+
+async def stop_ttl_sweeper():
+    """Stop the global sweeper"""
+    await get_ttl_sweeper().stop()
@@ -0,0 +1,18 @@
+import os
+
+# Run the suite against the in-memory backends (ContentApp/fakes); these must be
+# set before ContentApp.config is imported
+os.environ.setdefault('MEDIAMINT_FAKE_BACKENDS', 'true')
+os.environ.setdefault('VERIFY_INDEXES_ON_STARTUP', 'false')
+
+import pytest
+
+from ..fakes import reset_fakes
+from ..firebase_cache import clear_caches
+
+
+@pytest.fixture(autouse=True)
+def fresh_backends():
+    reset_fakes()
+    clear_caches()
+    yield
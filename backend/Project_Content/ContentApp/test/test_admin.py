@@ -1,39 +1,26 @@
 from .utils import *
 from ..routers.auth import get_current_user
 from fastapi import status
-from ..firebase_db import TodosDB
 
 app.dependency_overrides[get_current_user] = override_get_current_user
 
-def test_admin_read_all_authenticated(test_todo):
-    response = client.get("/admin/todo")
-    assert response.status_code == status.HTTP_200_OK
-    # Check that response contains our test todo
-    todos = response.json()
-    assert len(todos) >= 1
-    assert any(t['title'] == 'Learn to code!' for t in todos)
-
-
-def test_admin_delete_todo(test_todo):
-    todo_id = test_todo['id']
-    response = client.delete(f"/admin/todo/{todo_id}")
-    assert response.status_code == 204
-
-    model = TodosDB.get_by_id(todo_id)
-    assert model is None
-
-
-def test_admin_delete_todo_not_found():
-    response = client.delete("/admin/todo/nonexistent_id_9999")
-    assert response.status_code == 404
-    assert response.json() == {'detail': 'Todo not found.'}
-
-
-
-
-
 
+def test_admin_read_cache_metrics():
+    response = client.get("/metrics/cache")
+    assert response.status_code == status.HTTP_200_OK
+    assert 'users' in response.json()
 
 
+def test_admin_read_stats_reconciler_metrics():
+    response = client.get("/metrics/stats-reconciler")
+    assert response.status_code == status.HTTP_200_OK
 
 
+def test_metrics_require_admin():
+    app.dependency_overrides[get_current_user] = lambda: {'username': 'plainuser', 'id': 'user_2', 'user_role': 'user'}
+    try:
+        response = client.get("/metrics/cache")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert response.json() == {'detail': 'Admin access required'}
+    finally:
+        app.dependency_overrides[get_current_user] = override_get_current_user
@@ -1,29 +1,35 @@
 from .utils import *
-from ..routers.auth import get_db, authenticate_user, create_access_token, SECRET_KEY, ALGORITHM, get_current_user
+from ..routers.auth import authenticate_user, create_access_token, SECRET_KEY, ALGORITHM, get_current_user
 from jose import jwt
 from datetime import timedelta
 import pytest
 from fastapi import HTTPException
 
-app.dependency_overrides[get_db] = override_get_db
 
 def test_authenticate_user(test_user):
-    db = TestingSessionLocal()
+    authenticated_user = asyncio.run(authenticate_user(test_user['username'], 'testpassword'))
+    assert authenticated_user
+    assert authenticated_user['username'] == test_user['username']
 
-    authenticated_user = authenticate_user(test_user.username, 'testpassword', db)
-    assert authenticated_user is not None
-    assert authenticated_user.username == test_user.username
-
-    non_existent_user = authenticate_user('WrongUserName', 'testpassword', db)
+    non_existent_user = asyncio.run(authenticate_user('WrongUserName', 'testpassword'))
     assert non_existent_user is False
 
-    wrong_password_user = authenticate_user(test_user.username, 'wrongpassword', db)
+    wrong_password_user = asyncio.run(authenticate_user(test_user['username'], 'wrongpassword'))
     assert wrong_password_user is False
 
 
+def test_login_for_access_token(test_user):
+    response = client.post("/auth/token", data={'username': test_user['username'], 'password': 'testpassword'})
+    assert response.status_code == 200
+    body = response.json()
+    decoded_token = jwt.decode(body['access_token'], SECRET_KEY, algorithms=[ALGORITHM])
+    assert decoded_token['id'] == test_user['id']
+    assert body['refresh_token']
+
+
 def test_create_access_token():
     username = 'testuser'
-    user_id = 1
+    user_id = 'user_1'
     role = 'user'
     expires_delta = timedelta(days=1)
 
@@ -39,11 +45,11 @@ def test_create_access_token():
 
 @pytest.mark.asyncio
 async def test_get_current_user_valid_token():
-    encode = {'sub': 'testuser', 'id': 1, 'role': 'admin'}
+    encode = {'sub': 'testuser', 'id': 'user_1', 'role': 'admin'}
     token = jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
 
     user = await get_current_user(token=token)
-    assert user == {'username': 'testuser', 'id': 1, 'user_role': 'admin'}
+    assert user == {'username': 'testuser', 'id': 'user_1', 'user_role': 'admin'}
 
 
 @pytest.mark.asyncio
@@ -58,8 +64,35 @@ async def test_get_current_user_missing_payload():
     assert excinfo.value.detail == 'Could not validate user.'
 
 
+def test_refresh_token_stored_by_hash_and_revocable(test_user):
+    from ..firebase_db import RefreshTokenDB, hash_token
+
+    response = client.post("/auth/token", data={'username': test_user['username'], 'password': 'testpassword'})
+    refresh_token = response.json()['refresh_token']
 
+    # Only the hash is stored, as the document ID
+    doc = asyncio.run(async_db.collection(COLLECTIONS['refresh_tokens']).document(hash_token(refresh_token)).get())
+    assert doc.exists and refresh_token not in doc.to_dict().values()
+    assert client.post("/auth/refresh", json={'refresh_token': refresh_token}).status_code == 200
 
+    assert asyncio.run(RefreshTokenDB.revoke(hash_token(refresh_token)))
+    assert asyncio.run(RefreshTokenDB.get_by_token(refresh_token)) is None
+    assert client.post("/auth/refresh", json={'refresh_token': refresh_token}).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_legacy_refresh_token_moves_under_its_hash():
+    from datetime import datetime, timezone
+    from ..firebase_db import RefreshTokenDB, hash_token
 
+    tokens = async_db.collection(COLLECTIONS['refresh_tokens'])
+    await tokens.document('random_id').set({
+        'token': 'legacy-token', 'user_id': 'user_1', 'revoked': False,
+        'expires_at': datetime.now(timezone.utc) + timedelta(days=1)
+    })
 
+    found = await RefreshTokenDB.get_by_token('legacy-token')
 
+    assert found['id'] == hash_token('legacy-token') and 'token' not in found
+    assert not (await tokens.document('random_id').get()).exists
+    assert (await tokens.document(hash_token('legacy-token')).get()).exists
@@ -0,0 +1,70 @@
+from ..firebase_db import UserDB, SocialAccountDB, CommentThreadDB, GET_ALL_CHUNK_SIZE, IN_FILTER_LIMIT
+from ..fakes import get_fake_firestore
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_get_many_spans_chunks_and_skips_missing():
+    users = [await UserDB.create({'username': f'user{i}', 'email': f'user{i}@email.com'})
+             for i in range(GET_ALL_CHUNK_SIZE + 5)]
+    ids = [u['id'] for u in users]
+
+    found = await UserDB.get_many(ids + ['missing_user', ids[0]])
+
+    assert set(found) == set(ids)
+    assert found[ids[-1]]['username'] == f'user{GET_ALL_CHUNK_SIZE + 4}'
+
+
+@pytest.mark.asyncio
+async def test_get_many_uses_cache_for_known_users():
+    user = await UserDB.create({'username': 'cached', 'email': 'cached@email.com'})
+    await UserDB.get_by_id(user['id'])
+
+    store = get_fake_firestore()
+    await store.collection('users').document(user['id']).update({'username': 'changed'})
+
+    # Served from the cache, the same as get_by_id
+    assert (await UserDB.get_many([user['id']]))[user['id']]['username'] == 'cached'
+
+
+@pytest.mark.asyncio
+async def test_get_by_page_ids_spans_in_filter_limit():
+    page_ids = [f'page_{i}' for i in range(IN_FILTER_LIMIT + 3)]
+    for page_id in page_ids:
+        await SocialAccountDB.create({'userID': 'user_1', 'platform': 'facebook', 'pageID': page_id})
+
+    accounts = await SocialAccountDB.get_by_page_ids(page_ids + ['page_unknown'])
+
+    assert set(accounts) == set(page_ids)
+
+
+@pytest.mark.asyncio
+async def test_comment_threads_include_reservations():
+    await CommentThreadDB.mark_as_replied('reserved')
+    await CommentThreadDB.record_response({'comment_id': 'answered', 'post_id': 'post_1'})
+
+    threads = await CommentThreadDB.get_many(['reserved', 'answered', 'new'])
+
+    assert set(threads) == {'reserved', 'answered'}
+    assert threads['answered']['replied'] is True
+
+
+@pytest.mark.asyncio
+async def test_user_update_invalidates_cache():
+    user = await UserDB.create({'username': 'before', 'email': 'before@email.com'})
+    assert (await UserDB.get_by_id(user['id']))['username'] == 'before'
+
+    assert await UserDB.update(user['id'], {'username': 'after'})
+
+    assert (await UserDB.get_by_id(user['id']))['username'] == 'after'
+
+
+@pytest.mark.asyncio
+async def test_social_account_update_invalidates_user_listing():
+    account = await SocialAccountDB.create({'userID': 'user_1', 'platform': 'facebook', 'pageID': 'page_1'})
+    assert [a['pageID'] for a in await SocialAccountDB.get_by_user('user_1', 'facebook')] == ['page_1']
+
+    assert await SocialAccountDB.update(account['accountID'], {'pageID': 'page_2'})
+
+    assert [a['pageID'] for a in await SocialAccountDB.get_by_user('user_1', 'facebook')] == ['page_2']
+    assert [a['pageID'] for a in await SocialAccountDB.get_by_user('user_1')] == ['page_2']
@@ -0,0 +1,87 @@
+import asyncio
+
+from ..job_queue import FirestoreJobQueue, SqliteJobQueue
+import pytest
+
+
+@pytest.fixture(params=['firestore', 'sqlite'])
+def queue(request, tmp_path):
+    if request.param == 'sqlite':
+        queue = SqliteJobQueue(str(tmp_path / 'jobs.sqlite3'), max_attempts=2, base_delay=0, max_delay=0)
+        yield queue
+        queue.close()
+    else:
+        yield FirestoreJobQueue(max_attempts=2, base_delay=0, max_delay=0)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_is_idempotent_per_job_id(queue):
+    assert await queue.enqueue('post_1', {'post_id': 'post_1'})
+    assert not await queue.enqueue('post_1', {'post_id': 'post_1'})
+    assert await queue.counts() == {'queued': 1, 'dead': 0}
+
+
+@pytest.mark.asyncio
+async def test_leased_job_is_hidden_until_visibility_timeout(queue):
+    await queue.enqueue('post_1', {'post_id': 'post_1'})
+
+    [job] = await queue.lease(10, visibility_timeout=0.1)
+    assert job['payload'] == {'post_id': 'post_1'}
+    assert job['attempts'] == 1
+    assert await queue.lease(10, visibility_timeout=0.1) == []
+
+    # The consumer died: the job comes back, and the stale lease can no longer complete it
+    await asyncio.sleep(0.15)
+    [again] = await queue.lease(10, visibility_timeout=60)
+    assert again['attempts'] == 2
+    assert not await queue.complete(job)
+    assert await queue.complete(again)
+    assert await queue.counts() == {'queued': 0, 'dead': 0}
+
+
+@pytest.mark.asyncio
+async def test_failed_job_retries_then_dead_letters(queue):
+    await queue.enqueue('post_1', {'post_id': 'post_1'})
+
+    [job] = await queue.lease(1, visibility_timeout=60)
+    assert await queue.fail(job, 'timeout') == 'retry'
+    [job] = await queue.lease(1, visibility_timeout=60)
+    assert job['last_error'] == 'timeout'
+    assert await queue.fail(job, 'timeout again') == 'dead'
+
+    assert await queue.lease(1, visibility_timeout=60) == []
+    assert await queue.counts() == {'queued': 0, 'dead': 1}
+
+
+def test_retry_delay_backs_off_exponentially_with_jitter():
+    queue = FirestoreJobQueue(base_delay=10, max_delay=100)
+    assert 5 <= queue.retry_delay(1) <= 10
+    assert 20 <= queue.retry_delay(3) <= 40
+    assert 50 <= queue.retry_delay(10) <= 100
+
+
+@pytest.mark.asyncio
+async def test_lease_passes_over_rejected_jobs_and_defers_them(queue):
+    for job_id in ('a_1', 'a_2', 'b_1'):
+        await queue.enqueue(job_id, {'user_id': job_id[0]})
+
+    leased = await queue.lease(2, visibility_timeout=60, accept=lambda job: job['id'] != 'a_2', defer=0.1)
+    assert [job['id'] for job in leased] == ['a_1', 'b_1']
+
+    # Pushed back without using up an attempt
+    assert await queue.lease(10, visibility_timeout=60) == []
+    await asyncio.sleep(0.15)
+    [job] = await queue.lease(10, visibility_timeout=60)
+    assert job['id'] == 'a_2' and job['attempts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_only_takes_jobs_in_owned_shards(queue):
+    from ..firebase_db import shard_for
+
+    await queue.enqueue('post_1', {'post_id': 'post_1'})
+    shard = shard_for('post_1')
+
+    assert await queue.lease(10, visibility_timeout=60, shards=[shard + 1]) == []
+    [job] = await queue.lease(10, visibility_timeout=60, shards=[shard])
+    assert job['id'] == 'post_1'
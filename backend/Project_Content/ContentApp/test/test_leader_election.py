@@ -0,0 +1,83 @@
+from ..firebase_db import LeaseDB
+from ..services.leader_election import LeaderElection, start_maintenance_jobs, stop_maintenance_jobs
+from ..services.publish_recovery import get_publish_recovery
+from ..services.stats_reconciler import get_stats_reconciler
+from ..services.ttl_sweeper import get_ttl_sweeper
+import asyncio
+import pytest
+
+
+def make_election(events: list, name: str = 'job', ttl: float = 0.3) -> LeaderElection:
+    async def elected():
+        events.append('elected')
+
+    async def demoted():
+        events.append('demoted')
+
+    return LeaderElection(name, elected, demoted, ttl=ttl, renew_interval=0.05)
+
+
+@pytest.mark.asyncio
+async def test_only_one_instance_leads():
+    first_events, second_events = [], []
+    first, second = make_election(first_events), make_election(second_events)
+
+    await first.campaign()
+    await second.campaign()
+
+    assert first.is_leader and not second.is_leader
+    assert first_events == ['elected'] and second_events == []
+    assert (await LeaseDB.get('job'))['owner'] == first.owner_id
+
+
+@pytest.mark.asyncio
+async def test_release_on_stop_hands_over_at_once():
+    first_events, second_events = [], []
+    first, second = make_election(first_events, ttl=60), make_election(second_events, ttl=60)
+    await first.campaign()
+
+    await first.stop()
+    await second.campaign()
+
+    assert first_events == ['elected', 'demoted']
+    assert second.is_leader
+
+
+@pytest.mark.asyncio
+async def test_takeover_after_leader_dies():
+    events = []
+    dead, survivor = make_election([]), make_election(events)
+    await dead.campaign()
+
+    # The leader stops renewing without releasing, as if its process was killed
+    await survivor.campaign()
+    assert not survivor.is_leader
+    await asyncio.sleep(0.35)
+    await survivor.campaign()
+
+    assert survivor.is_leader
+    assert events == ['elected']
+
+    # The old leader finds out on its next renewal and steps down
+    await dead.campaign()
+    assert not dead.is_leader
+
+
+@pytest.mark.asyncio
+async def test_maintenance_jobs_follow_the_lease():
+    jobs = [get_stats_reconciler(), get_ttl_sweeper(), get_publish_recovery()]
+    first = LeaderElection('maintenance', start_maintenance_jobs, stop_maintenance_jobs, ttl=60)
+    second = LeaderElection('maintenance', start_maintenance_jobs, stop_maintenance_jobs, ttl=60)
+    try:
+        await first.campaign()
+        await second.campaign()
+        assert first.is_leader and not second.is_leader
+        assert all(job._running for job in jobs)
+
+        await first.stop()
+        assert not any(job._running for job in jobs)
+        await second.campaign()
+        assert all(job._running for job in jobs)
+    finally:
+        await first.stop()
+        await second.stop()
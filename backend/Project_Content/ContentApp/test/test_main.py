@@ -6,8 +6,6 @@ client = TestClient(app)
 
 
 def test_return_health_check():
-    response = client.get("/healthy")
+    response = client.get("/")
     assert response.status_code == status.HTTP_200_OK
-    assert response.json() == {'status': 'Healthy'}
-
-
+    assert response.json() == {'message': 'MediaMint API is running with Firebase!', 'status': 'healthy'}
@@ -0,0 +1,357 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import asyncio
+import httpx
+
+from ..config import PUBLISH_CONCURRENCY, PUBLISH_PER_USER_LIMIT
+from ..firebase_db import SocialAccountDB
+from ..fakes import get_fake_graph_api
+from ..routers.posts import PostDB
+from ..services import post_scheduler
+from ..services.post_scheduler import PostScheduler
+import pytest
+
+
+async def create_due_post(user_id: str, **overrides) -> dict:
+    post = {
+        'user_id': user_id,
+        'media_type': 'image',
+        'platforms': ['facebook'],
+        'caption': 'Scheduled!',
+        'media_url': 'https://example.com/image.png',
+        'status': 'scheduled',
+        'scheduled_at': datetime.now(timezone.utc) - timedelta(minutes=1)
+    }
+    post.update(overrides)
+    return await PostDB.create(post)
+
+
+async def connect_facebook(user_id: str, page_id: str):
+    await SocialAccountDB.create({
+        'userID': user_id, 'platform': 'facebook', 'pageID': page_id, 'page_access_token': f'token_{page_id}'
+    })
+
+
+@pytest.mark.asyncio
+async def test_due_posts_publish_concurrently_within_user_cap(monkeypatch):
+    # Jobs passed over for the user cap stay visible instead of being pushed back
+    monkeypatch.setattr(post_scheduler, 'PUBLISH_QUEUE_POLL_INTERVAL', 0)
+    await connect_facebook('user_a', 'page_a')
+    await connect_facebook('user_b', 'page_b')
+    posts = [await create_due_post('user_a') for _ in range(PUBLISH_PER_USER_LIMIT + 1)]
+    posts.append(await create_due_post('user_b'))
+
+    scheduler = PostScheduler()
+    active, peak = Counter(), Counter()
+    publish_post = scheduler._publish_post
+
+    async def tracked_publish(post, attempt=1):
+        user_id = post['user_id']
+        active[user_id] += 1
+        peak[user_id] = max(peak[user_id], active[user_id])
+        peak['total'] = max(peak['total'], sum(active[u] for u in ('user_a', 'user_b')))
+        try:
+            await asyncio.sleep(0.01)
+            await publish_post(post, attempt)
+        finally:
+            active[user_id] -= 1
+
+    scheduler._publish_post = tracked_publish
+
+    await scheduler._check_and_publish_due_posts()
+    # user_a's third post isn't leased while the user is at its cap
+    assert await scheduler.dispatch() == PUBLISH_PER_USER_LIMIT + 1
+    # A second tick while the first batch is in flight must not queue them again
+    await scheduler._check_and_publish_due_posts()
+    assert await scheduler.dispatch() == 0
+    await scheduler.drain()
+    assert await scheduler.dispatch() == 1
+    await scheduler.drain()
+
+    assert peak['user_a'] <= PUBLISH_PER_USER_LIMIT
+    assert peak['total'] > 1
+    assert len(get_fake_graph_api().published) == len(posts)
+    for post in posts:
+        assert (await PostDB.get_by_id(post['id']))['status'] == 'published'
+    assert scheduler.stats['publishes_started'] == len(posts)
+    assert scheduler.stats['in_flight'] == 0
+    assert scheduler.stats['jobs_enqueued'] == len(posts)
+    assert await scheduler._queue.counts() == {'queued': 0, 'dead': 0}
+
+
+@pytest.mark.asyncio
+async def test_one_users_backlog_does_not_starve_others():
+    await connect_facebook('user_a', 'page_a')
+    await connect_facebook('user_b', 'page_b')
+    backlog = [
+        await create_due_post('user_a', scheduled_at=datetime.now(timezone.utc) - timedelta(minutes=10, seconds=i))
+        for i in range(PUBLISH_CONCURRENCY + 2)
+    ]
+    other = await create_due_post('user_b')
+
+    scheduler = PostScheduler()
+    await scheduler._check_and_publish_due_posts()
+    assert await scheduler.dispatch() == PUBLISH_PER_USER_LIMIT + 1
+    await scheduler.drain()
+
+    assert (await PostDB.get_by_id(other['id']))['status'] == 'published'
+    published = [(await PostDB.get_by_id(post['id']))['status'] for post in backlog].count('published')
+    assert published == PUBLISH_PER_USER_LIMIT
+    # The rest of the backlog waits in the queue, not in publish slots
+    assert (await scheduler._queue.counts())['queued'] == len(backlog) - PUBLISH_PER_USER_LIMIT
+
+
+@pytest.mark.asyncio
+async def test_platforms_publish_independently():
+    await SocialAccountDB.create({
+        'userID': 'user_a', 'platform': 'facebook', 'pageID': 'page_a',
+        'page_access_token': 'token_a', 'instagram_account_id': 'ig_a'
+    })
+    both = await create_due_post('user_a', platforms=['facebook', 'instagram'])
+    partial = await create_due_post('user_a', platforms=['facebook', 'tiktok'])
+
+    scheduler = PostScheduler()
+    await scheduler._check_and_publish_due_posts()
+    await scheduler.dispatch()
+    await scheduler.drain()
+
+    published = await PostDB.get_by_id(both['id'])
+    assert published['status'] == 'published'
+    assert set(published['social_post_ids']) == {'facebook', 'instagram'}
+    assert (await PostDB.get_by_id(partial['id']))['status'] == 'partially_published'
+    assert scheduler.stats['platform_latency']['facebook']['count'] == 2
+    assert scheduler.stats['platform_latency']['instagram']['count'] == 1
+    # No account connected, so nothing was attempted
+    assert 'tiktok' not in scheduler.stats['platform_latency']
+
+
+@pytest.mark.asyncio
+async def test_timer_publishes_new_post_on_time():
+    await connect_facebook('user_a', 'page_a')
+    scheduler = PostScheduler()
+    await scheduler.start()
+    try:
+        # Let the initial reload set the look-ahead window
+        await asyncio.sleep(0.05)
+        post = await create_due_post('user_a', scheduled_at=datetime.now(timezone.utc) + timedelta(seconds=0.3))
+        await asyncio.sleep(0)
+        assert scheduler.stats['timers'] == 1
+
+        await asyncio.sleep(0.6)
+        assert (await PostDB.get_by_id(post['id']))['status'] == 'published'
+        assert scheduler.stats['last_publish_lag_seconds'] < 0.3
+        # Published from the timer, not from another reload
+        assert scheduler.stats['ticks'] == 1
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_timer_follows_reschedule_and_delete():
+    scheduler = PostScheduler()
+    await scheduler.start()
+    try:
+        await asyncio.sleep(0.05)
+        soon = datetime.now(timezone.utc) + timedelta(minutes=1)
+        post = await create_due_post('user_a', scheduled_at=soon)
+        await asyncio.sleep(0)
+        assert scheduler._timers[post['id']] == soon
+
+        later = soon + timedelta(minutes=5)
+        await PostDB.update(post['id'], {'scheduled_at': later})
+        await asyncio.sleep(0)
+        assert scheduler._timers[post['id']] == later
+
+        await PostDB.delete(post['id'])
+        await asyncio.sleep(0)
+        assert post['id'] not in scheduler._timers
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_listener_tracks_writes_from_other_processes():
+    from ..fakes import get_fake_firestore
+
+    scheduler = PostScheduler()
+    scheduler._listener_check_interval = 0.05
+    await scheduler.start()
+    try:
+        await asyncio.sleep(0.05)
+        posts = get_fake_firestore().collection('posts')
+        # Written straight to Firestore, as another API worker would, and beyond the look-ahead window
+        next_week = datetime.now(timezone.utc) + timedelta(days=7)
+        await posts.document('elsewhere').set({'id': 'elsewhere', 'status': 'scheduled', 'scheduled_at': next_week})
+        await asyncio.sleep(0)
+        assert scheduler._timers['elsewhere'] == next_week
+
+        # The stream dies; the reconnect reloads every scheduled post
+        scheduler._watch.close()
+        await posts.document('while_down').set({'id': 'while_down', 'status': 'scheduled', 'scheduled_at': next_week})
+        await posts.document('elsewhere').update({'status': 'draft'})
+        await asyncio.sleep(0.15)
+
+        assert scheduler.stats['listener_connects'] == 2
+        assert set(scheduler._timers) == {'while_down'}
+    finally:
+        await scheduler.stop()
+
+
+@pytest.mark.asyncio
+async def test_sharded_scheduler_only_sees_its_shards():
+    from ..firebase_db import shard_for
+
+    post = await create_due_post('user_a')
+    shard = shard_for(post['id'])
+    assert post['shard'] == shard
+
+    mine, others = PostScheduler(), PostScheduler()
+    await mine.set_shards({shard})
+    await others.set_shards({shard + 1})
+
+    assert [p['id'] for p in await mine._get_due_posts()] == [post['id']]
+    assert await others._get_due_posts() == []
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_retries_only_the_failed_platform():
+    from ..services.meta_service import MetaAPIError
+
+    await SocialAccountDB.create({
+        'userID': 'user_a', 'platform': 'facebook', 'pageID': 'page_a',
+        'page_access_token': 'token_a', 'instagram_account_id': 'ig_a'
+    })
+    post = await create_due_post('user_a', platforms=['facebook', 'instagram'])
+
+    scheduler = PostScheduler()
+    scheduler._queue.base_delay = scheduler._queue.max_delay = 0
+    publish_to_platform = scheduler._publish_to_platform
+    calls = Counter()
+
+    async def flaky_instagram(**kwargs):
+        calls[kwargs['platform']] += 1
+        if kwargs['platform'] == 'instagram' and calls['instagram'] == 1:
+            raise MetaAPIError('Service temporarily unavailable', error_code=2)
+        return await publish_to_platform(**kwargs)
+
+    scheduler._publish_to_platform = flaky_instagram
+
+    await scheduler._check_and_publish_due_posts()
+    await scheduler.dispatch()
+    await scheduler.drain()
+    assert (await PostDB.get_by_id(post['id']))['status'] == 'publishing'
+    assert scheduler.stats['jobs_retried'] == 1
+
+    await scheduler.dispatch()
+    await scheduler.drain()
+    published = await PostDB.get_by_id(post['id'])
+    assert published['status'] == 'published'
+    assert set(published['social_post_ids']) == {'facebook', 'instagram'}
+    # Facebook went out on the first attempt and wasn't posted twice
+    assert calls == {'facebook': 1, 'instagram': 2}
+    assert await scheduler._queue.counts() == {'queued': 0, 'dead': 0}
+
+
+@pytest.mark.asyncio
+async def test_job_is_dead_lettered_after_max_attempts():
+    await connect_facebook('user_a', 'page_a')
+    post = await create_due_post('user_a')
+
+    scheduler = PostScheduler()
+    scheduler._queue.base_delay = scheduler._queue.max_delay = 0
+
+    async def broken(post, attempt=1):
+        raise RuntimeError('boom')
+
+    scheduler._publish_post = broken
+
+    await scheduler._check_and_publish_due_posts()
+    for _ in range(scheduler._queue.max_attempts):
+        assert await scheduler.dispatch() == 1
+        await scheduler.drain()
+
+    failed = await PostDB.get_by_id(post['id'])
+    assert failed['status'] == 'failed'
+    assert failed['error_message'] == 'boom'
+    assert scheduler.stats['jobs_dead_lettered'] == 1
+    assert await scheduler._queue.counts() == {'queued': 0, 'dead': 1}
+
+
+@pytest.mark.asyncio
+async def test_autoresponder_polls_only_new_comments(monkeypatch):
+    from ..firebase_db import AutoresponderSettingsDB
+    from ..services import post_scheduler
+
+    monkeypatch.setattr(post_scheduler, 'COMMENT_POLL_PAGE_SIZE', 2)
+    await connect_facebook('user_a', 'page_a')
+    await AutoresponderSettingsDB.save('post_1', 'user_a', {'social_post_ids': {'facebook': 'fb_post_1'}})
+    graph = get_fake_graph_api()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    for minutes in (5, 4, 3, 3, 1):
+        graph.add_comment('fb_post_1', f'{minutes} minutes ago', created_time=now - timedelta(minutes=minutes))
+
+    scheduler = PostScheduler()
+    await scheduler._check_autoresponders()
+    # Five comments over three pages, all answered in one tick
+    assert len(graph.replies) == 5
+    assert graph.calls['GET comments'] == 3
+    cursor = (await AutoresponderSettingsDB.get_by_post('post_1'))['comment_cursors']['facebook']
+    assert cursor['since'] == now - timedelta(minutes=1)
+
+    # Nothing new: one Graph call from the cursor, no replies
+    await scheduler._check_autoresponders()
+    assert len(graph.replies) == 5
+    assert graph.calls['GET comments'] == 4
+
+    graph.add_comment('fb_post_1', 'just now', created_time=now)
+    await scheduler._check_autoresponders()
+    assert len(graph.replies) == 6
+    assert graph.replies[-1]['parent_id'] == graph.comments['fb_post_1'][-1]['id']
+
+
+@pytest.mark.asyncio
+async def test_autoresponder_defers_replies_past_account_budget():
+    from ..firebase_db import AutoresponderSettingsDB
+    from ..services.post_scheduler import CallBudget
+
+    await connect_facebook('user_a', 'page_a')
+    for post_id in ('post_1', 'post_2'):
+        await AutoresponderSettingsDB.save(post_id, 'user_a', {'social_post_ids': {'facebook': f'fb_{post_id}'}})
+    graph = get_fake_graph_api()
+    for _ in range(3):
+        graph.add_comment('fb_post_1', 'Nice!')
+    graph.add_comment('fb_post_2', 'Love it')
+
+    scheduler = PostScheduler()
+    # Two polls and two replies for the page this minute
+    scheduler._call_budget = CallBudget(4)
+    await scheduler._check_autoresponders()
+    assert len(graph.replies) == 2
+    assert scheduler.stats['autoresponder']['budget_skips'] == 2
+
+    # With budget again, only the deferred comments are answered
+    scheduler._call_budget = CallBudget(30)
+    await scheduler._check_autoresponders()
+    assert len(graph.replies) == 4
+    assert len({r['parent_id'] for r in graph.replies}) == 4
+    assert scheduler.stats['autoresponder']['replies'] == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('error, retried', [(httpx.ConnectError, True), (httpx.ReadTimeout, False)])
+async def test_only_connect_errors_are_retried(monkeypatch, error, retried):
+    await connect_facebook('user_a', 'page_a')
+    post = await create_due_post('user_a')
+
+    async def unreachable(request):
+        raise error('Graph API unreachable', request=request)
+
+    monkeypatch.setattr(get_fake_graph_api(), 'handle', unreachable)
+    scheduler = PostScheduler()
+    await scheduler._check_and_publish_due_posts()
+    await scheduler.dispatch()
+    await scheduler.drain()
+
+    # A read timeout may have published already, so it must not be sent again
+    assert scheduler.stats['jobs_retried'] == (1 if retried else 0)
+    assert (await PostDB.get_by_id(post['id']))['status'] == ('publishing' if retried else 'failed')
@@ -0,0 +1,214 @@
+from .utils import *
+from ..routers.auth import get_current_user
+from fastapi import status
+
+app.dependency_overrides[get_current_user] = override_get_current_user
+
+
+def create_post(**overrides):
+    post = {
+        'media_type': 'image',
+        'content_source': 'upload',
+        'platforms': ['facebook'],
+        'caption': 'Hello!',
+        'media_url': 'https://example.com/image.png',
+        'status': 'draft'
+    }
+    post.update(overrides)
+    response = client.post("/posts/", json=post)
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def test_list_posts_paginates(test_user):
+    for i in range(5):
+        create_post(caption=f'Post {i}')
+
+    response = client.get("/posts/", params={'page_size': 3})
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    assert len(first_page) == 3
+    cursor = response.headers['X-Next-Cursor']
+
+    response = client.get("/posts/", params={'page_size': 3, 'cursor': cursor})
+    second_page = response.json()
+    assert len(second_page) == 2
+    assert not {p['id'] for p in first_page} & {p['id'] for p in second_page}
+
+
+def test_list_posts_invalid_cursor(test_user):
+    response = client.get("/posts/", params={'cursor': 'not-a-cursor'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+
+def test_list_posts_projects_fields(test_user):
+    from ..routers.posts import POST_SUMMARY_FIELDS
+
+    for i in range(2):
+        create_post(caption=f'Post {i}')
+
+    response = client.get("/posts/", params={'fields': 'summary'})
+    assert response.status_code == status.HTTP_200_OK
+    assert all(set(post) <= set(POST_SUMMARY_FIELDS) for post in response.json())
+
+    # Paging still works with the ordering field added to the projection
+    response = client.get("/posts/", params={'fields': 'caption', 'page_size': 1})
+    assert set(response.json()[0]) <= {'caption', 'created_at'}
+    response = client.get("/posts/", params={'fields': 'caption', 'page_size': 1,
+                                             'cursor': response.headers['X-Next-Cursor']})
+    assert len(response.json()) == 1 and 'media_url' not in response.json()[0]
+
+
+def test_list_posts_rejects_invalid_fields(test_user):
+    response = client.get("/posts/", params={'fields': 'caption,bad field'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_stats_follow_post_changes(test_user):
+    draft = create_post()
+    create_post(platforms=['facebook', 'instagram'], status='draft')
+
+    stats = client.get("/posts/stats/overview").json()
+    assert stats['total_posts'] == 2
+    assert stats['drafts'] == 2
+    assert stats['by_platform'] == {'facebook': 2, 'instagram': 1}
+
+    response = client.delete(f"/posts/{draft['id']}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    stats = client.get("/posts/stats/overview").json()
+    assert stats['total_posts'] == 1
+    assert stats['by_platform'] == {'facebook': 1, 'instagram': 1}
+
+
+def test_get_due_pages_oldest_first(test_user):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from ..routers.posts import PostDB
+
+    now = datetime.now(timezone.utc)
+
+    async def seed():
+        # Straight through PostDB: the router refuses to schedule without a connected account
+        for minutes in (30, 10, 20):
+            await PostDB.create({'user_id': test_user['id'], 'status': 'scheduled', 'caption': f'{minutes} minutes ago',
+                                 'scheduled_at': now - timedelta(minutes=minutes)})
+        await PostDB.create({'user_id': test_user['id'], 'status': 'scheduled', 'caption': 'future',
+                             'scheduled_at': now + timedelta(hours=1)})
+        await PostDB.create({'user_id': test_user['id'], 'status': 'draft', 'caption': 'draft',
+                             'scheduled_at': now - timedelta(hours=1)})
+
+    asyncio.run(seed())
+    first_page, cursor = asyncio.run(PostDB.get_due(now, page_size=2))
+    second_page, last_cursor = asyncio.run(PostDB.get_due(now, page_size=2, cursor=cursor))
+
+    assert [p['caption'] for p in first_page + second_page] == [
+        '30 minutes ago', '20 minutes ago', '10 minutes ago'
+    ]
+    assert last_cursor is None
+
+
+def test_rebuild_all_skips_counters_written_during_the_scan(test_user):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from ..firebase_config import async_db
+    from ..firebase_db import UserStatsDB
+
+    create_post()
+    stats = async_db.collection(UserStatsDB.collection)
+    long_ago = datetime.now(timezone.utc) - timedelta(days=1)
+    # Drifted counters, and counters that took a delta after the scan began
+    asyncio.run(stats.document(test_user['id']).set({'total': 7, 'updated_at': long_ago}))
+    asyncio.run(stats.document('busy_user').set({'total': 3, 'updated_at': datetime.now(timezone.utc) + timedelta(minutes=1)}))
+
+    assert asyncio.run(UserStatsDB.rebuild_all()) == 1
+    assert asyncio.run(UserStatsDB.get(test_user['id']))['total'] == 1
+    assert asyncio.run(UserStatsDB.get('busy_user'))['total'] == 3
+
+
+
+def test_rescheduling_refreshes_cached_stats(test_user):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from ..routers.posts import PostDB
+
+    post = asyncio.run(PostDB.create({'user_id': test_user['id'], 'status': 'scheduled',
+                                      'scheduled_at': datetime.now(timezone.utc) + timedelta(days=2)}))
+    assert client.get("/posts/stats/overview").json()['scheduled_today'] == 0
+
+    assert asyncio.run(PostDB.update(post['id'], {'scheduled_at': datetime.now(timezone.utc)}))
+    assert client.get("/posts/stats/overview").json()['scheduled_today'] == 1
+
+
+def test_unscheduling_moves_calendar_at_back_to_creation(test_user):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from ..routers.posts import PostDB
+
+    post = asyncio.run(PostDB.create({'user_id': test_user['id'], 'status': 'scheduled',
+                                      'scheduled_at': datetime.now(timezone.utc) + timedelta(days=2)}))
+
+    assert asyncio.run(PostDB.update(post['id'], {'status': 'draft', 'scheduled_at': None}))
+    updated = asyncio.run(PostDB.get_by_id(post['id']))
+    assert updated['scheduled_at'] is None
+    assert updated['calendar_at'] == post['created_at']
+
+
+def test_calendar_groups_month_range_by_day(test_user):
+    import asyncio
+    from datetime import datetime, timezone
+    from ..routers.posts import PostDB
+
+    async def seed():
+        for caption, when in [('late', datetime(2026, 3, 5, 10)), ('early', datetime(2026, 3, 5, 9)),
+                              ('last', datetime(2026, 3, 31, 23, 30)), ('april', datetime(2026, 4, 1)),
+                              ('february', datetime(2026, 2, 28, 23, 59))]:
+            await PostDB.create({'user_id': test_user['id'], 'status': 'scheduled', 'caption': caption,
+                                 'scheduled_at': when.replace(tzinfo=timezone.utc)})
+        await PostDB.create({'user_id': 'someone_else', 'status': 'scheduled', 'caption': 'not mine',
+                             'scheduled_at': datetime(2026, 3, 5, 8, tzinfo=timezone.utc)})
+
+    asyncio.run(seed())
+    response = client.get("/posts/calendar/2026/3")
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+
+    assert body['days_in_month'] == 31
+    assert {day: [p['caption'] for p in posts] for day, posts in body['calendar'].items()} == {
+        '5': ['early', 'late'], '31': ['last']
+    }
+    assert body['calendar']['31'][0]['scheduled_time'] == '23:30'
+
+
+def test_rebuild_leaves_counters_a_delta_overtook(test_user):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from ..firebase_config import async_db
+    from ..firebase_db import UserStatsDB
+
+    create_post()
+    stats = async_db.collection(UserStatsDB.collection).document(test_user['id'])
+
+    asyncio.run(stats.set({'total': 7, 'updated_at': datetime.now(timezone.utc) - timedelta(days=1)}))
+    assert asyncio.run(UserStatsDB.rebuild(test_user['id']))['total'] == 1
+
+    # A delta stamped after every recount started: the recount can't be trusted
+    asyncio.run(stats.set({'total': 3, 'updated_at': datetime.now(timezone.utc) + timedelta(minutes=1)}))
+    assert asyncio.run(UserStatsDB.rebuild(test_user['id']))['total'] == 3
+
+
+def test_stats_recount_counters_that_only_hold_deltas(test_user):
+    import asyncio
+    from ..firebase_config import async_db, COLLECTIONS
+
+    # Posts written before user_stats existed
+    for post_id in ('old_1', 'old_2'):
+        asyncio.run(async_db.collection(COLLECTIONS['posts']).document(post_id).set({
+            'id': post_id, 'user_id': test_user['id'], 'status': 'published', 'platforms': ['facebook']
+        }))
+    # The first write afterwards creates counters holding just its delta
+    create_post()
+
+    stats = client.get("/posts/stats/overview").json()
+    assert stats['total_posts'] == 3
+    assert stats['published'] == 2 and stats['drafts'] == 1
@@ -0,0 +1,86 @@
+from datetime import datetime, timezone, timedelta
+from ..firebase_db import NotificationDB, PublishedPostDB, SocialAccountDB
+from ..fakes import get_fake_graph_api
+from ..routers.posts import PostDB
+from ..services.post_scheduler import PostScheduler
+from ..services.publish_recovery import PublishRecovery
+from .test_post_scheduler import create_due_post
+import pytest
+
+
+async def stall(post_id: str, minutes: int = 30, **fields):
+    """Leave a post as a worker that died mid-publish would"""
+    await PostDB.update(post_id, {
+        'status': 'publishing',
+        'publishing_heartbeat_at': datetime.now(timezone.utc) - timedelta(minutes=minutes),
+        **fields
+    })
+
+
+@pytest.mark.asyncio
+async def test_stalled_post_is_requeued_without_posting_twice():
+    await SocialAccountDB.create({
+        'userID': 'user_a', 'platform': 'facebook', 'pageID': 'page_a',
+        'page_access_token': 'token_a', 'instagram_account_id': 'ig_a'
+    })
+    post = await create_due_post('user_a', platforms=['facebook', 'instagram'])
+    await stall(post['id'])
+    # Facebook went out before the worker died
+    await PublishedPostDB.create({
+        'internal_post_id': post['id'], 'user_id': 'user_a', 'platform': 'facebook',
+        'platform_post_id': 'fb_1', 'status': 'published'
+    })
+
+    scheduler = PostScheduler()
+    recovery = PublishRecovery(queue=scheduler._queue)
+    assert (await recovery.sweep())['requeued'] == 1
+    # Claimed with a fresh heartbeat, so the next sweep leaves it alone
+    assert (await recovery.sweep())['stale_found'] == 0
+
+    await scheduler.dispatch()
+    await scheduler.drain()
+
+    published = await PostDB.get_by_id(post['id'])
+    assert published['status'] == 'published'
+    assert set(published['social_post_ids']) == {'facebook', 'instagram'}
+    assert published['social_post_ids']['facebook'] == 'fb_1'
+    assert published['publishing_recoveries'] == 1
+    assert len(get_fake_graph_api().published) == 1
+    assert recovery.stats['requeued'] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_skips_queued_and_live_posts_and_fails_repeat_stalls():
+    queued = await create_due_post('user_a')
+    live = await create_due_post('user_a')
+    stuck = await create_due_post('user_a')
+    await stall(queued['id'])
+    await stall(live['id'], minutes=1)
+    await stall(stuck['id'], publishing_recoveries=2)
+
+    scheduler = PostScheduler()
+    await scheduler._queue.enqueue(queued['id'], {'post_id': queued['id']})
+
+    counts = await PublishRecovery(queue=scheduler._queue, max_recoveries=2).sweep()
+
+    assert counts == {'stale_found': 2, 'still_queued': 1, 'requeued': 0, 'failed': 1}
+    assert (await PostDB.get_by_id(live['id']))['status'] == 'publishing'
+    failed = await PostDB.get_by_id(stuck['id'])
+    assert failed['status'] == 'failed'
+    assert failed['error_message'] == 'Publishing stalled repeatedly'
+
+
+@pytest.mark.asyncio
+async def test_repeat_stall_is_not_failed_once_the_post_published():
+    post = await create_due_post('user_a')
+    await stall(post['id'], publishing_recoveries=2)
+    recovery = PublishRecovery(queue=PostScheduler()._queue, max_recoveries=2)
+    [stale] = await PostDB.get_stale_publishing(datetime.now(timezone.utc) - timedelta(minutes=5), 10)
+
+    # The stalled worker finishes between the sweep's query and its write
+    await PostDB.update(post['id'], {'status': 'published'})
+
+    assert await recovery._recover(stale, datetime.now(timezone.utc) - timedelta(minutes=5)) is None
+    assert (await PostDB.get_by_id(post['id']))['status'] == 'published'
+    notifications, _ = await NotificationDB.get_by_user('user_a')
+    assert notifications == []
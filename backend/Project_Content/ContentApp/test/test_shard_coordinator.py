@@ -0,0 +1,46 @@
+from ..services.shard_coordinator import ShardCoordinator
+import pytest
+
+
+def make_coordinator(assigned: dict, name: str) -> ShardCoordinator:
+    async def on_change(shards):
+        assigned[name] = shards
+
+    return ShardCoordinator('jobs', on_change, shards=4, ttl=60, renew_interval=0.05)
+
+
+@pytest.mark.asyncio
+async def test_shards_rebalance_as_workers_join_and_leave():
+    assigned = {}
+    first, second = make_coordinator(assigned, 'first'), make_coordinator(assigned, 'second')
+
+    await first.rebalance()
+    assert assigned['first'] == {0, 1, 2, 3}
+
+    # The newcomer finds every shard taken until the first worker hands back its surplus
+    await second.rebalance()
+    assert not second.owned
+    await first.rebalance()
+    await second.rebalance()
+
+    assert len(first.owned) == len(second.owned) == 2
+    assert first.owned | second.owned == {0, 1, 2, 3}
+
+    await first.stop()
+    assert assigned['first'] == set()
+    await second.rebalance()
+    assert assigned['second'] == {0, 1, 2, 3}
+
+
+@pytest.mark.asyncio
+async def test_uneven_shards_leave_no_worker_idle():
+    assigned = {}
+    workers = [make_coordinator(assigned, name) for name in ('a', 'b', 'c')]
+
+    # Every worker registers before any of them settles on a share
+    for _ in range(3):
+        for worker in workers:
+            await worker.rebalance()
+
+    assert sorted(len(worker.owned) for worker in workers) == [1, 1, 2]
+    assert set().union(*(worker.owned for worker in workers)) == {0, 1, 2, 3}
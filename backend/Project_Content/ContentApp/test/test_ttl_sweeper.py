@@ -0,0 +1,41 @@
+from datetime import datetime, timezone, timedelta
+from ..firebase_config import async_db
+from ..firebase_db import RefreshTokenDB, OAuthStateDB, CommentThreadDB
+from ..services.ttl_sweeper import TTLSweeper
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_sweep_deletes_only_expired_tokens():
+    now = datetime.now(timezone.utc)
+    await RefreshTokenDB.create('user_1', 'expired-token', now - timedelta(days=3))
+    await RefreshTokenDB.create('user_1', 'live-token', now + timedelta(days=30))
+    state = await OAuthStateDB.create('user_1', 'meta')
+
+    sweeper = TTLSweeper(batch_size=1, max_deletes_per_second=0)
+    deleted = await sweeper.sweep()
+
+    assert deleted['refresh_tokens'] == 1
+    assert deleted['oauth_states'] == 0
+    assert await RefreshTokenDB.get_by_token('expired-token') is None
+    assert await RefreshTokenDB.get_by_token('live-token') is not None
+    assert await OAuthStateDB.get_and_validate(state) is not None
+    assert sweeper.stats['deleted']['refresh_tokens'] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_releases_stale_comment_reservations():
+    await CommentThreadDB.mark_as_replied('stale_comment')
+    await async_db.collection(CommentThreadDB.collection).document('stale_comment').update({
+        'reserved_at': datetime.now(timezone.utc) - timedelta(hours=2)
+    })
+    await CommentThreadDB.mark_as_replied('fresh_comment')
+    await CommentThreadDB.record_response({'comment_id': 'answered_comment', 'post_id': 'post_1'})
+
+    deleted = await TTLSweeper(max_deletes_per_second=0).sweep()
+
+    assert deleted['comment_reservations'] == 1
+    # The released comment can be reserved again; the others are untouched
+    assert await CommentThreadDB.mark_as_replied('stale_comment')
+    assert not await CommentThreadDB.mark_as_replied('fresh_comment')
+    assert await CommentThreadDB.has_responded_to_comment('answered_comment')
@@ -1,8 +1,7 @@
 from .utils import *
-from ..routers.users import get_db, get_current_user
+from ..routers.users import get_current_user
 from fastapi import status
 
-app.dependency_overrides[get_db] = override_get_db
 app.dependency_overrides[get_current_user] = override_get_current_user
 
 def test_return_user(test_user):
@@ -14,6 +13,7 @@ def test_return_user(test_user):
     assert response.json()['last_name'] == 'Roby'
     assert response.json()['role'] == 'admin'
     assert response.json()['phone_number'] == '(111)-111-1111'
+    assert 'hashed_password' not in response.json()
 
 
 def test_change_password_success(test_user):
@@ -32,9 +32,40 @@ def test_change_password_invalid_current_password(test_user):
 def test_change_phone_number_success(test_user):
     response = client.put("/user/phonenumber/2222222222")
     assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert client.get("/user").json()['phone_number'] == '2222222222'
 
 
+def test_export_user_data(test_user):
+    import json
 
+    for i in range(3):
+        client.post("/posts/", json={'media_type': 'image', 'content_source': 'upload', 'platforms': ['facebook'],
+                                     'caption': f'Post {i}', 'media_url': 'https://example.com/a.png', 'status': 'draft'})
 
+    response = client.get("/user/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]['collection'] == 'users'
+    assert 'hashed_password' not in records[0]['data']
+    assert sorted(r['data']['caption'] for r in records if r['collection'] == 'posts') == ['Post 0', 'Post 1', 'Post 2']
+
+
+def test_export_user_data_gzip(test_user):
+    import gzip
+    import json
+
+    response = client.get("/user/export", params={'gzip': True})
+    assert response.status_code == status.HTTP_200_OK
+    lines = gzip.decompress(response.content).decode().splitlines()
+    assert json.loads(lines[0])['data']['username'] == 'codingwithrobytest'
 
 
+def test_export_other_user_requires_admin(test_user):
+    app.dependency_overrides[get_current_user] = lambda: {'username': 'plainuser', 'id': 'user_2', 'user_role': 'user'}
+    try:
+        response = client.get("/user/export", params={'user_id': 'test_user_1'})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    finally:
+        app.dependency_overrides[get_current_user] = override_get_current_user
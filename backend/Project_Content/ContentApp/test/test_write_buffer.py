@@ -0,0 +1,76 @@
+from ..fakes.firestore import FakeWriteBatch
+from ..firebase_config import async_db
+from ..firebase_write_buffer import WriteBehindBuffer
+import pytest
+
+
+async def start_buffer(**kwargs) -> WriteBehindBuffer:
+    # A long interval so only explicit flushes commit
+    buffer = WriteBehindBuffer(flush_interval=60, **kwargs)
+    await buffer.start()
+    return buffer
+
+
+@pytest.mark.asyncio
+async def test_flush_commits_queued_writes():
+    buffer = await start_buffer()
+    for i in range(3):
+        assert buffer.add('activities', f'activity_{i}', {'id': f'activity_{i}'})
+
+    await buffer.flush()
+
+    assert (await async_db.collection('activities').document('activity_2').get()).exists
+    assert buffer.stats['written'] == 3 and buffer.stats['commits'] == 1
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_hands_writes_back_to_the_caller():
+    buffer = await start_buffer(max_pending=2)
+
+    assert buffer.add('activities', 'a', {})
+    assert buffer.add('activities', 'b', {})
+    assert not buffer.add('activities', 'c', {})
+    assert buffer.stats['overflowed'] == 1
+    await buffer.stop()
+    assert not buffer.add('activities', 'd', {})
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_requeues_up_to_the_cap(monkeypatch):
+    buffer = await start_buffer(max_pending=3)
+    for doc_id in ('a', 'b', 'c'):
+        buffer.add('activities', doc_id, {})
+
+    async def failing_commit(batch):
+        # New writes arrive while the commit is in flight
+        buffer.add('activities', 'd', {})
+        buffer.add('activities', 'e', {})
+        raise RuntimeError('unavailable')
+
+    monkeypatch.setattr(FakeWriteBatch, 'commit', failing_commit)
+    await buffer.flush()
+
+    # The oldest writes past the cap are dropped, the rest wait for the next flush
+    assert [doc_id for _, doc_id, _ in buffer._pending] == ['c', 'd', 'e']
+    assert buffer.stats['failed_commits'] == 1 and buffer.stats['dropped'] == 2
+
+    monkeypatch.undo()
+    await buffer.flush()
+    assert buffer.stats['written'] == 3 and not buffer._pending
+    await buffer.stop()
+
+
+@pytest.mark.asyncio
+async def test_writes_lost_at_shutdown_are_counted(monkeypatch):
+    async def failing_commit(batch):
+        raise RuntimeError('unavailable')
+
+    buffer = await start_buffer()
+    for doc_id in ('a', 'b'):
+        buffer.add('activities', doc_id, {})
+    monkeypatch.setattr(FakeWriteBatch, 'commit', failing_commit)
+
+    await buffer.stop()
+
+    assert buffer.stats['dropped'] == 2 and not buffer._pending
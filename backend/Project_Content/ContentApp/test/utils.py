@@ -1,8 +1,10 @@
 from ..main import app
 from fastapi.testclient import TestClient
+import asyncio
 import pytest
 from ..routers.auth import bcrypt_context
-from ..firebase_db import TodosDB, UserDB
+from ..firebase_config import async_db, COLLECTIONS
+from ..firebase_db import UserDB
 
 
 def override_get_current_user():
@@ -10,41 +12,23 @@ def override_get_current_user():
 
 client = TestClient(app)
 
-@pytest.fixture
-def test_todo():
-    todo_data = {
-        'title': "Learn to code!",
-        'description': "Need to learn everyday!",
-        'priority': 5,
-        'complete': False,
-        'owner_id': 'test_user_1',
-    }
-    
-    todo = TodosDB.create(todo_data)
-    yield todo
-    # Cleanup
-    TodosDB.delete(todo['id'])
-
 
 @pytest.fixture
 def test_user():
     user_data = {
+        'id': 'test_user_1',
         'username': "codingwithrobytest",
         'email': "codingwithrobytest@email.com",
         'first_name': "Eric",
         'last_name': "Roby",
         'hashed_password': bcrypt_context.hash("testpassword"),
+        'is_active': True,
         'role': "admin",
         'phone_number': "(111)-111-1111"
     }
     
-    user = UserDB.create(user_data)
-    yield user
+    # Fixed id so it matches override_get_current_user
+    asyncio.run(async_db.collection(COLLECTIONS['users']).document(user_data['id']).set(user_data))
+    yield user_data
     # Cleanup
-    UserDB.delete(user['id'])
-
-
-
-
-
-
+    asyncio.run(UserDB.delete(user_data['id']))
@@ -0,0 +1,131 @@
+"""
+Concurrent request throughput of the app on the async Firestore data layer
+
+Loads the real ContentApp app against the in-memory backends
+(MEDIAMINT_FAKE_BACKENDS) with a simulated round-trip on every backend call
+(FAKE_BACKEND_LATENCY_MS), seeds users and posts through the data layer, then
+drives real endpoints with real access tokens. Each endpoint runs once with
+one request in flight and once at --concurrency: with the data layer awaiting
+its calls the concurrent run overlaps the round-trips, where a blocking client
+would serialise them and gain nothing.
+
+Usage:
+    python benchmarks/bench_async_db.py [--requests 200] [--concurrency 50] [--latency-ms 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+import httpx
+
+ENDPOINTS = [
+    '/user/',
+    '/posts/?page_size=20',
+    '/posts/stats/overview',
+    '/posts/calendar/{year}/{month}',
+]
+
+
+async def seed(users: int, posts_per_user: int) -> Dict[str, str]:
+    """Create users with posts, return an access token per user id"""
+    from ContentApp.firebase_db import UserDB
+    from ContentApp.routers.auth import create_access_token
+    from ContentApp.routers.posts import PostDB
+
+    tokens = {}
+    for i in range(users):
+        user = await UserDB.create({
+            'username': f"bench{i}", 'email': f"bench{i}@example.com",
+            'first_name': 'Bench', 'last_name': str(i), 'role': 'user', 'is_active': True
+        })
+        tokens[user['id']] = create_access_token(user['username'], user['id'], 'user', timedelta(hours=1))
+
+    now = datetime.now(timezone.utc)
+    await asyncio.gather(*(
+        PostDB.create({
+            'user_id': user_id,
+            'caption': f"Post {n}",
+            'media_type': 'image',
+            'content_source': 'upload',
+            'platforms': ['facebook', 'instagram'],
+            'media_url': 'https://example.com/image.png',
+            'status': 'scheduled' if n % 2 else 'draft',
+            'scheduled_at': now + timedelta(days=n) if n % 2 else None
+        })
+        for user_id in tokens
+        for n in range(posts_per_user)
+    ))
+    return tokens
+
+
+async def run_load(client: httpx.AsyncClient, path: str, tokens: List[str], total: int, concurrency: int) -> dict:
+    """Fire `total` requests at `path` with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path, headers={'Authorization': f"Bearer {tokens[i % len(tokens)]}"})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000
+    }
+
+
+async def run(args) -> None:
+    from ContentApp.firebase_cache import clear_caches
+    from ContentApp.main import app
+
+    tokens = list((await seed(args.users, args.posts)).values())
+    today = datetime.now(timezone.utc)
+    transport = httpx.ASGITransport(app=app)
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency_ms:.0f}ms "
+          f"users={args.users} posts/user={args.posts}")
+    print(f"  {'endpoint':32} {'serial req/s':>12} {'concurrent req/s':>16} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for endpoint in ENDPOINTS:
+            path = endpoint.format(year=today.year, month=today.month)
+            clear_caches()
+            serial = await run_load(client, path, tokens, args.requests, 1)
+            clear_caches()
+            concurrent = await run_load(client, path, tokens, args.requests, args.concurrency)
+            print(f"  {endpoint:32} {serial['rps']:12.1f} {concurrent['rps']:16.1f} "
+                  f"{concurrent['p50']:8.1f} {concurrent['p95']:8.1f} {concurrent['rps'] / serial['rps']:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--posts', type=int, default=20, help='posts per user')
+    args = parser.parse_args()
+
+    # Read by ContentApp.config at import, so set before the app is loaded
+    os.environ['MEDIAMINT_FAKE_BACKENDS'] = 'true'
+    os.environ['FAKE_BACKEND_LATENCY_MS'] = str(args.latency_ms)
+    os.environ.setdefault('VERIFY_INDEXES_ON_STARTUP', 'false')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()